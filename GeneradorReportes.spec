@@ -1,5 +1,27 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
 
+# Modo de empaquetado:
+#   - por defecto: un solo archivo .exe (se descomprime en un temporal en cada arranque)
+#   - GR_ONEDIR=1: carpeta dist/GeneradorReportes/ con el .exe y sus dependencias,
+#     sin descompresión en cada arranque (arranque notablemente más rápido)
+ONEDIR = os.environ.get("GR_ONEDIR", "") not in ("", "0")
+
+# Módulos de la biblioteca estándar que la aplicación no usa. Cada módulo
+# excluido es un archivo menos que empaquetar, descomprimir y cargar.
+# No excluir: csv, re, datetime, unicodedata, tempfile/random, shutil,
+# threading, gzip/lzma, json, sqlite3, mmap, bisect, heapq, concurrent, ctypes.
+excludes = [
+    'http', 'urllib.request', 'email', 'ftplib', 'netrc', 'mimetypes',
+    'ssl', '_ssl', 'xmlrpc', 'xml', 'pyexpat',
+    'tracemalloc', 'pydoc', 'doctest', 'unittest', 'pdb', 'difflib',
+    'tarfile', 'bz2', '_bz2',
+    'statistics', 'fractions', 'decimal', '_pydecimal',
+    'ipaddress', 'quopri', 'stringprep',
+    'lib2to3', 'test', 'idlelib', 'turtle', 'turtledemo',
+    # Motor columnar opcional (columnar.py): solo se usa desde la línea de comandos
+    'numpy',
+]
 
 a = Analysis(
     ['main.py'],
@@ -10,29 +32,58 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=excludes,
     noarchive=False,
-    optimize=0,
+    optimize=2,
 )
 pyz = PYZ(a.pure)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.datas,
-    [],
-    name='GeneradorReportes',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
-    console=False,
-    disable_windowed_traceback=False,
-    argv_emulation=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-)
+if ONEDIR:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        name='GeneradorReportes',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=False,
+        console=False,
+        disable_windowed_traceback=False,
+        argv_emulation=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=False,
+        upx=False,
+        upx_exclude=[],
+        name='GeneradorReportes',
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.datas,
+        [],
+        name='GeneradorReportes',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        # Sin UPX: las DLL comprimidas se deben descomprimir en cada arranque
+        upx=False,
+        upx_exclude=[],
+        runtime_tmpdir=None,
+        console=False,
+        disable_windowed_traceback=False,
+        argv_emulation=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+    )
@@ -0,0 +1,170 @@
+"""
+Autocompletado de divisiones para elegir y validar divisiones mientras se escribe.
+
+Dos implementaciones con la misma interfaz y el mismo orden de resultados
+(más colaboradores primero y, a igual peso, orden alfabético):
+
+- TrieTopK: trie sobre el texto normalizado en el que cada nodo guarda sus
+  k mejores completados. Completar recorre solo los caracteres del prefijo
+  y devuelve la lista ya calculada, sin recorrer el subárbol (a diferencia
+  de testChain.Trie.autocomplete), así que el costo por tecla no depende de
+  cuántas divisiones comparten el prefijo.
+- ListaOrdenada: claves normalizadas ordenadas; bisect ubica el rango del
+  prefijo y se eligen los k mejores de ese rango. Menos memoria, pero el
+  costo crece con la cantidad de coincidencias (prefijos cortos).
+
+CatalogoDivisiones reúne las divisiones de un IndiceRegs (ya cargado por la
+precarga o por load_csv) y permite validarlas y consultar su superior.
+"""
+import heapq
+from bisect import bisect_left
+from collections import Counter
+
+from res import CAMPOS_POR_CODIGO
+from testChain import get_superior, normalize_text
+
+K_POR_DEFECTO = 10
+
+def normalizar_prefijo(prefijo):
+    """
+    normalize_text de lo escrito, conservando un espacio final: "DIV. " no
+    debe completar "DIV.CONTABILIDAD".
+    """
+    normal = normalize_text(prefijo)
+    if normal and prefijo[-1:].isspace():
+        normal += " "
+    return normal
+
+def _orden(entrada):
+    # entrada: (clave normalizada, texto original, peso)
+    return (-entrada[2], entrada[0])
+
+class _Completador:
+    """Base común: acumula (texto, peso) por clave normalizada y construye la estructura."""
+    def __init__(self, k=K_POR_DEFECTO):
+        self.k = k
+        self.entradas = {}    # clave normalizada -> (clave, texto original, peso)
+
+    def agregar(self, texto, peso=1):
+        """Agrega un texto con su peso. Textos con la misma normalización suman su peso."""
+        clave = normalize_text(texto)
+        if not clave:
+            return
+        anterior = self.entradas.get(clave)
+        self.entradas[clave] = (clave, anterior[1] if anterior else texto, peso + (anterior[2] if anterior else 0))
+
+    def buscar(self, texto):
+        """Texto original de la entrada con la misma normalización, o None."""
+        entrada = self.entradas.get(normalize_text(texto))
+        return entrada[1] if entrada else None
+
+    def __len__(self):
+        return len(self.entradas)
+
+class _Nodo:
+    __slots__ = ("hijos", "mejores")
+
+    def __init__(self):
+        self.hijos = {}
+        self.mejores = []
+
+class TrieTopK(_Completador):
+    """Trie con los k mejores completados precalculados en cada nodo."""
+    def construir(self):
+        """Construye el trie. Se llama después de agregar todas las entradas."""
+        self.raiz = _Nodo()
+        # Insertadas de mejor a peor, las primeras k que pasan por un nodo son sus k mejores
+        for clave, texto, _ in sorted(self.entradas.values(), key=_orden):
+            nodo = self.raiz
+            if len(nodo.mejores) < self.k:
+                nodo.mejores.append(texto)
+            for ch in clave:
+                hijo = nodo.hijos.get(ch)
+                if hijo is None:
+                    hijo = nodo.hijos[ch] = _Nodo()
+                nodo = hijo
+                if len(nodo.mejores) < self.k:
+                    nodo.mejores.append(texto)
+        return self
+
+    def completar(self, prefijo):
+        """Hasta k textos originales cuya forma normalizada empieza con prefijo."""
+        nodo = self.raiz
+        for ch in normalizar_prefijo(prefijo):
+            nodo = nodo.hijos.get(ch)
+            if nodo is None:
+                return []
+        return list(nodo.mejores)
+
+class ListaOrdenada(_Completador):
+    """Claves normalizadas ordenadas; el rango de cada prefijo se ubica con bisect."""
+    def construir(self):
+        """Ordena las entradas. Se llama después de agregar todas las entradas."""
+        self.ordenadas = sorted(self.entradas.values())
+        self.claves = [entrada[0] for entrada in self.ordenadas]
+        return self
+
+    def completar(self, prefijo):
+        """Hasta k textos originales cuya forma normalizada empieza con prefijo."""
+        normal = normalizar_prefijo(prefijo)
+        inicio = bisect_left(self.claves, normal)
+        # Todas las claves con el prefijo quedan antes de prefijo + el mayor carácter posible
+        fin = bisect_left(self.claves, normal + "\U0010ffff", inicio)
+        mejores = heapq.nsmallest(self.k, self.ordenadas[inicio:fin], key=_orden)
+        return [texto for _, texto, _ in mejores]
+
+# Tipo de completador -> clase
+COMPLETADORES = {
+    "trie": TrieTopK,
+    "lista": ListaOrdenada,
+}
+
+class CatalogoDivisiones:
+    """
+    Divisiones de un archivo de Registros, con su cantidad de colaboradores
+    (códigos distintos) como peso del autocompletado. Cada división se
+    muestra con su forma original más frecuente.
+    """
+    def __init__(self, indice_regs, tipo="trie", k=K_POR_DEFECTO):
+        if tipo not in COMPLETADORES:
+            raise ValueError(f"Completador desconocido: '{tipo}' (válidos: {', '.join(COMPLETADORES)})")
+        self.indice_regs = indice_regs
+        # Campo Division (posición 4) de cada código del índice
+        conteo = Counter(indice_regs.campos_codigo[4::CAMPOS_POR_CODIGO])
+        textos = indice_regs.textos.textos
+        self.completador = COMPLETADORES[tipo](k)
+        for codigo, cantidad in conteo.most_common():
+            self.completador.agregar(textos[codigo], cantidad)
+        self.completador.construir()
+
+    def completar(self, prefijo):
+        """Divisiones que empiezan con prefijo (sin distinguir mayúsculas ni tildes)."""
+        return self.completador.completar(prefijo)
+
+    def sugerir(self, texto):
+        """Completados del prefijo más largo de texto que tiene alguno (para divisiones mal escritas)."""
+        for fin in range(len(texto), -1, -1):
+            sugerencias = self.completar(texto[:fin])
+            if sugerencias:
+                return sugerencias
+        return []
+
+    def validar(self, division):
+        """Nombre de la división tal como figura en Registros, o None si no existe."""
+        return self.completador.buscar(division)
+
+    def superior(self, division):
+        """
+        (puesto superior normalizado, datos) de una división según la
+        jerarquía; datos es [código, Nombre, A.pat, A.mat, E-mail] de la
+        primera persona de Registros con ese puesto en la división, o None.
+        Retorna (None, None) si la división no tiene superior en la jerarquía.
+        """
+        puesto, division_superior = get_superior("", division)
+        if not puesto:
+            return None, None
+        datos = self.indice_regs.buscar_puesto_division(puesto, division_superior)
+        return puesto, datos if datos[0] != "N/A" else None
+
+    def __len__(self):
+        return len(self.completador)
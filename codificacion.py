@@ -0,0 +1,77 @@
+"""
+Codificación por diccionario de los valores repetidos de los archivos.
+
+Divisiones, puestos, nombres y correos se repiten miles de veces entre filas,
+y csv.reader crea un str distinto por cada aparición. TablaTextos asigna a
+cada texto distinto un código entero: los índices guardan tuplas de códigos
+(una sola copia de cada texto) y las comparaciones y búsquedas se hacen sobre
+enteros. La normalización de cada texto se calcula una sola vez por código.
+"""
+import sys
+
+from testChain import normalize_text
+
+class TablaTextos:
+    """Tabla compartida texto <-> código entero."""
+    def __init__(self):
+        self.codigos = {}
+        self.textos = []
+        self._normalizados = {}
+
+    def codificar(self, texto):
+        """Código del texto, asignando uno nuevo si no estaba en la tabla."""
+        codigo = self.codigos.get(texto)
+        if codigo is None:
+            codigo = len(self.textos)
+            self.codigos[texto] = codigo
+            self.textos.append(texto)
+        return codigo
+
+    def buscar(self, texto):
+        """Código del texto, o None si no está en la tabla (no lo agrega)."""
+        return self.codigos.get(texto)
+
+    def normalizado(self, codigo):
+        """Código del texto normalizado (normalize_text), calculado una vez por código."""
+        resultado = self._normalizados.get(codigo)
+        if resultado is None:
+            resultado = self.codificar(normalize_text(self.textos[codigo]))
+            self._normalizados[codigo] = resultado
+        return resultado
+
+    def buscar_normalizado(self, texto):
+        """
+        Código de normalize_text(texto) sin modificar la tabla (seguro para
+        consultas desde varios hilos), o None si no está en la tabla.
+        """
+        codigo = self.codigos.get(texto)
+        if codigo is not None and codigo in self._normalizados:
+            return self._normalizados[codigo]
+        return self.codigos.get(normalize_text(texto))
+
+    def decodificar(self, codigos):
+        """Lista de textos de una tupla de códigos."""
+        textos = self.textos
+        return [textos[c] for c in codigos]
+
+    def __len__(self):
+        return len(self.textos)
+
+# Columnas del archivo AD que usan los reportes y columnas categóricas entre ellas
+COLUMNAS_AD_USADAS = (0, 4, 7, 14, 18, 22)
+COLUMNAS_AD_CATEGORICAS = (14, 22)
+
+def compactar_fila_ad(row):
+    """
+    Fila AD para guardar en memoria: conserva el largo y las columnas usadas,
+    comparte (sys.intern) los valores categóricos (Enabled, fecha de
+    expiración) y vacía el resto.
+    """
+    compacta = [""] * len(row)
+    for i in COLUMNAS_AD_USADAS:
+        if i < len(row):
+            compacta[i] = row[i]
+    for i in COLUMNAS_AD_CATEGORICAS:
+        if i < len(row):
+            compacta[i] = sys.intern(row[i])
+    return compacta
@@ -0,0 +1,369 @@
+"""
+Prueba diferencial de los motores de generación de reportes.
+
+Ejecuta la implementación de referencia (referencia.load_csv_referencia,
+el load_csv original) y cada motor alternativo (índice en memoria, NumPy,
+CuentasAD, join externo, escritura con presupuesto de memoria, varias
+exportaciones) sobre los mismos datos y compara cada CSV mensual fila por
+fila. Los datos son fixtures generados
+(con las particularidades que deben conservarse: códigos y puestos
+repetidos, Sin_fecha, fechas inválidas, responsable arrastrado de la fila
+anterior) y fixtures grabados en la carpeta fixtures/ (una subcarpeta por
+caso con AD.csv y regs.csv).
+
+Cada ejecución corre en un proceso nuevo: la jerarquía y los cachés de un
+motor no favorecen al siguiente, y el pico de memoria medido es solo suyo.
+El informe muestra, junto al resultado de la comparación, el tiempo y la
+memoria de cada motor y su relación con la referencia.
+
+    python equivalencia.py
+    python equivalencia.py --ad AD.csv --regs regs.csv --motores indice,externo
+"""
+import argparse
+import contextlib
+import csv
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import zip_longest
+from multiprocessing import get_context
+
+import columnar
+from escritores import CAMPOS_REPORTE
+from medicion import pico_memoria, texto_memoria
+from multiempresa import procesar_exportaciones
+from referencia import load_csv_referencia
+from res import CuentasAD, directorio_reportes, generar_reportes
+
+DIRECTORIO_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# (mes, anio) comparados por defecto. "Sin" ejercita el filtro de mes por
+# prefijo (selecciona Sin_fecha) y Octubre 2030 un filtro sin registros
+FILTROS = [(None, None), (None, "2026"), ("Enero", "2026"), ("Marzo", None), ("Sin", None), ("Octubre", "2030")]
+
+# Presupuestos mínimos para que el join externo escriba varias corridas y
+# el escritor con presupuesto vuelque varias veces a archivos temporales
+MEMORIA_JOIN_PRUEBA_MB = 0.25
+MEMORIA_ESCRITURA_PRUEBA_MB = 0.05
+
+def _motor_referencia(AD_File, Regs_File, mes, anio, carpeta):
+    try:
+        return load_csv_referencia(AD_File, Regs_File, mes, anio, output_dir=carpeta)
+    except ValueError as e:
+        # Sin registros la referencia falla; los demás motores no generan archivos
+        if not str(e).startswith("No se encontraron registros"):
+            raise
+        return carpeta
+
+def _motor_indice(AD_File, Regs_File, mes, anio, carpeta):
+    return generar_reportes(AD_File, Regs_File, mes, anio, directorio_salida=carpeta)[0]
+
+def _motor_numpy(AD_File, Regs_File, mes, anio, carpeta):
+    return generar_reportes(AD_File, Regs_File, mes, anio, motor="numpy", directorio_salida=carpeta)[0]
+
+def _motor_cuentas_ad(AD_File, Regs_File, mes, anio, carpeta):
+    cuentas = CuentasAD(AD_File)
+    return generar_reportes(AD_File, Regs_File, mes, anio, cuentas_ad=cuentas, directorio_salida=carpeta)[0]
+
+def _motor_externo(AD_File, Regs_File, mes, anio, carpeta):
+    return generar_reportes(
+        AD_File, Regs_File, mes, anio, modo_join="externo",
+        memoria_join_mb=MEMORIA_JOIN_PRUEBA_MB, directorio_salida=carpeta
+    )[0]
+
+def _motor_presupuesto(AD_File, Regs_File, mes, anio, carpeta):
+    return generar_reportes(AD_File, Regs_File, mes, anio, memoria_mb=MEMORIA_ESCRITURA_PRUEBA_MB, directorio_salida=carpeta)[0]
+
+def _motor_multiempresa(AD_File, Regs_File, mes, anio, carpeta):
+    resultado, = procesar_exportaciones([AD_File], Regs_File, mes, anio, directorio_base=carpeta, ejecutor="hilos")
+    if resultado["error"]:
+        raise RuntimeError(resultado["error"])
+    return os.path.join(carpeta, resultado["exportacion"], directorio_reportes(mes, anio))
+
+# Nombre -> función (AD_File, Regs_File, mes, anio, carpeta) que genera los
+# CSV mensuales y retorna la carpeta donde quedaron
+MOTORES = {
+    "referencia": _motor_referencia,
+    "indice": _motor_indice,
+    "numpy": _motor_numpy,
+    "cuentas_ad": _motor_cuentas_ad,
+    "externo": _motor_externo,
+    "presupuesto": _motor_presupuesto,
+    "multiempresa": _motor_multiempresa,
+}
+
+def motores_disponibles():
+    """Motores alternativos que se pueden ejecutar en esta instalación."""
+    return [m for m in MOTORES if m != "referencia" and (m != "numpy" or columnar.disponible())]
+
+def _ejecutar_motor(motor, AD_File, Regs_File, mes, anio, carpeta):
+    """
+    Ejecuta un motor en el proceso actual. Retorna (carpeta, error, segundos,
+    memoria), con memoria el aumento del pico de RSS durante la ejecución.
+    """
+    base = pico_memoria()
+    inicio = time.perf_counter()
+    error = None
+    try:
+        # Los mensajes de progreso de los motores no forman parte del informe
+        with contextlib.redirect_stdout(io.StringIO()):
+            carpeta = MOTORES[motor](AD_File, Regs_File, mes, anio, carpeta)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    segundos = time.perf_counter() - inicio
+    pico = pico_memoria()
+    memoria = pico - base if pico is not None and base is not None else None
+    return carpeta, error, segundos, memoria
+
+def ejecutar_aislado(motor, AD_File, Regs_File, mes, anio, carpeta):
+    """_ejecutar_motor en un proceso nuevo (spawn), sin estado de ejecuciones previas."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(_ejecutar_motor, motor, AD_File, Regs_File, mes, anio, carpeta).result()
+
+def leer_reportes(carpeta):
+    """{nombre: contenido en bytes} de los CSV de una carpeta de reportes (vacío si no existe)."""
+    if not os.path.isdir(carpeta):
+        return {}
+    contenido = {}
+    for nombre in sorted(os.listdir(carpeta)):
+        if nombre.endswith(".csv"):
+            with open(os.path.join(carpeta, nombre), "rb") as f:
+                contenido[nombre] = f.read()
+    return contenido
+
+def _filas(contenido):
+    return list(csv.reader(io.StringIO(contenido.decode("utf-8", errors="replace"), newline=""), delimiter=";"))
+
+def _diferencia_fila(nombre, numero, esperada, obtenida):
+    if esperada is None:
+        return f"{nombre} fila {numero}: fila de más {obtenida}"
+    if obtenida is None:
+        return f"{nombre} fila {numero}: falta la fila {esperada}"
+    encabezado = CAMPOS_REPORTE if len(esperada) == len(CAMPOS_REPORTE) else range(len(esperada))
+    columnas = [
+        f"{campo}: {a!r} != {b!r}"
+        for campo, a, b in zip_longest(encabezado, esperada, obtenida)
+        if a != b
+    ]
+    return f"{nombre} fila {numero}: " + "; ".join(columnas)
+
+def diferencias(esperado, obtenido, maximo=5):
+    """
+    Diferencias entre dos carpetas leídas con leer_reportes, como líneas de
+    texto: archivos faltantes o de más y, por archivo, hasta `maximo` filas
+    distintas (numeradas desde 1, incluido el encabezado).
+    """
+    resultado = []
+    for nombre in sorted(set(esperado) | set(obtenido)):
+        if nombre not in obtenido:
+            resultado.append(f"falta el archivo {nombre}")
+        elif nombre not in esperado:
+            resultado.append(f"archivo de más {nombre}")
+        elif esperado[nombre] != obtenido[nombre]:
+            filas_esperadas, filas_obtenidas = _filas(esperado[nombre]), _filas(obtenido[nombre])
+            distintas = [
+                _diferencia_fila(nombre, n, a, b)
+                for n, (a, b) in enumerate(zip_longest(filas_esperadas, filas_obtenidas), 1)
+                if a != b
+            ]
+            if not distintas:
+                resultado.append(f"{nombre}: mismas filas con distinto formato (comillas o fin de línea)")
+            resultado.extend(distintas[:maximo])
+            if len(distintas) > maximo:
+                resultado.append(f"{nombre}: {len(distintas) - maximo} filas distintas más")
+    return resultado
+
+def comparar_motores(AD_File, Regs_File, filtros=FILTROS, motores=None, directorio=None):
+    """
+    Ejecuta la referencia y cada motor para cada (mes, anio) de filtros y
+    compara sus reportes. Retorna una lista de dicts por ejecución con
+    filtro, motor, error, segundos, memoria, archivos, filas y diferencias
+    (lista vacía si el resultado es idéntico al de la referencia). Si la
+    referencia y el motor fallan ambos se consideran equivalentes.
+    """
+    motores = motores_disponibles() if motores is None else motores
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix="gr_equivalencia_", dir=directorio) as tmp:
+        for n, (mes, anio) in enumerate(filtros):
+            referencia = None
+            for motor in ["referencia"] + list(motores):
+                carpeta = os.path.join(tmp, f"{n}_{motor}")
+                carpeta, error, segundos, memoria = ejecutar_aislado(motor, AD_File, Regs_File, mes, anio, carpeta)
+                reportes = leer_reportes(carpeta)
+                resultado = {
+                    "filtro": (mes, anio), "motor": motor, "error": error,
+                    "segundos": segundos, "memoria": memoria, "archivos": len(reportes),
+                    "filas": sum(len(_filas(c)) - 1 for c in reportes.values()),
+                    "diferencias": [],
+                }
+                if referencia is None:
+                    referencia = (error, reportes)
+                elif (error is None) != (referencia[0] is None):
+                    resultado["diferencias"] = [f"referencia: {referencia[0] or 'sin error'}; {motor}: {error or 'sin error'}"]
+                elif error is None:
+                    resultado["diferencias"] = diferencias(referencia[1], reportes)
+                resultados.append(resultado)
+            shutil.rmtree(tmp, ignore_errors=True)
+            os.makedirs(tmp, exist_ok=True)
+    return resultados
+
+def _texto_filtro(mes, anio):
+    return f"{mes or 'Todos'} {anio or '(todos los años)'}"
+
+def imprimir_informe(resultados):
+    """Tabla por filtro: tiempo, memoria, relación con la referencia y resultado de cada motor."""
+    referencia = None
+    for r in resultados:
+        if r["motor"] == "referencia":
+            referencia = r
+            print(f"\nFiltro: {_texto_filtro(*r['filtro'])}")
+            print(f"  {'Motor':<14}{'Segundos':>10}{'Speedup':>10}{'Memoria':>12}{'Relación':>10}  Resultado")
+        speedup = referencia["segundos"] / r["segundos"] if r["segundos"] else 0
+        if r["memoria"] is not None and referencia["memoria"]:
+            relacion = f"{r['memoria'] / referencia['memoria']:.2f}"
+        else:
+            relacion = "n/d"
+        if r["motor"] == "referencia":
+            estado = f"ERROR {r['error']}" if r["error"] else f"{r['archivos']} archivos, {r['filas']} filas"
+        elif r["diferencias"]:
+            estado = f"DISTINTO ({len(r['diferencias'])} diferencias)"
+        else:
+            estado = "ambos fallan" if r["error"] else "idéntico"
+        print(f"  {r['motor']:<14}{r['segundos']:>10.2f}{speedup:>9.1f}x{texto_memoria(r['memoria']):>12}{relacion:>10}  {estado}")
+        for linea in r["diferencias"]:
+            print(f"      {linea}")
+
+def fixtures_grabados(directorio=DIRECTORIO_FIXTURES):
+    """[(nombre, AD.csv, regs.csv)] de cada subcarpeta de fixtures con ambos archivos."""
+    if not os.path.isdir(directorio):
+        return []
+    casos = []
+    for nombre in sorted(os.listdir(directorio)):
+        ad, regs = os.path.join(directorio, nombre, "AD.csv"), os.path.join(directorio, nombre, "regs.csv")
+        if os.path.isfile(ad) and os.path.isfile(regs):
+            casos.append((nombre, ad, regs))
+    return casos
+
+DIVISIONES = [
+    "DIV.CONTABILIDAD", "Div.Contabilidad", "TRIBU PAGOS", "VP.RIESGOS", "GERENCIA GENERAL",
+    "DIV. TRANSFORMACIÓN BANCA COMERCIAL Y MDC", "DIV. TRANSFORMACION BANCA COMERCIAL Y MDC",
+    "DIV. CIBERSEGURIDAD", "SIN JERARQUIA", "",
+]
+PUESTOS = [
+    "ANALISTA", "ANALISTA", "JEFE", "GERENTE DE DIVISION", "GERENTE DE DIVISIÓN", "gerente de division",
+    "LIDER DE TRIBU", "VICE PRESIDENTE EJECUTIVO", "GERENTE GENERAL", "",
+]
+
+def generar_fixture(directorio, registros=800, cuentas=2000, semilla=1):
+    """
+    Escribe directorio/regs.csv y directorio/AD.csv con datos aleatorios
+    reproducibles que cubren las particularidades de load_csv. Retorna
+    (AD_File, Regs_File).
+    """
+    rnd = random.Random(semilla)
+    os.makedirs(directorio, exist_ok=True)
+    regs_file, ad_file = os.path.join(directorio, "regs.csv"), os.path.join(directorio, "AD.csv")
+    # Códigos en un rango menor que la cantidad de filas: hay repetidos y gana el primero
+    codigos = range(10000, 10000 + max(1, registros // 2))
+
+    with open(regs_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow([f"h{i}" for i in range(36)])
+        for i in range(registros):
+            row = [""] * 36
+            row[1] = rnd.choice(["Juan", "María", "Pedro", "Ñuño"])
+            row[2] = rnd.choice(["Pérez", "Ruiz"])
+            row[3] = "N/A" if rnd.random() < 0.02 else rnd.choice(["Gómez", "Díaz"])
+            row[10], row[11] = rnd.choice(PUESTOS), rnd.choice(DIVISIONES)
+            row[25] = rnd.choice("SSBs") + str(rnd.choice(codigos))
+            row[34] = f"u{i}@x.com"
+            x = rnd.random()
+            # Filas cortas: sin correo, o sin código (no participan en las búsquedas)
+            writer.writerow(row[:30] if x < 0.05 else row[:20] if x < 0.07 else row)
+
+    with open(ad_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["SamAccountName"] + [f"c{i}" for i in range(1, 23)])
+        anterior = None
+        for i in range(cuentas):
+            row = [""] * 23
+            row[0] = rnd.choice([f"X{i}", f"X{i}", f"X{i}", f"Y{i}", f"x{i}", "XABC"])
+            row[4] = rnd.choice([f"Cuenta {i}", f"Cuenta; \"{i}\"", f"Cuenta\n{i}", f"Ñandú {i}"])
+            row[14] = rnd.choice(["True", "True", "True", "False", "TRUE"])
+            row[18] = "01/01/2020 10:00:00"
+            x = rnd.random()
+            if x < 0.05:
+                row[22] = ""
+            elif x < 0.07:
+                row[22] = "basura"
+            elif x < 0.08:
+                row[22] = "31/02/2026 00:00:00"
+            else:
+                hora = rnd.choice([" 00:00:00", " 23:59:59", ""])
+                row[22] = f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/{rnd.choice([2025, 2026, 2027])}{hora}"
+            codigo = str(rnd.randint(codigos[0], codigos[-1] + 20))
+            y = rnd.random()
+            if anterior is not None and y < 0.06:
+                # Sin "Resp": el responsable se arrastra de la cuenta anterior, que
+                # tiene la misma fecha y por lo tanto pasa los mismos filtros
+                row[0], row[14], row[22] = f"X{i}", "True", anterior[22]
+                row[7] = rnd.choice(["Cuenta de servicio", "resp: S" + codigo])
+            elif y < 0.09:
+                row[7] = "Resp sin codigo"
+            else:
+                row[7] = rnd.choice([f"Cuenta de servicio Resp: {rnd.choice('SBsb')}{codigo} - proy", f"Resp. {rnd.choice('SB')}{codigo}", f"Resp|{rnd.choice('sb')}{codigo},app"])
+            if row[0].startswith("X") and row[0] != "XABC" and row[14] == "True":
+                anterior = row
+            writer.writerow(row)
+    return ad_file, regs_file
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los reportes de cada motor con la implementación de referencia")
+    parser.add_argument("--ad", help="archivo AD grabado a comparar (junto con --regs)")
+    parser.add_argument("--regs", help="archivo de Registros grabado a comparar (junto con --ad)")
+    parser.add_argument("--fixtures", default=DIRECTORIO_FIXTURES, help="carpeta de fixtures grabados (por defecto: %(default)s)")
+    parser.add_argument("--registros", type=int, default=800, help="filas de Registros del fixture generado (por defecto: %(default)s)")
+    parser.add_argument("--cuentas", type=int, default=2000, help="cuentas AD del fixture generado (por defecto: %(default)s)")
+    parser.add_argument("--semilla", type=int, default=1, help="semilla del fixture generado (por defecto: %(default)s)")
+    parser.add_argument("--sin-generado", action="store_true", help="no generar fixture aleatorio")
+    parser.add_argument("--motores", help=f"motores separados por comas (por defecto, los disponibles: {','.join(motores_disponibles())})")
+    args = parser.parse_args()
+    if bool(args.ad) != bool(args.regs):
+        parser.error("--ad y --regs se indican juntos")
+
+    motores = args.motores.split(",") if args.motores else motores_disponibles()
+    for motor in motores:
+        if motor not in MOTORES or motor == "referencia":
+            parser.error(f"Motor desconocido: '{motor}' (válidos: {', '.join(m for m in MOTORES if m != 'referencia')})")
+
+    print("=" * 80)
+    print("PRUEBA DIFERENCIAL DE MOTORES")
+    print("=" * 80)
+
+    diferentes = 0
+    with tempfile.TemporaryDirectory(prefix="gr_fixture_") as tmp:
+        casos = fixtures_grabados(args.fixtures)
+        if args.ad:
+            casos.append((f"{args.ad} + {args.regs}", args.ad, args.regs))
+        if not args.sin_generado:
+            ad, regs = generar_fixture(tmp, args.registros, args.cuentas, args.semilla)
+            casos.append((f"generado (semilla {args.semilla}, {args.registros} Registros, {args.cuentas} cuentas AD)", ad, regs))
+
+        for nombre, ad, regs in casos:
+            print(f"\nFixture: {nombre}")
+            resultados = comparar_motores(ad, regs, motores=motores)
+            imprimir_informe(resultados)
+            diferentes += sum(1 for r in resultados if r["diferencias"])
+
+    print("\n" + "=" * 80)
+    print("TODOS LOS MOTORES SON EQUIVALENTES" if diferentes == 0 else f"{diferentes} EJECUCIONES CON DIFERENCIAS")
+    print("=" * 80)
+    if diferentes:
+        exit(1)
+
+if __name__ == "__main__":
+    main()
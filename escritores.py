@@ -0,0 +1,349 @@
+"""
+Escritura de reportes particionados.
+
+Cada fila enriquecida se enruta, durante la misma pasada de load_csv, al
+archivo que le corresponde según las claves de partición elegidas
+(mes, division, gerente, responsable o combinaciones), en el formato de
+salida elegido: CSV (opcionalmente comprimido con gzip o xz), JSON Lines o
+un único archivo SQLite indexado.
+
+Con un presupuesto de memoria (EscritorConPresupuesto) las filas se agrupan
+por partición antes de escribirse, volcándose a archivos temporales cuando
+superan el presupuesto.
+"""
+import csv
+import gzip
+import json
+import lzma
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+from collections import OrderedDict
+
+from medicion import BYTES_POR_CAMPO
+
+CAMPOS_REPORTE = ["SamAccountName", "DisplayName", "Responsable", "NombreResponsable", "CorreoResponsable", "Gerente", "NombreGerente", "CorreoGerente", "Division", "Enabled", "whenCreated", "AccountExpires"]
+
+# Clave de partición -> campo del registro enriquecido (None = mes_key)
+CLAVES_PARTICION = {
+    "mes": None,
+    "division": "Division",
+    "gerente": "Gerente",
+    "responsable": "Responsable",
+}
+
+def parsear_particiones(texto):
+    """Convierte 'mes,gerente' en ('mes', 'gerente') validando cada clave."""
+    claves = tuple(c.strip().lower() for c in texto.split(",") if c.strip())
+    if not claves:
+        raise ValueError("Debe indicar al menos una clave de partición")
+    for clave in claves:
+        if clave not in CLAVES_PARTICION:
+            raise ValueError(f"Clave de partición desconocida: '{clave}' (válidas: {', '.join(CLAVES_PARTICION)})")
+    return claves
+
+def _limpiar_nombre(valor):
+    """Reemplaza caracteres no válidos en nombres de archivo de Windows."""
+    valor = re.sub(r'[<>:"/\\|?*]+', '-', valor).strip(" .")
+    return valor or "Sin_valor"
+
+def clave_archivo(nombre):
+    """
+    Clave con la que se identifica el archivo de una partición. En Windows
+    (y macOS) los nombres que solo difieren en mayúsculas, como
+    "DIV.CONTABILIDAD" y "Div.Contabilidad", son el mismo archivo: sus
+    filas deben ir a una sola partición.
+    """
+    return nombre.casefold()
+
+def nombre_particion(particiones, mes_key, registro):
+    """Nombre de archivo (sin extensión) de la partición de un registro."""
+    partes = []
+    for clave in particiones:
+        campo = CLAVES_PARTICION[clave]
+        partes.append(mes_key if campo is None else _limpiar_nombre(registro[campo]))
+    return "_".join(partes)
+
+class ArchivoCSV:
+    """Archivo de reporte CSV separado por ';' (formato original)."""
+    extension = ".csv"
+
+    def __init__(self, ruta, fieldnames, nuevo):
+        self.archivo = self._abrir(ruta, 'w' if nuevo else 'a')
+        self.writer = csv.DictWriter(self.archivo, fieldnames=fieldnames, delimiter=';')
+        if nuevo:
+            self.writer.writeheader()
+
+    def _abrir(self, ruta, modo):
+        return open(ruta, mode=modo, newline='', encoding="utf-8")
+
+    def escribir(self, registro):
+        self.writer.writerow(registro)
+
+    def cerrar(self):
+        self.archivo.close()
+
+class ArchivoCSVGzip(ArchivoCSV):
+    """CSV comprimido con gzip. Al reabrir se agrega un nuevo miembro gzip."""
+    extension = ".csv.gz"
+
+    def _abrir(self, ruta, modo):
+        return gzip.open(ruta, mode=modo + 't', newline='', encoding="utf-8")
+
+class ArchivoCSVXz(ArchivoCSV):
+    """CSV comprimido con xz. Al reabrir se agrega un nuevo stream xz."""
+    extension = ".csv.xz"
+
+    def _abrir(self, ruta, modo):
+        return lzma.open(ruta, mode=modo + 't', newline='', encoding="utf-8")
+
+class ArchivoJSONL:
+    """Un objeto JSON por línea con los mismos campos del CSV."""
+    extension = ".jsonl"
+
+    def __init__(self, ruta, fieldnames, nuevo):
+        self.fieldnames = fieldnames
+        self.archivo = open(ruta, mode='w' if nuevo else 'a', newline='', encoding="utf-8")
+
+    def escribir(self, registro):
+        fila = {campo: registro.get(campo, "") for campo in self.fieldnames}
+        self.archivo.write(json.dumps(fila, ensure_ascii=False) + "\n")
+
+    def cerrar(self):
+        self.archivo.close()
+
+class PoolEscritores:
+    """
+    Conjunto de escritores, un archivo por partición, con un máximo de archivos
+    abiertos a la vez. Al superarlo se cierra el usado hace más tiempo (LRU);
+    si vuelve a recibir filas se reabre en modo append sin repetir el encabezado.
+    """
+    def __init__(self, output_dir, fieldnames=CAMPOS_REPORTE, max_abiertos=64, tipo_archivo=ArchivoCSV):
+        self.output_dir = output_dir
+        self.fieldnames = fieldnames
+        self.max_abiertos = max(1, max_abiertos)
+        self.tipo_archivo = tipo_archivo
+        self.abiertos = OrderedDict()   # nombre -> archivo abierto
+        self.conteos = {}               # nombre -> filas escritas, en orden de creación
+        self.nombres = {}               # clave_archivo -> primer nombre recibido de la partición
+
+    def ruta(self, nombre):
+        return os.path.join(self.output_dir, nombre + self.tipo_archivo.extension)
+
+    def descripcion(self, nombre):
+        return self.ruta(nombre)
+
+    def _obtener(self, nombre):
+        if nombre in self.abiertos:
+            self.abiertos.move_to_end(nombre)
+            return self.abiertos[nombre]
+
+        if len(self.abiertos) >= self.max_abiertos:
+            _, archivo = self.abiertos.popitem(last=False)
+            archivo.cerrar()
+
+        nuevo = nombre not in self.conteos
+        archivo = self.tipo_archivo(self.ruta(nombre), self.fieldnames, nuevo)
+        if nuevo:
+            self.conteos[nombre] = 0
+        self.abiertos[nombre] = archivo
+        return archivo
+
+    def escribir(self, nombre, registro):
+        nombre = self.nombres.setdefault(clave_archivo(nombre), nombre)
+        self._obtener(nombre).escribir(registro)
+        self.conteos[nombre] += 1
+
+    def cerrar_particion(self, nombre):
+        """Cierra el archivo de una partición (si está abierto); se reabre si recibe más filas."""
+        archivo = self.abiertos.pop(self.nombres.get(clave_archivo(nombre), nombre), None)
+        if archivo is not None:
+            archivo.cerrar()
+
+    def cerrar(self):
+        while self.abiertos:
+            _, archivo = self.abiertos.popitem(last=False)
+            archivo.cerrar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+class EscritorSQLite:
+    """
+    Escribe todas las particiones en un único archivo SQLite (reportes.sqlite),
+    tabla reportes con una columna particion adicional. Los índices sobre
+    SamAccountName, Division, Gerente y particion se crean al cerrar, después
+    de la carga masiva.
+    """
+    NOMBRE_ARCHIVO = "reportes.sqlite"
+    TAMANO_LOTE = 1000
+
+    def __init__(self, output_dir, fieldnames=CAMPOS_REPORTE):
+        self.output_dir = output_dir
+        self.fieldnames = fieldnames
+        self.conteos = {}
+        self.lote = []
+        self.ruta_db = os.path.join(output_dir, self.NOMBRE_ARCHIVO)
+        if os.path.exists(self.ruta_db):
+            os.remove(self.ruta_db)
+
+        self.conexion = sqlite3.connect(self.ruta_db)
+        # El archivo se genera desde cero: no se necesita journal durante la carga
+        self.conexion.execute("PRAGMA journal_mode=OFF")
+        self.conexion.execute("PRAGMA synchronous=OFF")
+        columnas = ", ".join(f'"{campo}" TEXT' for campo in fieldnames)
+        self.conexion.execute(f"CREATE TABLE reportes (particion TEXT, {columnas})")
+        marcadores = ", ".join("?" for _ in range(len(fieldnames) + 1))
+        self.sql_insertar = f"INSERT INTO reportes VALUES ({marcadores})"
+
+    def ruta(self, nombre):
+        return self.ruta_db
+
+    def descripcion(self, nombre):
+        return f"{self.ruta_db} [particion {nombre}]"
+
+    def cerrar_particion(self, nombre):
+        pass
+
+    def _volcar_lote(self):
+        if self.lote:
+            self.conexion.executemany(self.sql_insertar, self.lote)
+            self.lote = []
+
+    def escribir(self, nombre, registro):
+        self.lote.append([nombre] + [registro.get(campo, "") for campo in self.fieldnames])
+        if len(self.lote) >= self.TAMANO_LOTE:
+            self._volcar_lote()
+        self.conteos[nombre] = self.conteos.get(nombre, 0) + 1
+
+    def cerrar(self):
+        if self.conexion is None:
+            return
+        self._volcar_lote()
+        for campo in ("SamAccountName", "Division", "Gerente", "particion"):
+            if campo == "particion" or campo in self.fieldnames:
+                self.conexion.execute(f'CREATE INDEX IF NOT EXISTS idx_reportes_{campo} ON reportes ("{campo}")')
+        self.conexion.commit()
+        self.conexion.close()
+        self.conexion = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+class EscritorConPresupuesto:
+    """
+    Agrupa las filas de cada partición en memoria y las entrega al escritor
+    al cerrar, partición por partición, de modo que cada archivo de salida
+    se abre una sola vez y solo uno está abierto a la vez.
+    Cuando las filas acumuladas superan presupuesto_bytes, se vuelcan a un
+    archivo temporal por partición; al cerrar, cada partición se escribe con
+    su archivo temporal seguido de las filas que quedaron en memoria, en el
+    orden original. La memoria usada queda acotada por el presupuesto.
+    """
+    def __init__(self, escritor, presupuesto_bytes, fieldnames=CAMPOS_REPORTE):
+        self.escritor = escritor
+        self.presupuesto_bytes = presupuesto_bytes
+        self.fieldnames = fieldnames
+        self.particiones = {}       # nombre -> filas en memoria, en orden de creación
+        self.conteos = {}           # nombre -> filas recibidas, en orden de creación
+        self.nombres = {}           # clave_archivo -> primer nombre recibido de la partición
+        self.bytes_buffer = 0
+        self.volcados = 0
+        self.directorio = None
+        self.temporales = {}        # nombre -> archivo temporal con las filas volcadas
+
+    def descripcion(self, nombre):
+        return self.escritor.descripcion(nombre)
+
+    def escribir(self, nombre, registro):
+        fila = [registro.get(campo, "") for campo in self.fieldnames]
+        # Mismas particiones que escribiría el escritor directo, en el mismo orden
+        nombre = self.nombres.setdefault(clave_archivo(nombre), nombre)
+        filas = self.particiones.get(nombre)
+        if filas is None:
+            filas = self.particiones[nombre] = []
+            self.conteos.setdefault(nombre, 0)
+        filas.append(fila)
+        self.conteos[nombre] += 1
+        self.bytes_buffer += sum(len(c) for c in fila) + BYTES_POR_CAMPO * len(fila)
+        if self.bytes_buffer >= self.presupuesto_bytes:
+            self._volcar()
+
+    def _volcar(self):
+        """Agrega las filas en memoria de cada partición a su archivo temporal."""
+        if self.directorio is None:
+            self.directorio = tempfile.mkdtemp(prefix="gr_volcado_")
+        for nombre, filas in self.particiones.items():
+            ruta = self.temporales.setdefault(nombre, os.path.join(self.directorio, f"{len(self.temporales)}.csv"))
+            with open(ruta, "a", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerows(filas)
+        self.particiones = {}
+        self.bytes_buffer = 0
+        self.volcados += 1
+
+    def _filas(self, nombre):
+        ruta = self.temporales.get(nombre)
+        if ruta is not None:
+            with open(ruta, newline="", encoding="utf-8") as f:
+                yield from csv.reader(f)
+        yield from self.particiones.pop(nombre, ())
+
+    def _descartar_temporales(self):
+        if self.directorio is not None:
+            shutil.rmtree(self.directorio, ignore_errors=True)
+            self.directorio = None
+
+    def cerrar(self):
+        try:
+            with self.escritor:
+                for nombre in self.conteos:
+                    for fila in self._filas(nombre):
+                        self.escritor.escribir(nombre, dict(zip(self.fieldnames, fila)))
+                    # Un solo archivo abierto a la vez (cada compresor xz reserva decenas de MB)
+                    self.escritor.cerrar_particion(nombre)
+        finally:
+            self._descartar_temporales()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.cerrar()
+        else:
+            # Con error no se escribe lo acumulado: solo se liberan los archivos
+            self.escritor.cerrar()
+            self._descartar_temporales()
+
+# Formato de salida -> tipo de archivo por partición (None = SQLite de archivo único)
+FORMATOS = {
+    "csv": ArchivoCSV,
+    "csv.gz": ArchivoCSVGzip,
+    "csv.xz": ArchivoCSVXz,
+    "jsonl": ArchivoJSONL,
+    "sqlite": None,
+}
+
+def crear_escritor(formato, output_dir, fieldnames=CAMPOS_REPORTE, max_abiertos=64, memoria_mb=None):
+    """
+    Crea el escritor de reportes para el formato indicado. Con memoria_mb
+    las filas se agrupan por partición con ese presupuesto de memoria
+    (ver EscritorConPresupuesto); sin él se escriben a medida que llegan.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de salida desconocido: '{formato}' (válidos: {', '.join(FORMATOS)})")
+    if FORMATOS[formato] is None:
+        escritor = EscritorSQLite(output_dir, fieldnames)
+    else:
+        escritor = PoolEscritores(output_dir, fieldnames, max_abiertos, tipo_archivo=FORMATOS[formato])
+    if memoria_mb is None:
+        return escritor
+    return EscritorConPresupuesto(escritor, max(1, int(memoria_mb * 1024 * 1024)), fieldnames)
@@ -0,0 +1,53 @@
+"""
+Índice de cuentas ordenado por fecha de expiración (AccountExpires).
+
+Permite consultar ventanas arbitrarias de fechas ("cuentas que expiran en los
+próximos 30 días", un rango personalizado, etc.) con bisect en
+O(log n + k), en lugar de volver a recorrer todo el archivo AD.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+
+FORMATO_FECHA = "%d/%m/%Y"
+
+def parsear_fecha(texto):
+    """Convierte 'dd/mm/aaaa' (mismo formato que el archivo AD) en date."""
+    return datetime.strptime(texto.strip(), FORMATO_FECHA).date()
+
+def ventana_proximos(dias, hoy=None):
+    """
+    (desde, hasta), ambos inclusive, para las cuentas que expiran en los
+    próximos `dias` días contando hoy: con 7, de hoy a hoy + 6.
+    """
+    if dias < 1:
+        raise ValueError("La cantidad de días debe ser al menos 1")
+    hoy = hoy or date.today()
+    return hoy, hoy + timedelta(days=dias - 1)
+
+class IndiceExpiracion:
+    """
+    Posiciones de cuentas ordenadas por fecha de expiración. Las cuentas sin
+    fecha válida (Sin_fecha) no forman parte del índice.
+    """
+    def __init__(self, cuentas):
+        """cuentas: lista de (mes_key, fecha, row) como en CuentasAD.cuentas."""
+        pares = sorted(
+            (fecha.toordinal(), posicion)
+            for posicion, (_, fecha, _) in enumerate(cuentas)
+            if fecha is not None
+        )
+        self.ordinales = [o for o, _ in pares]
+        self.posiciones = [p for _, p in pares]
+
+    def __len__(self):
+        return len(self.posiciones)
+
+    def rango(self, desde=None, hasta=None):
+        """
+        Posiciones de las cuentas que expiran entre desde y hasta (ambos
+        inclusive; None = sin límite), ordenadas por fecha de expiración y,
+        a igual fecha, por orden en el archivo.
+        """
+        inicio = 0 if desde is None else bisect_left(self.ordinales, desde.toordinal())
+        fin = len(self.ordinales) if hasta is None else bisect_right(self.ordinales, hasta.toordinal())
+        return self.posiciones[inicio:fin]
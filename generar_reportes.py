@@ -1,38 +1,180 @@
 """
 Script de prueba directo para generar reportes
 """
-from res import load_csv
+import argparse
 import os
+import time
+from res import IndiceRegs, load_csv
+from autocompletado import CatalogoDivisiones
+from multiempresa import procesar_exportaciones
+from medicion import pico_memoria, texto_memoria
+from escritores import FORMATOS
+from expiracion import parsear_fecha, ventana_proximos
 
-print("=" * 80)
-print("GENERANDO REPORTES DE ENERO 2026")
-print("=" * 80)
+def main():
+    parser = argparse.ArgumentParser(description="Genera los reportes de cuentas AD")
+    parser.add_argument(
+        "--ad", nargs="+", default=["AD-06-01-26.csv"],
+        help="archivo AD; con varios archivos se procesan en paralelo contra el mismo archivo de Registros (por defecto: %(default)s)"
+    )
+    parser.add_argument("--regs", default="regs.csv", help="archivo de Registros (por defecto: %(default)s)")
+    parser.add_argument("--mes", default="Enero", help="mes a procesar o 'Todos' (por defecto: %(default)s)")
+    parser.add_argument("--anio", default="2026", help="año a procesar (por defecto: %(default)s)")
+    parser.add_argument("--desde", help="fecha inicial de expiración dd/mm/aaaa (reemplaza --mes y --anio)")
+    parser.add_argument("--hasta", help="fecha final de expiración dd/mm/aaaa, inclusive (reemplaza --mes y --anio)")
+    parser.add_argument("--proximos", type=int, metavar="DIAS", help="cuentas que expiran en los próximos DIAS días, contando hoy")
+    parser.add_argument(
+        "--particion", default="mes",
+        help="claves separadas por comas para separar los archivos: mes, division, gerente, responsable (por defecto: %(default)s)"
+    )
+    parser.add_argument(
+        "--formato", default="csv", choices=list(FORMATOS),
+        help="formato de salida (por defecto: %(default)s)"
+    )
+    parser.add_argument(
+        "--motor", default="python", choices=["python", "numpy"],
+        help="motor de filtrado de cuentas AD; numpy requiere NumPy instalado (por defecto: %(default)s)"
+    )
+    parser.add_argument(
+        "--join", default="indice", choices=["indice", "externo"],
+        help="cruce con Registros: índice en memoria o ordenamiento externo con memoria acotada (por defecto: %(default)s)"
+    )
+    parser.add_argument("--memoria-join-mb", type=float, default=64, help="presupuesto de memoria del join externo en MB (por defecto: %(default)s)")
+    parser.add_argument(
+        "--memoria-mb", type=float,
+        help="presupuesto de memoria en MB para las filas pendientes de escribir; al superarlo se vuelcan a archivos temporales (por defecto: se escriben a medida que se generan)"
+    )
+    parser.add_argument(
+        "--division", action="append", metavar="DIVISION",
+        help="genera solo las cuentas de esta división; se puede repetir (por defecto: todas)"
+    )
+    parser.add_argument("--max-archivos-abiertos", type=int, default=64, help="máximo de archivos de salida abiertos a la vez")
+    parser.add_argument(
+        "--salida", default="reportes_exportaciones",
+        help="con varios archivos AD: carpeta con una subcarpeta por exportación y resumen.csv (por defecto: %(default)s)"
+    )
+    parser.add_argument(
+        "--ejecutor", default="procesos", choices=["hilos", "procesos"],
+        help="con varios archivos AD: pool de procesos o de hilos (por defecto: %(default)s)"
+    )
+    parser.add_argument("--trabajadores", type=int, help="con varios archivos AD: tamaño del pool (por defecto: uno por archivo, hasta la cantidad de núcleos)")
+    args = parser.parse_args()
 
-# Archivos de entrada
-ad_file = "AD-06-01-26.csv"
-regs_file = "regs.csv"
+    mes = None if args.mes == "Todos" else args.mes
+    anio = args.anio
 
-# Verificar que existan
-if not os.path.exists(ad_file):
-    print(f"ERROR: No se encuentra el archivo {ad_file}")
-    exit(1)
+    # Ventana de fechas de expiración en lugar de mes y año
+    fechas = {}
+    for opcion in ("desde", "hasta"):
+        texto = getattr(args, opcion)
+        try:
+            fechas[opcion] = parsear_fecha(texto) if texto else None
+        except ValueError:
+            parser.error(f"--{opcion}: fecha no válida '{texto}' (use dd/mm/aaaa)")
+    desde, hasta = fechas["desde"], fechas["hasta"]
+    if desde and hasta and desde > hasta:
+        parser.error("--desde es posterior a --hasta")
+    if args.proximos is not None:
+        if desde or hasta:
+            parser.error("--proximos no se puede combinar con --desde/--hasta")
+        if args.proximos < 1:
+            parser.error("--proximos debe ser al menos 1")
+        desde, hasta = ventana_proximos(args.proximos)
+    por_rango = desde is not None or hasta is not None
+    if por_rango:
+        mes = anio = None
+        periodo = " - ".join(f.strftime("%d/%m/%Y") if f else "..." for f in (desde, hasta))
+    else:
+        periodo = f"{args.mes} {args.anio}"
 
-if not os.path.exists(regs_file):
-    print(f"ERROR: No se encuentra el archivo {regs_file}")
-    exit(1)
+    print("=" * 80)
+    print(f"GENERANDO REPORTES DE {periodo.upper()}")
+    print("=" * 80)
 
-print(f"\nArchivo AD: {ad_file}")
-print(f"Archivo Registros: {regs_file}")
-print(f"Mes: Enero")
-print(f"Año: 2026")
+    # Archivos de entrada
+    ad_files = args.ad
+    regs_file = args.regs
 
-print("\n" + "=" * 80)
-print("PROCESANDO...")
-print("=" * 80 + "\n")
+    # Verificar que existan
+    for ad_file in ad_files:
+        if not os.path.exists(ad_file):
+            print(f"ERROR: No se encuentra el archivo {ad_file}")
+            exit(1)
 
-# Generar reportes
-load_csv(ad_file, regs_file, "Enero", "2026")
+    if not os.path.exists(regs_file):
+        print(f"ERROR: No se encuentra el archivo {regs_file}")
+        exit(1)
 
-print("\n" + "=" * 80)
-print("PROCESO COMPLETADO")
-print("=" * 80)
+    # Validar las divisiones contra Registros; el índice se reutiliza al generar
+    indice_regs = None
+    divisiones = None
+    if args.division:
+        indice_regs = IndiceRegs(regs_file)
+        catalogo = CatalogoDivisiones(indice_regs)
+        divisiones = []
+        for division in args.division:
+            nombre = catalogo.validar(division)
+            if nombre is None:
+                sugerencias = catalogo.sugerir(division)
+                parser.error(
+                    f"división desconocida: '{division}'"
+                    + (f" (¿quiso decir: {', '.join(sugerencias)}?)" if sugerencias else "")
+                )
+            divisiones.append(nombre)
+
+    print(f"\nArchivo AD: {', '.join(ad_files)}")
+    print(f"Archivo Registros: {regs_file}")
+    if por_rango:
+        print(f"Expiración: {periodo}")
+    else:
+        print(f"Mes: {args.mes}")
+        print(f"Año: {args.anio}")
+    print(f"Partición: {args.particion}")
+    print(f"Formato: {args.formato}")
+    print(f"Motor: {args.motor}")
+    print(f"Join: {args.join}" + (f" ({args.memoria_join_mb:g} MB)" if args.join == "externo" else ""))
+    if divisiones:
+        print(f"Divisiones: {', '.join(divisiones)}")
+    if args.memoria_mb is not None:
+        print(f"Presupuesto de memoria: {args.memoria_mb:g} MB")
+
+    print("\n" + "=" * 80)
+    print("PROCESANDO...")
+    print("=" * 80 + "\n")
+
+    opciones = dict(
+        particiones=args.particion, max_archivos_abiertos=args.max_archivos_abiertos,
+        formato=args.formato, motor=args.motor, desde=desde, hasta=hasta,
+        modo_join=args.join, memoria_join_mb=args.memoria_join_mb, memoria_mb=args.memoria_mb,
+        divisiones=divisiones
+    )
+
+    # Generar reportes
+    errores = 0
+    if len(ad_files) == 1:
+        load_csv(ad_files[0], regs_file, mes, anio, indice_regs=indice_regs, **opciones)
+    else:
+        inicio = time.perf_counter()
+        resultados = procesar_exportaciones(
+            ad_files, regs_file, mes, anio, directorio_base=args.salida,
+            ejecutor=args.ejecutor, trabajadores=args.trabajadores, indice_regs=indice_regs, **opciones
+        )
+        total = time.perf_counter() - inicio
+        for r in resultados:
+            registros = sum(cantidad for _, cantidad in r["archivos"])
+            estado = f"ERROR {r['error']}" if r["error"] else f"{len(r['archivos'])} archivos, {registros} registros"
+            print(f"{r['exportacion']}: {estado} ({r['segundos']:.2f} s, pico del trabajador {r['trabajador']}: {texto_memoria(r['memoria'])})")
+        errores = sum(1 for r in resultados if r["error"])
+        suma = sum(r["segundos"] for r in resultados)
+        print(f"\nResumen: {os.path.join(args.salida, 'resumen.csv')}")
+        print(f"Tiempo total: {total:.2f} s (suma por exportación: {suma:.2f} s)")
+        print(f"Pico de memoria del proceso principal: {texto_memoria(pico_memoria())}")
+
+    print("\n" + "=" * 80)
+    print("PROCESO COMPLETADO" if errores == 0 else f"PROCESO COMPLETADO CON {errores} ERRORES")
+    print("=" * 80)
+    if errores:
+        exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Join externo (sort-merge) entre las cuentas AD y el archivo de Registros.
+
+Para entradas más grandes que la memoria disponible: en lugar de cargar el
+índice de Registros, ambos lados se ordenan por la clave de cruce en
+archivos temporales (corridas ordenadas de tamaño acotado por el presupuesto
+de memoria) y se cruzan en una pasada secuencial:
+
+    1. cuentas AD por código de responsable  x  Registros por columna 25
+    2. resultado por (puesto superior, división)  x  Registros por (puesto, división)
+    3. orden original de las cuentas restaurado por número de fila
+
+Con la misma semántica que IndiceRegs: gana la primera coincidencia del archivo.
+"""
+import csv
+import heapq
+import os
+import tempfile
+
+from lectura import ArchivoEntrada
+from medicion import BYTES_POR_CAMPO
+from testChain import normalize_text
+
+# Corridas que se mezclan a la vez; si hay más se mezclan en varias pasadas
+MAX_CORRIDAS = 64
+# Ordenadores de enriquecer_externo que pueden tener filas en memoria a la vez
+# (cuentas, Registros por código, Registros por puesto, con gerente, resultado):
+# el presupuesto se reparte entre ellos
+ORDENADORES_SIMULTANEOS = 5
+
+class OrdenadorExterno:
+    """
+    Ordena registros (tuplas de str) que pueden no caber en memoria.
+    Acumula registros hasta el presupuesto de bytes, los ordena y los vuelca a
+    una corrida en disco; al final mezcla todas las corridas con heapq.merge.
+    """
+    def __init__(self, clave, presupuesto_bytes, directorio):
+        self.clave = clave
+        self.presupuesto_bytes = presupuesto_bytes
+        self.directorio = directorio
+        self.buffer = []
+        self.bytes_buffer = 0
+        self.corridas = []
+
+    def agregar(self, registro):
+        self.buffer.append(registro)
+        self.bytes_buffer += sum(len(c) for c in registro) + BYTES_POR_CAMPO * len(registro)
+        if self.bytes_buffer >= self.presupuesto_bytes:
+            self._volcar()
+
+    def _escribir_corrida(self, registros):
+        fd, ruta = tempfile.mkstemp(suffix=".csv", dir=self.directorio)
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(registros)
+        return ruta
+
+    def _volcar(self):
+        if self.buffer:
+            self.buffer.sort(key=self.clave)
+            self.corridas.append(self._escribir_corrida(self.buffer))
+            self.buffer = []
+            self.bytes_buffer = 0
+
+    def _leer_corrida(self, ruta):
+        with open(ruta, newline="", encoding="utf-8") as f:
+            for registro in csv.reader(f):
+                yield tuple(registro)
+        os.remove(ruta)
+
+    def ordenado(self):
+        """Genera todos los registros agregados, ordenados por la clave."""
+        if not self.corridas:
+            # Todo cupo en memoria: no hace falta tocar el disco
+            self.buffer.sort(key=self.clave)
+            registros, self.buffer = self.buffer, []
+            yield from registros
+            return
+
+        self._volcar()
+        # Mezclar en varias pasadas para no abrir demasiados archivos a la vez
+        while len(self.corridas) > MAX_CORRIDAS:
+            grupo, self.corridas = self.corridas[:MAX_CORRIDAS], self.corridas[MAX_CORRIDAS:]
+            mezcla = heapq.merge(*(self._leer_corrida(r) for r in grupo), key=self.clave)
+            self.corridas.append(self._escribir_corrida(mezcla))
+        corridas, self.corridas = self.corridas, []
+        yield from heapq.merge(*(self._leer_corrida(r) for r in corridas), key=self.clave)
+
+def _clave_texto_fila(registro):
+    return (registro[0], int(registro[1]))
+
+def _clave_doble_texto_fila(registro):
+    return (registro[0], registro[1], int(registro[2]))
+
+def _clave_fila(registro):
+    return int(registro[0])
+
+def _primeros_por_clave(registros, largo_clave):
+    """De registros ordenados por (clave..., fila), conserva el primero de cada clave."""
+    anterior = None
+    for registro in registros:
+        clave = registro[:largo_clave]
+        if clave != anterior:
+            anterior = clave
+            yield registro
+
+def _merge_join(izquierda, derecha, largo_clave):
+    """
+    Genera (registro_izquierdo, registro_derecho o None) cruzando dos flujos
+    ordenados por sus primeros largo_clave campos. La derecha no tiene claves repetidas.
+    """
+    derecha = iter(derecha)
+    actual = next(derecha, None)
+    for registro in izquierda:
+        clave = registro[:largo_clave]
+        while actual is not None and actual[:largo_clave] < clave:
+            actual = next(derecha, None)
+        if actual is not None and actual[:largo_clave] == clave:
+            yield registro, actual
+        else:
+            yield registro, None
+
+def _ordenar_regs(Regs_File, presupuesto, directorio):
+    """
+    Ordena el archivo de Registros dos veces: por código (columna 25) y por
+    (puesto, división) normalizados. Cada registro lleva su número de fila.
+    """
+    por_codigo = OrdenadorExterno(_clave_texto_fila, presupuesto, directorio)
+    por_puesto = OrdenadorExterno(_clave_doble_texto_fila, presupuesto, directorio)
+    with ArchivoEntrada(Regs_File) as archivo:
+        reader = archivo.filas(delimiter=';')
+        next(reader, None)
+        for n, row in enumerate(reader):
+            if len(row) <= 25:
+                continue
+            fila = str(n)
+            # Mismos campos que buscarCampoCodigo: Nombre, A.pat, A.mat, E-mail, Division, Fam. Puesto
+            por_codigo.agregar((row[25].upper(), fila) + tuple(row[i] if i < len(row) else "" for i in (1, 2, 3, 34, 11, 10)))
+            puesto = normalize_text(row[10]) if len(row) > 10 else ""
+            if puesto:
+                division = normalize_text(row[11] if len(row) > 11 else "")
+                # Mismos campos que buscarPorPuestoYDivision: código, Nombre, A.pat, A.mat, E-mail
+                por_puesto.agregar((puesto, division, fila, row[25], row[1], row[2], row[3], row[34] if len(row) > 34 else "N/A"))
+    return por_codigo, por_puesto
+
+def enriquecer_externo(cuentas, Regs_File, memoria_mb=64):
+    """
+    Genera (mes_key, registro) como res._enriquecer, pero cruzando con el
+    archivo de Registros mediante ordenamiento externo y merge-join. La
+    memoria usada por los ordenamientos queda acotada por memoria_mb, que
+    se reparte en partes iguales entre los ordenadores que conviven.
+    """
+    # Importación diferida para evitar el ciclo res <-> join_externo
+    from res import armar_registro, clave_gerente, extraer_responsable
+
+    presupuesto = max(1, int(memoria_mb * 1024 * 1024) // ORDENADORES_SIMULTANEOS)
+    with tempfile.TemporaryDirectory(prefix="gr_join_") as directorio:
+        # 1. Cuentas AD: (código responsable, fila, campos de la cuenta)
+        cuentas_ord = OrdenadorExterno(_clave_texto_fila, presupuesto, directorio)
+        respCod = None
+        for n, (mes_key, fecha, row) in enumerate(cuentas):
+            respCod = extraer_responsable(row[7], respCod, row[0])
+            cuentas_ord.agregar((respCod.upper(), str(n), mes_key, respCod, row[0], row[4], row[14], row[18], row[22]))
+
+        regs_codigo, regs_puesto = _ordenar_regs(Regs_File, presupuesto, directorio)
+
+        # 2. Cruce por responsable; las cuentas con puesto superior pasan al cruce por gerente
+        con_gerente = OrdenadorExterno(_clave_doble_texto_fila, presupuesto, directorio)
+        resultado = OrdenadorExterno(_clave_fila, presupuesto, directorio)
+        sin_datos = ("N/A",) * 6
+        for cuenta, regs in _merge_join(cuentas_ord.ordenado(), _primeros_por_clave(regs_codigo.ordenado(), 1), 1):
+            data = regs[2:] if regs else sin_datos
+            clave = clave_gerente(data[5], data[4])
+            if clave:
+                con_gerente.agregar((clave[0], normalize_text(clave[1])) + cuenta[1:] + data)
+            else:
+                resultado.agregar(cuenta[1:] + data + ("N/A",) * 5)
+
+        # 3. Cruce por (puesto superior, división)
+        for cuenta, regs in _merge_join(con_gerente.ordenado(), _primeros_por_clave(regs_puesto.ordenado(), 2), 2):
+            gerente = regs[3:] if regs else ("N/A",) * 5
+            resultado.agregar(cuenta[2:] + gerente)
+
+        # 4. Restaurar el orden original de las cuentas
+        for registro in resultado.ordenado():
+            _, mes_key, respCod, usCod, dispName, enabled, creation, expiration = registro[:8]
+            data, gerente_data = registro[8:14], registro[14:19]
+            # Fila AD reconstruida con las columnas que usa armar_registro
+            row = [""] * 23
+            row[0], row[4], row[14], row[18], row[22] = usCod, dispName, enabled, creation, expiration
+            yield mes_key, armar_registro(row, respCod, data, gerente_data)
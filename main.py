@@ -1,13 +1,33 @@
+import time
+_INICIO_ARRANQUE = time.perf_counter()
+
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from res import load_csv
 import os
+import queue
+import threading
+
+# Los módulos de procesamiento (res, testChain) se importan de forma diferida
+# dentro de generate_reports para que la ventana se pinte lo antes posible.
+
+# Opción de período -> None (mes y año), días hacia adelante o "personalizado"
+PERIODO_MES = "Mes y año"
+PERIODOS = {
+    PERIODO_MES: None,
+    "Próximos 7 días": 7,
+    "Próximos 30 días": 30,
+    "Próximos 90 días": 90,
+    "Rango personalizado": "personalizado",
+}
+
+# Cada cuánto se vuelcan al panel de estado las líneas pendientes de log_status
+INTERVALO_LOG_MS = 50
 
 class ReportGeneratorApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Generador de Reportes de Cuentas")
-        self.root.geometry("600x500")
+        self.root.geometry("600x600")
         self.root.resizable(False, False)
         
         # Variables
@@ -15,9 +35,36 @@ class ReportGeneratorApp:
         self.regs_file = tk.StringVar()
         self.selected_month = tk.StringVar(value="Enero")
         self.selected_year = tk.StringVar(value="2026")
+        self.selected_format = tk.StringVar(value="csv")
+        self.memory_budget = tk.StringVar()
+        self.selected_period = tk.StringVar(value=PERIODO_MES)
+        self.range_from = tk.StringVar()
+        self.range_to = tk.StringVar()
+        self.division_text = tk.StringVar()
+        self.division_summary = tk.StringVar(value="Todas")
+        
+        # Divisiones elegidas (vacío = todas) y catálogo para autocompletarlas,
+        # construido por la precarga de Registros
+        self.divisiones_seleccionadas = []
+        self.catalogo_divisiones = None
+        
+        # Precarga en segundo plano: tipo ("ad"/"regs") -> estado de la precarga
+        self.precargas = {}
+        self.cola_precarga = queue.Queue()
+        
+        # Generación en segundo plano y vista previa del último reporte
+        self.cola_generacion = queue.Queue()
+        self.generando = False
+        self.modelo_resultados = None
+        self.ventana_resultados = None
+        
+        # Líneas del panel de estado pendientes de mostrar (log_status se puede llamar desde cualquier hilo)
+        self.cola_log = queue.Queue()
         
         # Configurar interfaz
         self.create_widgets()
+        self.root.after(100, self.procesar_cola_precarga)
+        self.root.after(INTERVALO_LOG_MS, self.procesar_cola_log)
     
     def create_widgets(self):
         # Título
@@ -87,11 +134,76 @@ class ReportGeneratorApp:
         )
         year_combo.pack(side="left", padx=5)
         
+        # Frame para período: mes y año, próximos N días o rango personalizado
+        period_frame = tk.Frame(self.root, pady=10)
+        period_frame.pack(fill="x", padx=20)
+        
+        tk.Label(period_frame, text="Período:", width=15, anchor="w").pack(side="left")
+        
+        period_combo = ttk.Combobox(
+            period_frame, 
+            textvariable=self.selected_period, 
+            values=list(PERIODOS),
+            state="readonly",
+            width=20
+        )
+        period_combo.pack(side="left", padx=5)
+        period_combo.bind("<<ComboboxSelected>>", lambda e: self.actualizar_rango())
+        
+        tk.Label(period_frame, text="Desde:").pack(side="left", padx=(10, 0))
+        self.range_from_entry = tk.Entry(period_frame, textvariable=self.range_from, width=11)
+        self.range_from_entry.pack(side="left", padx=2)
+        tk.Label(period_frame, text="Hasta:").pack(side="left", padx=(5, 0))
+        self.range_to_entry = tk.Entry(period_frame, textvariable=self.range_to, width=11)
+        self.range_to_entry.pack(side="left", padx=2)
+        self.actualizar_rango()
+        
+        # Frame para formato de salida
+        format_frame = tk.Frame(self.root, pady=10)
+        format_frame.pack(fill="x", padx=20)
+        
+        tk.Label(format_frame, text="Formato:", width=15, anchor="w").pack(side="left")
+        
+        # Mismas claves que escritores.FORMATOS (no se importa para no retrasar el arranque)
+        formatos = ["csv", "csv.gz", "csv.xz", "jsonl", "sqlite"]
+        format_combo = ttk.Combobox(
+            format_frame, 
+            textvariable=self.selected_format, 
+            values=formatos,
+            state="readonly",
+            width=20
+        )
+        format_combo.pack(side="left", padx=5)
+        
+        # Presupuesto de memoria de las filas pendientes de escribir (vacío = sin límite)
+        tk.Label(format_frame, text="Memoria máx. (MB):").pack(side="left", padx=(10, 0))
+        tk.Entry(format_frame, textvariable=self.memory_budget, width=8).pack(side="left", padx=2)
+        
+        # Frame para divisiones: autocompletado con las divisiones de Registros
+        division_frame = tk.Frame(self.root, pady=5)
+        division_frame.pack(fill="x", padx=20)
+        
+        tk.Label(division_frame, text="División:", width=15, anchor="w").pack(side="left")
+        self.division_entry = tk.Entry(division_frame, textvariable=self.division_text, width=30)
+        self.division_entry.pack(side="left", padx=5)
+        self.division_entry.bind("<KeyRelease>", self.actualizar_sugerencias)
+        self.division_entry.bind("<Return>", lambda e: self.agregar_division(self.division_text.get()))
+        self.division_entry.bind("<Down>", lambda e: self.enfocar_sugerencias())
+        self.division_entry.bind("<Escape>", lambda e: self.ocultar_sugerencias())
+        tk.Button(division_frame, text="Quitar", command=self.quitar_divisiones).pack(side="left")
+        tk.Label(division_frame, textvariable=self.division_summary, anchor="w").pack(side="left", padx=5)
+        
+        # Sugerencias: lista desplegada bajo el campo solo mientras hay completados
+        self.division_list = tk.Listbox(self.root, height=6, activestyle="dotbox")
+        self.division_list.bind("<Double-Button-1>", lambda e: self.elegir_sugerencia())
+        self.division_list.bind("<Return>", lambda e: self.elegir_sugerencia())
+        self.division_list.bind("<Escape>", lambda e: self.ocultar_sugerencias())
+        
         # Frame para botones
-        button_frame = tk.Frame(self.root, pady=30)
+        button_frame = tk.Frame(self.root, pady=20)
         button_frame.pack()
         
-        tk.Button(
+        self.generate_button = tk.Button(
             button_frame, 
             text="Generar Reportes", 
             command=self.generate_reports,
@@ -101,7 +213,19 @@ class ReportGeneratorApp:
             padx=20,
             pady=10,
             cursor="hand2"
-        ).pack()
+        )
+        self.generate_button.pack(side="left", padx=5)
+        
+        self.results_button = tk.Button(
+            button_frame, 
+            text="Ver Resultados", 
+            command=self.mostrar_resultados,
+            font=("Arial", 12),
+            padx=10,
+            pady=10,
+            state="disabled"
+        )
+        self.results_button.pack(side="left", padx=5)
         
         # Frame para status
         self.status_frame = tk.Frame(self.root, pady=10)
@@ -118,6 +242,119 @@ class ReportGeneratorApp:
         self.status_text.config(yscrollcommand=scrollbar.set)
         scrollbar.config(command=self.status_text.yview)
     
+    def actualizar_rango(self):
+        """Habilita los campos Desde/Hasta solo para el rango personalizado."""
+        estado = "normal" if PERIODOS[self.selected_period.get()] == "personalizado" else "disabled"
+        self.range_from_entry.config(state=estado)
+        self.range_to_entry.config(state=estado)
+    
+    def obtener_rango(self):
+        """
+        (desde, hasta) del período seleccionado, o (None, None) si se filtra
+        por mes y año. Lanza ValueError si las fechas personalizadas no son válidas.
+        """
+        from expiracion import parsear_fecha, ventana_proximos
+        
+        periodo = PERIODOS[self.selected_period.get()]
+        if periodo is None:
+            return None, None
+        if periodo == "personalizado":
+            desde = parsear_fecha(self.range_from.get()) if self.range_from.get().strip() else None
+            hasta = parsear_fecha(self.range_to.get()) if self.range_to.get().strip() else None
+            if desde is None and hasta is None:
+                raise ValueError("Indique al menos una fecha (Desde o Hasta)")
+            if desde and hasta and desde > hasta:
+                raise ValueError("La fecha Desde es posterior a la fecha Hasta")
+            return desde, hasta
+        return ventana_proximos(periodo)
+    
+    def obtener_memoria(self):
+        """Presupuesto de memoria en MB, o None si el campo está vacío. Lanza ValueError si no es válido."""
+        texto = self.memory_budget.get().strip().replace(",", ".")
+        if not texto:
+            return None
+        memoria = float(texto)
+        if memoria <= 0:
+            raise ValueError("El presupuesto de memoria debe ser mayor que cero")
+        return memoria
+    
+    def actualizar_sugerencias(self, event=None):
+        """Muestra los completados de lo escrito en el campo División."""
+        if event is not None and event.keysym in ("Return", "Down", "Up", "Escape"):
+            return
+        texto = self.division_text.get()
+        if self.catalogo_divisiones is None or not texto.strip():
+            self.ocultar_sugerencias()
+            return
+        sugerencias = self.catalogo_divisiones.completar(texto)
+        if not sugerencias:
+            self.ocultar_sugerencias()
+            return
+        self.division_list.delete(0, "end")
+        self.division_list.insert("end", *sugerencias)
+        self.division_list.config(height=len(sugerencias))
+        self.division_list.place(in_=self.division_entry, x=0, rely=1.0, relwidth=1.0)
+        self.division_list.lift()
+    
+    def ocultar_sugerencias(self):
+        self.division_list.place_forget()
+    
+    def enfocar_sugerencias(self):
+        """Pasa el foco a la lista de sugerencias (flecha abajo en el campo División)."""
+        if self.division_list.winfo_ismapped():
+            self.division_list.focus_set()
+            self.division_list.selection_clear(0, "end")
+            self.division_list.selection_set(0)
+            self.division_list.activate(0)
+    
+    def elegir_sugerencia(self):
+        seleccion = self.division_list.curselection()
+        if seleccion:
+            self.agregar_division(self.division_list.get(seleccion[0]))
+    
+    def agregar_division(self, texto):
+        """
+        Agrega una división a la selección si existe en Registros (si no,
+        la primera sugerencia) e informa su superior en el panel de estado.
+        """
+        if not texto.strip():
+            return
+        if self.catalogo_divisiones is None:
+            self.log_status("Seleccione el archivo de Registros (y espere su precarga) para elegir divisiones")
+            return
+        division = self.catalogo_divisiones.validar(texto)
+        if division is None:
+            sugerencias = self.catalogo_divisiones.completar(texto)
+            if not sugerencias:
+                self.log_status(f"✗ División desconocida: {texto}")
+                return
+            division = sugerencias[0]
+        self.ocultar_sugerencias()
+        self.division_text.set("")
+        self.division_entry.focus_set()
+        if division in self.divisiones_seleccionadas:
+            return
+        self.divisiones_seleccionadas.append(division)
+        self.actualizar_resumen_divisiones()
+        
+        puesto, datos = self.catalogo_divisiones.superior(division)
+        if puesto is None:
+            superior = "sin superior en la jerarquía"
+        elif datos is None:
+            superior = f"{puesto} (sin persona en Registros)"
+        else:
+            codigo, nombre, apat, amat, _ = datos
+            superior = f"{puesto} — {nombre} {apat} {amat} ({codigo})"
+        self.log_status(f"División agregada: {division}. Superior: {superior}")
+    
+    def quitar_divisiones(self):
+        self.divisiones_seleccionadas = []
+        self.actualizar_resumen_divisiones()
+    
+    def actualizar_resumen_divisiones(self):
+        cantidad = len(self.divisiones_seleccionadas)
+        self.division_summary.set("Todas" if cantidad == 0 else f"{cantidad} seleccionada{'s' if cantidad > 1 else ''}")
+    
     def select_ad_file(self):
         filename = filedialog.askopenfilename(
             title="Seleccionar archivo AD",
@@ -125,6 +362,7 @@ class ReportGeneratorApp:
         )
         if filename:
             self.ad_file.set(filename)
+            self.iniciar_precarga("ad", filename)
     
     def select_regs_file(self):
         filename = filedialog.askopenfilename(
@@ -133,15 +371,131 @@ class ReportGeneratorApp:
         )
         if filename:
             self.regs_file.set(filename)
+            # Las divisiones elegidas corresponden al archivo anterior
+            self.catalogo_divisiones = None
+            self.ocultar_sugerencias()
+            if self.divisiones_seleccionadas:
+                self.quitar_divisiones()
+                self.log_status("Selección de divisiones borrada por el cambio de archivo de Registros")
+            self.iniciar_precarga("regs", filename)
+    
+    def iniciar_precarga(self, tipo, ruta):
+        """
+        Inicia en un hilo la carga especulativa del archivo seleccionado:
+        el índice de búsqueda para Registros o las cuentas agrupadas por mes
+        para AD. Cancela la precarga anterior del mismo tipo.
+        """
+        self.cancelar_precarga(tipo)
+        
+        precarga = {
+            "ruta": ruta,
+            "mtime": os.path.getmtime(ruta),
+            "cancelado": threading.Event(),
+            "resultado": None,
+        }
+        precarga["hilo"] = threading.Thread(
+            target=self._ejecutar_precarga, args=(tipo, precarga), daemon=True
+        )
+        self.precargas[tipo] = precarga
+        nombre = "Registros" if tipo == "regs" else "AD"
+        self.log_status(f"Precargando archivo {nombre}: {os.path.basename(ruta)}...")
+        precarga["hilo"].start()
+    
+    def cancelar_precarga(self, tipo):
+        precarga = self.precargas.pop(tipo, None)
+        if precarga is not None:
+            precarga["cancelado"].set()
+    
+    def _ejecutar_precarga(self, tipo, precarga):
+        # Se ejecuta en el hilo de precarga: no debe tocar widgets de Tk
+        from res import CargaCancelada, CuentasAD, IndiceRegs
+        
+        inicio = time.perf_counter()
+        try:
+            if tipo == "regs":
+                from autocompletado import CatalogoDivisiones
+                resultado = IndiceRegs(precarga["ruta"], cancelado=precarga["cancelado"])
+                precarga["catalogo"] = CatalogoDivisiones(resultado)
+            else:
+                resultado = CuentasAD(precarga["ruta"], cancelado=precarga["cancelado"])
+        except CargaCancelada:
+            return
+        except Exception as e:
+            self.cola_precarga.put((tipo, precarga, None, e, 0))
+            return
+        precarga["resultado"] = resultado
+        self.cola_precarga.put((tipo, precarga, resultado, None, time.perf_counter() - inicio))
+    
+    def procesar_cola_precarga(self):
+        """Publica en el hilo de Tk los resultados de las precargas terminadas."""
+        try:
+            while True:
+                tipo, precarga, resultado, error, segundos = self.cola_precarga.get_nowait()
+                if self.precargas.get(tipo) is not precarga:
+                    continue  # la selección cambió mientras se cargaba
+                nombre = "Registros" if tipo == "regs" else "AD"
+                if error is not None:
+                    self.precargas.pop(tipo, None)
+                    self.log_status(f"✗ Precarga de {nombre} fallida: {error}")
+                    continue
+                if tipo == "regs":
+                    self.catalogo_divisiones = precarga["catalogo"]
+                    detalle = f"{len(resultado.por_codigo)} códigos indexados, {len(self.catalogo_divisiones)} divisiones"
+                else:
+                    detalle = f"{len(resultado.cuentas)} cuentas en {len(resultado.por_mes)} meses"
+                self.log_status(f"✓ Archivo {nombre} listo ({detalle}, {segundos:.1f} s)")
+        except queue.Empty:
+            pass
+        self.root.after(100, self.procesar_cola_precarga)
+    
+    def precarga_vigente(self, tipo, ruta):
+        """
+        Precarga en curso o terminada para ruta, o None si no hay una vigente
+        para ese archivo. Se llama desde el hilo de Tk.
+        """
+        precarga = self.precargas.get(tipo)
+        if precarga is None or precarga["ruta"] != ruta:
+            return None
+        if os.path.getmtime(ruta) != precarga["mtime"]:
+            # El archivo cambió en disco desde que se precargó
+            self.cancelar_precarga(tipo)
+            return None
+        return precarga
+    
+    @staticmethod
+    def esperar_precarga(precarga):
+        """Resultado de una precarga, esperando si aún está en curso (None si falló)."""
+        if precarga is None:
+            return None
+        precarga["hilo"].join()
+        return precarga["resultado"]
     
     def log_status(self, message):
-        self.status_text.config(state="normal")
-        self.status_text.insert("end", message + "\n")
-        self.status_text.see("end")
-        self.status_text.config(state="disabled")
-        self.root.update()
+        """Agrega una línea al panel de estado. Se puede llamar desde cualquier hilo."""
+        self.cola_log.put(message)
+    
+    def vaciar_log(self):
+        """Inserta de una sola vez en el panel de estado las líneas pendientes."""
+        lineas = []
+        try:
+            while True:
+                lineas.append(self.cola_log.get_nowait())
+        except queue.Empty:
+            pass
+        if lineas:
+            self.status_text.config(state="normal")
+            self.status_text.insert("end", "\n".join(lineas) + "\n")
+            self.status_text.see("end")
+            self.status_text.config(state="disabled")
+    
+    def procesar_cola_log(self):
+        self.vaciar_log()
+        self.root.after(INTERVALO_LOG_MS, self.procesar_cola_log)
     
     def generate_reports(self):
+        if self.generando:
+            return
+        
         # Validar que se hayan seleccionado los archivos
         if not self.ad_file.get():
             messagebox.showerror("Error", "Por favor seleccione el archivo AD")
@@ -160,7 +514,20 @@ class ReportGeneratorApp:
             messagebox.showerror("Error", "El archivo de Registros no existe")
             return
         
+        try:
+            desde, hasta = self.obtener_rango()
+        except ValueError as e:
+            messagebox.showerror("Error", f"Rango de fechas no válido (use dd/mm/aaaa):\n{e}")
+            return
+        
+        try:
+            memoria_mb = self.obtener_memoria()
+        except ValueError as e:
+            messagebox.showerror("Error", f"Memoria máxima no válida (en MB):\n{e}")
+            return
+        
         # Limpiar status
+        self.vaciar_log()
         self.status_text.config(state="normal")
         self.status_text.delete(1.0, "end")
         self.status_text.config(state="disabled")
@@ -172,35 +539,324 @@ class ReportGeneratorApp:
         
         # Determinar mes
         mes_seleccionado = self.selected_month.get()
-        if mes_seleccionado == "Todos":
+        año_seleccionado = self.selected_year.get()
+        if desde is not None or hasta is not None:
+            # El rango de fechas reemplaza al filtro por mes y año
             mes_seleccionado = None
-            self.log_status("Mes: Todos")
+            año_seleccionado = None
+            rango = " - ".join(f.strftime("%d/%m/%Y") if f else "..." for f in (desde, hasta))
+            self.log_status(f"Período: {self.selected_period.get()} ({rango})")
         else:
-            self.log_status(f"Mes: {mes_seleccionado}")
+            if mes_seleccionado == "Todos":
+                mes_seleccionado = None
+                self.log_status("Mes: Todos")
+            else:
+                self.log_status(f"Mes: {mes_seleccionado}")
+            
+            # Determinar año
+            self.log_status(f"Año: {año_seleccionado}")
         
-        # Determinar año
-        año_seleccionado = self.selected_year.get()
-        self.log_status(f"Año: {año_seleccionado}")
+        formato = self.selected_format.get()
+        self.log_status(f"Formato: {formato}")
+        if memoria_mb is not None:
+            self.log_status(f"Memoria máxima: {memoria_mb:g} MB")
+        divisiones = list(self.divisiones_seleccionadas) or None
+        if divisiones:
+            self.log_status(f"Divisiones: {', '.join(divisiones)}")
         
         self.log_status("-" * 50)
         
+        # La vista previa anterior corresponde a reportes que se van a reemplazar
+        self.cerrar_resultados()
+        
+        # La generación corre en un hilo para que la ventana siga respondiendo
+        parametros = dict(
+            AD_File=self.ad_file.get(), Regs_File=self.regs_file.get(),
+            mes=mes_seleccionado, anio=año_seleccionado, formato=formato,
+            desde=desde, hasta=hasta, memoria_mb=memoria_mb, divisiones=divisiones
+        )
+        precargas = (
+            self.precarga_vigente("regs", self.regs_file.get()),
+            self.precarga_vigente("ad", self.ad_file.get()),
+        )
+        self.generando = True
+        self.generate_button.config(state="disabled")
+        threading.Thread(target=self._ejecutar_generacion, args=(parametros, precargas), daemon=True).start()
+        self.root.after(100, self.procesar_cola_generacion)
+    
+    def _ejecutar_generacion(self, parametros, precargas):
+        # Se ejecuta en el hilo de generación: no debe tocar widgets de Tk (log_status sí es seguro)
         try:
-            # Llamar a la función de procesamiento
-            outputDir = load_csv(self.ad_file.get(), self.regs_file.get(), mes_seleccionado, año_seleccionado)
+            # Importación diferida: solo se paga al generar el primer reporte
+            from res import generar_reportes, informar_reportes
+            from medicion import memoria_actual, pico_memoria, texto_pico_desde
+            from vista_previa import ModeloReporte, crear_fuente
+            
+            # Reutilizar los archivos precargados en segundo plano, si los hay
+            indice_regs = self.esperar_precarga(precargas[0])
+            cuentas_ad = self.esperar_precarga(precargas[1])
+            if indice_regs is not None:
+                self.log_status("Usando índice de Registros precargado")
+            if cuentas_ad is not None:
+                self.log_status("Usando cuentas AD precargadas")
             
-            self.log_status("-" * 50)
-            self.log_status(f"Reportes generados exitosamente en la carpeta '{outputDir}'")
-            messagebox.showinfo(
-                "Éxito", 
-                f"Los reportes se han generado correctamente en la carpeta '{outputDir}'"
+            # La ventana sigue abierta entre generaciones: el pico del proceso
+            # puede venir de una anterior o de la precarga, así que se registra
+            # desde dónde parte esta
+            inicial, pico_inicial = memoria_actual(), pico_memoria()
+            
+            # Llamar a la función de procesamiento
+            outputDir, archivos = generar_reportes(indice_regs=indice_regs, cuentas_ad=cuentas_ad, **parametros)
+            informar_reportes(
+                archivos, parametros["mes"], parametros["anio"], parametros["desde"],
+                parametros["hasta"], parametros["divisiones"]
             )
+            self.log_status(f"Pico de memoria: {texto_pico_desde(inicial, pico_inicial, pico_memoria())}")
+        except Exception as e:
+            self.cola_generacion.put((None, None, e))
+            return
+        
+        # Índice de la vista previa: un fallo aquí no invalida los reportes generados
+        try:
+            # Solo los archivos de esta generación: la carpeta conserva los demás
+            rutas = [ruta for ruta, _ in archivos]
+            modelo = ModeloReporte(crear_fuente(outputDir, parametros["formato"], rutas))
         except Exception as e:
-            self.log_status(f"✗ Error: {str(e)}")
-            messagebox.showerror("Error", f"Error al generar reportes:\n{str(e)}")
+            modelo = None
+            self.log_status(f"Vista previa no disponible: {e}")
+        self.cola_generacion.put((outputDir, modelo, None))
+    
+    def procesar_cola_generacion(self):
+        """Muestra en el hilo de Tk el resultado de la generación cuando termina."""
+        try:
+            outputDir, modelo, error = self.cola_generacion.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self.procesar_cola_generacion)
+            return
+        
+        self.generando = False
+        self.generate_button.config(state="normal")
+        self.vaciar_log()
+        if error is not None:
+            self.log_status(f"✗ Error: {str(error)}")
+            messagebox.showerror("Error", f"Error al generar reportes:\n{str(error)}")
+            return
+        
+        self.log_status("-" * 50)
+        self.log_status(f"Reportes generados exitosamente en la carpeta '{outputDir}'")
+        if modelo is not None:
+            self.modelo_resultados = modelo
+            self.results_button.config(state="normal")
+            self.log_status(f"Vista previa lista ({modelo.total} filas)")
+        messagebox.showinfo(
+            "Éxito", 
+            f"Los reportes se han generado correctamente en la carpeta '{outputDir}'"
+        )
+        if modelo is not None:
+            self.mostrar_resultados()
+    
+    def mostrar_resultados(self):
+        """Abre (o trae al frente) la vista previa del último reporte generado."""
+        if self.modelo_resultados is None:
+            return
+        if self.ventana_resultados is not None and self.ventana_resultados.ventana.winfo_exists():
+            self.ventana_resultados.ventana.lift()
+            return
+        self.ventana_resultados = VentanaResultados(self.root, self.modelo_resultados)
+    
+    def cerrar_resultados(self):
+        """Cierra la vista previa y libera los archivos del último reporte."""
+        if self.ventana_resultados is not None and self.ventana_resultados.ventana.winfo_exists():
+            self.ventana_resultados.ventana.destroy()
+        self.ventana_resultados = None
+        if self.modelo_resultados is not None:
+            self.modelo_resultados.cerrar()
+            self.modelo_resultados = None
+        self.results_button.config(state="disabled")
+
+class VentanaResultados:
+    """
+    Vista previa de un reporte (vista_previa.ModeloReporte). La tabla solo
+    contiene la página visible: al desplazarse, filtrar u ordenar se
+    reemplazan sus filas por las de la nueva página.
+    """
+    FILAS_VISIBLES = 25
+    TODOS = "(Todos)"
+    
+    def __init__(self, root, modelo):
+        from vista_previa import BUSQUEDA_MANUAL, COLUMNAS
+        
+        self.modelo = modelo
+        self.inicio = 0
+        self.pendiente = False
+        
+        self.ventana = tk.Toplevel(root)
+        self.ventana.title("Resultados")
+        self.ventana.geometry("1000x640")
+        
+        # Filtros
+        filtros = tk.Frame(self.ventana, pady=5)
+        filtros.pack(fill="x", padx=10)
+        
+        self.filtros = {}
+        for etiqueta, columna in (("Mes:", "Mes"), ("División:", "Division"), ("Gerente:", "Gerente")):
+            tk.Label(filtros, text=etiqueta).pack(side="left", padx=(5, 2))
+            variable = tk.StringVar(value=self.TODOS)
+            combo = ttk.Combobox(
+                filtros, 
+                textvariable=variable, 
+                values=[self.TODOS] + modelo.valores(columna),
+                state="readonly",
+                width=24 if columna == "Division" else 14
+            )
+            combo.pack(side="left")
+            combo.bind("<<ComboboxSelected>>", lambda e: self.aplicar_filtros())
+            self.filtros[columna] = variable
+        
+        self.solo_manual = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            filtros, 
+            text=f"Solo \"{BUSQUEDA_MANUAL}\"", 
+            variable=self.solo_manual,
+            command=self.aplicar_filtros
+        ).pack(side="left", padx=10)
+        
+        # Tabla con desplazamiento vertical propio (por página) y horizontal de Tk
+        marco = tk.Frame(self.ventana)
+        marco.pack(fill="both", expand=True, padx=10)
+        
+        self.tabla = ttk.Treeview(marco, columns=COLUMNAS, show="headings", height=self.FILAS_VISIBLES)
+        for columna in COLUMNAS:
+            self.tabla.heading(columna, text=columna, command=lambda c=columna: self.ordenar(c))
+            self.tabla.column(columna, width=110, minwidth=60, stretch=False)
+        
+        self.barra = ttk.Scrollbar(marco, orient="vertical", command=self.desplazar)
+        barra_x = ttk.Scrollbar(marco, orient="horizontal", command=self.tabla.xview)
+        self.tabla.config(xscrollcommand=barra_x.set)
+        self.tabla.grid(row=0, column=0, sticky="nsew")
+        self.barra.grid(row=0, column=1, sticky="ns")
+        barra_x.grid(row=1, column=0, sticky="ew")
+        marco.rowconfigure(0, weight=1)
+        marco.columnconfigure(0, weight=1)
+        
+        self.estado = tk.Label(self.ventana, anchor="w")
+        self.estado.pack(fill="x", padx=10, pady=5)
+        
+        # Rueda del mouse (Windows/macOS: <MouseWheel>; Linux: botones 4 y 5) y teclado
+        self.tabla.bind("<MouseWheel>", lambda e: self.desplazar("scroll", -3 if e.delta > 0 else 3, "units"))
+        self.tabla.bind("<Button-4>", lambda e: self.desplazar("scroll", -3, "units"))
+        self.tabla.bind("<Button-5>", lambda e: self.desplazar("scroll", 3, "units"))
+        self.tabla.bind("<Prior>", lambda e: self.desplazar("scroll", -1, "pages"))
+        self.tabla.bind("<Next>", lambda e: self.desplazar("scroll", 1, "pages"))
+        self.tabla.bind("<Home>", lambda e: self.desplazar("moveto", 0))
+        self.tabla.bind("<End>", lambda e: self.desplazar("moveto", 1))
+        
+        self.mostrar()
+    
+    def aplicar_filtros(self):
+        valores = {c: (None if v.get() == self.TODOS else v.get()) for c, v in self.filtros.items()}
+        self.modelo.filtrar(
+            mes=valores["Mes"], division=valores["Division"], gerente=valores["Gerente"],
+            solo_manual=self.solo_manual.get()
+        )
+        self.inicio = 0
+        self.mostrar()
+    
+    def ordenar(self, columna):
+        """Ordena por la columna; un segundo clic invierte el orden."""
+        descendente = self.modelo.orden == (columna, False)
+        self.ventana.config(cursor="watch")
+        self.ventana.update_idletasks()
+        try:
+            self.modelo.ordenar(columna, descendente)
+        finally:
+            self.ventana.config(cursor="")
+        for c in self.tabla["columns"]:
+            flecha = (" ▼" if descendente else " ▲") if c == columna else ""
+            self.tabla.heading(c, text=c + flecha)
+        self.inicio = 0
+        self.mostrar()
+    
+    def desplazar(self, accion, cantidad, unidad=None):
+        """Comando de la barra de desplazamiento: mueve la página visible."""
+        if accion == "moveto":
+            self.inicio = int(float(cantidad) * len(self.modelo))
+        elif accion == "scroll":
+            paso = self.FILAS_VISIBLES if unidad == "pages" else 1
+            self.inicio += int(cantidad) * paso
+        # Agrupar los eventos seguidos (p. ej. al arrastrar la barra) en un solo redibujado
+        if not self.pendiente:
+            self.pendiente = True
+            self.ventana.after_idle(self.mostrar)
+    
+    def mostrar(self):
+        """Reemplaza las filas de la tabla por las de la página actual."""
+        self.pendiente = False
+        if not self.ventana.winfo_exists():
+            return
+        total = len(self.modelo)
+        self.inicio = max(0, min(self.inicio, total - self.FILAS_VISIBLES))
+        
+        self.tabla.delete(*self.tabla.get_children())
+        for fila in self.modelo.pagina(self.inicio, self.FILAS_VISIBLES):
+            self.tabla.insert("", "end", values=fila)
+        
+        fin = min(self.inicio + self.FILAS_VISIBLES, total)
+        if total:
+            self.barra.set(self.inicio / total, fin / total)
+            texto = f"Filas {self.inicio + 1:,}-{fin:,} de {total:,}"
+        else:
+            self.barra.set(0, 1)
+            texto = "Sin filas para el filtro seleccionado"
+        if total != self.modelo.total:
+            texto += f" (filtradas de {self.modelo.total:,})"
+        self.estado.config(text=texto.replace(",", "."))
+
+def _segundos_desde_inicio_proceso():
+    """
+    Segundos transcurridos desde que el sistema operativo creó el proceso.
+    En el ejecutable de un solo archivo incluye el tiempo de descompresión del
+    bootloader. Retorna None si la plataforma no permite obtenerlo.
+    """
+    try:
+        if os.name == "nt":
+            import ctypes
+            from ctypes import wintypes
+            creacion, salida, kernel, usuario = (wintypes.FILETIME() for _ in range(4))
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.kernel32.GetProcessTimes(
+                handle, ctypes.byref(creacion), ctypes.byref(salida),
+                ctypes.byref(kernel), ctypes.byref(usuario)
+            ):
+                return None
+            ahora = wintypes.FILETIME()
+            ctypes.windll.kernel32.GetSystemTimeAsFileTime(ctypes.byref(ahora))
+            a_int = lambda ft: (ft.dwHighDateTime << 32) | ft.dwLowDateTime
+            # FILETIME está en unidades de 100 ns
+            return (a_int(ahora) - a_int(creacion)) / 1e7
+        with open("/proc/self/stat") as f:
+            inicio_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - inicio_ticks / os.sysconf("SC_CLK_TCK")
+    except Exception:
+        return None
+
+def _reportar_tiempo_arranque(app):
+    """Registra en el panel de estado el tiempo hasta que la ventana es visible."""
+    desde_python = time.perf_counter() - _INICIO_ARRANQUE
+    desde_proceso = _segundos_desde_inicio_proceso()
+    mensaje = f"Ventana lista en {desde_python * 1000:.0f} ms (desde el intérprete)"
+    if desde_proceso is not None:
+        mensaje += f", {desde_proceso * 1000:.0f} ms (desde el inicio del proceso)"
+    app.log_status(mensaje)
 
 def main():
     root = tk.Tk()
     app = ReportGeneratorApp(root)
+    # GR_MEDIR_ARRANQUE=1 muestra el tiempo hasta la primera ventana pintada
+    if os.environ.get("GR_MEDIR_ARRANQUE"):
+        root.after_idle(lambda: _reportar_tiempo_arranque(app))
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,86 @@
+"""
+Medición de la memoria del proceso.
+
+pico_memoria() retorna la memoria residente máxima (pico de RSS) alcanzada
+por el proceso actual, sin dependencias externas: resource en Linux y
+macOS, GetProcessMemoryInfo (psapi) en Windows. memoria_actual() retorna la
+memoria residente en este momento (/proc en Linux, psapi en Windows), para
+saber desde dónde parte una ejecución dentro de un proceso de larga vida
+como la interfaz. BYTES_POR_CAMPO es la estimación de memoria por campo
+que comparten los presupuestos de escritores.py y join_externo.py.
+"""
+import os
+import sys
+
+# Sobrecarga aproximada de cada campo de una fila en memoria (objeto str +
+# referencia en la tupla o lista), para estimar lo que ocupan las filas
+# pendientes frente a un presupuesto
+BYTES_POR_CAMPO = 64
+
+def _contadores_windows():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    contadores = PROCESS_MEMORY_COUNTERS()
+    contadores.cb = ctypes.sizeof(contadores)
+    proceso = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(proceso, ctypes.byref(contadores), contadores.cb):
+        return None
+    return contadores
+
+def pico_memoria():
+    """Pico de RSS del proceso actual en bytes, o None si no se puede obtener."""
+    try:
+        if os.name == "nt":
+            contadores = _contadores_windows()
+            return contadores.PeakWorkingSetSize if contadores is not None else None
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS informa bytes; Linux, kilobytes
+        return pico if sys.platform == "darwin" else pico * 1024
+    except Exception:
+        return None
+
+def memoria_actual():
+    """RSS actual del proceso en bytes, o None si no se puede obtener (p. ej. en macOS)."""
+    try:
+        if os.name == "nt":
+            contadores = _contadores_windows()
+            return contadores.WorkingSetSize if contadores is not None else None
+        with open("/proc/self/statm") as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
+
+def texto_pico_desde(inicial, pico_inicial, pico):
+    """
+    Texto del pico de memoria al terminar una ejecución que empezó con RSS
+    `inicial` y pico `pico_inicial`. El pico es el de todo el proceso: si la
+    ejecución no lo superó, se aclara que corresponde a algo anterior.
+    """
+    if pico is None:
+        return "n/d"
+    if pico_inicial is not None and pico <= pico_inicial:
+        return f"{texto_memoria(pico)} del proceso, alcanzado antes de esta ejecución (al iniciar: {texto_memoria(inicial)})"
+    if inicial is None:
+        return f"{texto_memoria(pico)} del proceso"
+    return f"{texto_memoria(pico)} del proceso durante esta ejecución, {texto_memoria(pico - inicial)} más que al iniciar ({texto_memoria(inicial)})"
+
+def texto_memoria(cantidad):
+    """Cantidad de bytes en MB para mostrar, o "n/d" si no se conoce."""
+    return "n/d" if cantidad is None else f"{cantidad / (1024 * 1024):.1f} MB"
@@ -0,0 +1,140 @@
+"""
+Ejecución de varios archivos AD (una exportación por empresa o dominio)
+contra un único archivo de Registros.
+
+El índice de Registros y la jerarquía se construyen una sola vez y se
+comparten entre todas las exportaciones, que se procesan en paralelo con un
+pool de hilos o de procesos. Cada exportación genera su propia carpeta de
+reportes dentro de directorio_base y al final se escribe un resumen
+consolidado (resumen.csv), de modo que el tiempo total depende de la
+exportación más grande y no de la suma de todas.
+"""
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from medicion import pico_memoria
+from res import IndiceRegs, cargar_jerarquia, directorio_reportes, generar_reportes
+
+EJECUTORES = ("hilos", "procesos")
+# PicoMemoriaTrabajadorMB es el pico del proceso que ejecutó la exportación
+# desde que arrancó (incluye las exportaciones anteriores del mismo
+# trabajador; con hilos, todo el proceso). Trabajador es su PID, para
+# agrupar las filas que comparten ese pico.
+CAMPOS_RESUMEN = ["Exportacion", "ArchivoAD", "Archivo", "Registros", "Segundos", "Trabajador", "PicoMemoriaTrabajadorMB", "Error"]
+
+# Índice de Registros recibido por cada proceso del pool (ver _iniciar_proceso)
+_indice_proceso = None
+
+def nombres_exportaciones(AD_Files):
+    """
+    Nombre de la carpeta de cada exportación: el nombre del archivo AD sin
+    extensión, con un sufijo _2, _3... si dos archivos se llaman igual.
+    """
+    nombres = []
+    usados = set()
+    for AD_File in AD_Files:
+        base = os.path.splitext(os.path.basename(AD_File))[0] or "exportacion"
+        nombre, n = base, 1
+        while nombre.lower() in usados:
+            n += 1
+            nombre = f"{base}_{n}"
+        usados.add(nombre.lower())
+        nombres.append(nombre)
+    return nombres
+
+def _iniciar_proceso(indice_regs, Regs_File):
+    """Inicializador del pool de procesos: recibe el índice una vez por proceso."""
+    global _indice_proceso
+    _indice_proceso = indice_regs
+    cargar_jerarquia(Regs_File)
+
+def _procesar_exportacion(exportacion, AD_File, Regs_File, mes, anio, directorio, opciones, indice_regs=None):
+    """Genera los reportes de una exportación. Los errores se informan en el resultado."""
+    if indice_regs is None:
+        indice_regs = _indice_proceso
+    inicio = time.perf_counter()
+    resultado = {"exportacion": exportacion, "ad": AD_File, "carpeta": directorio, "archivos": [], "error": ""}
+    try:
+        _, resultado["archivos"] = generar_reportes(
+            AD_File, Regs_File, mes, anio, indice_regs=indice_regs,
+            directorio_salida=directorio, **opciones
+        )
+    except Exception as e:
+        resultado["error"] = f"{type(e).__name__}: {e}"
+    resultado["segundos"] = time.perf_counter() - inicio
+    # Pico del proceso trabajador en toda su vida, no solo de esta exportación:
+    # no hay forma portable de reiniciarlo (con hilos, el de todo el proceso)
+    resultado["trabajador"] = os.getpid()
+    resultado["memoria"] = pico_memoria()
+    return resultado
+
+def escribir_resumen(resultados, ruta):
+    """Resumen consolidado: una fila por archivo generado, o por exportación sin archivos."""
+    with open(ruta, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CAMPOS_RESUMEN, delimiter=";")
+        writer.writeheader()
+        for r in resultados:
+            memoria = "" if r["memoria"] is None else f"{r['memoria'] / (1024 * 1024):.1f}"
+            fila = {"Exportacion": r["exportacion"], "ArchivoAD": r["ad"], "Segundos": f"{r['segundos']:.2f}",
+                    "Trabajador": r["trabajador"], "PicoMemoriaTrabajadorMB": memoria, "Error": r["error"]}
+            if not r["archivos"]:
+                writer.writerow(dict(fila, Archivo="", Registros=0))
+            for archivo, cantidad in r["archivos"]:
+                writer.writerow(dict(fila, Archivo=archivo, Registros=cantidad))
+
+def procesar_exportaciones(AD_Files, Regs_File, mes, anio=None, directorio_base="reportes_exportaciones",
+                           ejecutor="procesos", trabajadores=None, indice_regs=None, **opciones):
+    """
+    Genera los reportes de cada archivo AD en
+    directorio_base/<exportación>/<carpeta de reportes>, reutilizando un
+    único índice de Registros. opciones son los demás parámetros de
+    res.generar_reportes (particiones, formato, motor, desde, hasta, modo_join...).
+
+    ejecutor="procesos" aprovecha varios núcleos (el índice se envía una vez
+    a cada proceso); "hilos" evita copiar el índice pero comparte el GIL.
+    trabajadores es el tamaño del pool (por defecto, uno por exportación
+    hasta la cantidad de núcleos). indice_regs es un IndiceRegs ya construido
+    sobre Regs_File (p. ej. el usado para validar las divisiones); si es None
+    se construye aquí.
+
+    Retorna la lista de resultados por exportación (en el orden de AD_Files)
+    y escribe directorio_base/resumen.csv.
+    """
+    if ejecutor not in EJECUTORES:
+        raise ValueError(f"Ejecutor desconocido: '{ejecutor}' (válidos: {', '.join(EJECUTORES)})")
+    if not AD_Files:
+        raise ValueError("No se indicó ningún archivo AD")
+    for clave in ("cuentas_ad", "directorio_salida"):
+        if clave in opciones:
+            raise TypeError(f"procesar_exportaciones no acepta '{clave}'")
+
+    # Recursos compartidos, construidos una sola vez
+    cargar_jerarquia(Regs_File)
+    if opciones.get("modo_join", "indice") != "indice":
+        # El join externo no usa el índice: no enviarlo a los procesos
+        indice_regs = None
+    elif indice_regs is None:
+        indice_regs = IndiceRegs(Regs_File)
+
+    carpeta = directorio_reportes(mes, anio, opciones.get("desde"), opciones.get("hasta"))
+    trabajos = [
+        (exportacion, AD_File, Regs_File, mes, anio, os.path.join(directorio_base, exportacion, carpeta), opciones)
+        for exportacion, AD_File in zip(nombres_exportaciones(AD_Files), AD_Files)
+    ]
+    trabajadores = trabajadores or min(len(trabajos), os.cpu_count() or 1)
+
+    if ejecutor == "hilos":
+        with ThreadPoolExecutor(max_workers=trabajadores) as pool:
+            futuros = [pool.submit(_procesar_exportacion, *t, indice_regs=indice_regs) for t in trabajos]
+            resultados = [f.result() for f in futuros]
+    else:
+        with ProcessPoolExecutor(max_workers=trabajadores, initializer=_iniciar_proceso,
+                                 initargs=(indice_regs, Regs_File)) as pool:
+            futuros = [pool.submit(_procesar_exportacion, *t) for t in trabajos]
+            resultados = [f.result() for f in futuros]
+
+    os.makedirs(directorio_base, exist_ok=True)
+    escribir_resumen(resultados, os.path.join(directorio_base, "resumen.csv"))
+    return resultados
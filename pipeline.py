@@ -0,0 +1,194 @@
+"""
+Etapas en hilos conectadas por colas acotadas: lector -> enriquecedor -> escritor.
+
+La lectura del archivo AD y la escritura de los reportes se ejecutan en hilos
+propios, de modo que la E/S (p. ej. sobre una carpeta compartida en red) se
+superpone con el enriquecimiento. Los elementos viajan en lotes para reducir
+el costo de sincronización, y las colas acotadas limitan la memoria usada.
+
+Los reportes se escriben en una carpeta temporal oculta junto a la carpeta
+final y se publican con un renombrado al terminar sin errores, de modo que
+otros procesos nunca ven reportes a medio escribir. Lo que la carpeta final
+ya tenía y la ejecución no reemplaza se conserva.
+"""
+import os
+import queue
+import shutil
+import secrets
+import threading
+
+TAMANO_LOTE = 256
+MAX_LOTES = 8
+
+# Marca de fin de flujo en las colas
+_FIN = object()
+
+def _poner(cola, elemento, detener):
+    """put bloqueante que se rinde si se pidió detener la etapa. Retorna False si se detuvo."""
+    while not detener.is_set():
+        try:
+            cola.put(elemento, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def iterar_en_hilo(iterable, tamano_lote=TAMANO_LOTE, max_lotes=MAX_LOTES):
+    """
+    Recorre `iterable` en un hilo productor y entrega sus elementos en el hilo
+    actual, en el mismo orden. Una excepción del productor se relanza aquí.
+    """
+    cola = queue.Queue(maxsize=max_lotes)
+    detener = threading.Event()
+
+    def producir():
+        lote = []
+        try:
+            for elemento in iterable:
+                lote.append(elemento)
+                if len(lote) >= tamano_lote:
+                    if not _poner(cola, lote, detener):
+                        return
+                    lote = []
+            if lote and not _poner(cola, lote, detener):
+                return
+            _poner(cola, _FIN, detener)
+        except BaseException as e:
+            # Entregar lo leído antes del error, como un recorrido sin hilos
+            if lote and not _poner(cola, lote, detener):
+                return
+            _poner(cola, e, detener)
+
+    hilo = threading.Thread(target=producir, name="lector", daemon=True)
+    hilo.start()
+    try:
+        while True:
+            lote = cola.get()
+            if lote is _FIN:
+                break
+            if isinstance(lote, BaseException):
+                raise lote
+            yield from lote
+    finally:
+        # Si el consumidor se detiene antes de tiempo, liberar al productor
+        detener.set()
+        hilo.join()
+
+class EscritorEnHilo:
+    """
+    Envuelve un escritor de reportes (ver escritores.crear_escritor) para que
+    la escritura ocurra en un hilo dedicado. El escritor se crea dentro de ese
+    hilo con `fabrica`, porque algunos (SQLite) solo pueden usarse desde el
+    hilo que los creó.
+    """
+    def __init__(self, fabrica, tamano_lote=TAMANO_LOTE, max_lotes=MAX_LOTES):
+        self.tamano_lote = tamano_lote
+        self.cola = queue.Queue(maxsize=max_lotes)
+        self.detener = threading.Event()
+        self.lote = []
+        self.escritor = None
+        self.error = None
+        self.hilo = threading.Thread(target=self._consumir, args=(fabrica,), name="escritor", daemon=True)
+        self.hilo.start()
+
+    def _consumir(self, fabrica):
+        try:
+            self.escritor = fabrica()
+            with self.escritor:
+                while not self.detener.is_set():
+                    try:
+                        lote = self.cola.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if lote is _FIN:
+                        return
+                    for nombre, registro in lote:
+                        self.escritor.escribir(nombre, registro)
+        except BaseException as e:
+            self.error = e
+            # Dejar de aceptar lotes para no bloquear al productor
+            self.detener.set()
+
+    def _verificar_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def escribir(self, nombre, registro):
+        self.lote.append((nombre, registro))
+        if len(self.lote) >= self.tamano_lote:
+            lote, self.lote = self.lote, []
+            if not _poner(self.cola, lote, self.detener):
+                self._verificar_error()
+
+    def cerrar(self):
+        """Escribe lo pendiente y espera al hilo escritor. Relanza sus errores."""
+        if self.lote and _poner(self.cola, self.lote, self.detener):
+            self.lote = []
+        _poner(self.cola, _FIN, self.detener)
+        self.hilo.join()
+        self._verificar_error()
+
+    @property
+    def conteos(self):
+        return self.escritor.conteos if self.escritor is not None else {}
+
+    def descripcion(self, nombre):
+        return self.escritor.descripcion(nombre)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is not None:
+            # Error en el productor: descartar lo pendiente y cerrar el escritor
+            self.detener.set()
+            self.hilo.join()
+            return False
+        self.cerrar()
+
+def crear_directorio_temporal(output_dir):
+    """
+    Carpeta temporal oculta junto a output_dir (mismo disco, para poder
+    renombrar). Se crea con os.mkdir para conservar los permisos por defecto.
+    """
+    padre = os.path.dirname(os.path.abspath(output_dir))
+    os.makedirs(padre, exist_ok=True)
+    while True:
+        temporal = os.path.join(padre, f".{os.path.basename(output_dir)}.{secrets.token_hex(4)}.tmp")
+        try:
+            os.mkdir(temporal)
+            return temporal
+        except FileExistsError:
+            continue
+
+def publicar_directorio(temporal, output_dir):
+    """
+    Reemplaza output_dir por la carpeta temporal ya completa. Si output_dir
+    existe, primero se aparta con otro nombre; así los reportes publicados
+    siempre son de una ejecución completa (la anterior o la nueva). Después
+    se devuelve a output_dir todo lo de la carpeta anterior que esta
+    ejecución no generó (archivos del usuario, reportes de otros filtros),
+    como cuando los reportes se escribían sobre la carpeta existente, y se
+    elimina el resto.
+    """
+    anterior = None
+    if os.path.exists(output_dir):
+        anterior = temporal + ".anterior"
+        os.rename(output_dir, anterior)
+    try:
+        os.rename(temporal, output_dir)
+    except BaseException:
+        if anterior is not None:
+            os.rename(anterior, output_dir)
+        raise
+    if anterior is not None:
+        try:
+            for nombre in os.listdir(anterior):
+                if not os.path.lexists(os.path.join(output_dir, nombre)):
+                    os.rename(os.path.join(anterior, nombre), os.path.join(output_dir, nombre))
+            shutil.rmtree(anterior)
+        except OSError as e:
+            raise OSError(
+                f"Los reportes se publicaron en {output_dir}, pero no se pudo terminar de "
+                f"vaciar la carpeta anterior {anterior} (revise su contenido): {e}"
+            ) from e
@@ -0,0 +1,28 @@
+"""
+Utilidades comunes de los scripts de prueba (test_*.py): encabezado,
+verificar() con su contador de errores y cierre que termina con código 1
+si alguna verificación falló, para que un error haga fallar la ejecución.
+"""
+import sys
+
+errores = 0
+
+def iniciar(titulo):
+    print("=" * 80)
+    print(titulo)
+    print("=" * 80)
+
+def verificar(descripcion, condicion):
+    global errores
+    if condicion:
+        print(f"   OK - {descripcion}")
+    else:
+        print(f"   ERROR - {descripcion}")
+        errores += 1
+
+def finalizar():
+    print("\n" + "=" * 80)
+    print("PRUEBA COMPLETADA" if errores == 0 else f"PRUEBA CON {errores} ERRORES")
+    print("=" * 80)
+    if errores:
+        sys.exit(1)
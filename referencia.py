@@ -0,0 +1,149 @@
+"""
+Implementación de referencia de load_csv, congelada.
+
+Es el load_csv original (búsqueda lineal en Registros por cada cuenta) y
+sirve como oráculo para equivalencia.py: cualquier motor, índice o ruta
+paralela debe producir exactamente los mismos archivos, con sus
+particularidades (gana la primera coincidencia en Registros, el responsable
+se arrastra de la fila anterior, la carpeta Sin_fecha, el filtro de mes por
+prefijo). No debe optimizarse ni corregirse: cualquier cambio de
+comportamiento de los reportes se decide fuera de este módulo.
+"""
+import csv
+import re
+import os
+from datetime import datetime
+from collections import defaultdict
+from testChain import get_superior
+from res import buscarCampoCodigo, buscarPorPuestoYDivision, cargar_jerarquia
+
+def load_csv_referencia(AD_File, Regs_File, mes, anio=None, output_dir=None):
+    """
+    load_csv original. output_dir reemplaza la carpeta por defecto
+    ("reportes" + mes + anio). Lanza ValueError si no hay registros.
+    """
+    cargar_jerarquia(Regs_File)
+
+    datos_por_mes = defaultdict(list)
+
+    meses = {
+        1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril",
+        5: "Mayo", 6: "Junio", 7: "Julio", 8: "Agosto",
+        9: "Septiembre", 10: "Octubre", 11: "Noviembre", 12: "Diciembre"
+    }
+
+    with open(AD_File, mode='r', newline='', encoding="utf-8", errors='replace') as file:
+        reader = csv.reader(file, delimiter=';')
+        for row in reader:
+            usCod = row[0]
+            dispName = row[4]
+            enabled = row[14]
+            expiration = row[22]
+            creation = row[18]
+
+            # Filtrar cuentas X habilitadas
+            if (usCod.startswith("X") and any(c.isdigit() for c in usCod)) and enabled == "True":
+                # Obtener fecha de expiracion de la cuenta primero para filtrar
+                account_expires = expiration
+                mes_key = "Sin_fecha"
+                fecha = None
+
+                if account_expires and account_expires != "":
+                    try:
+                        fecha = datetime.strptime(account_expires.split()[0], "%d/%m/%Y")
+                        mes_nombre = meses[fecha.month]
+                        mes_key = f"{mes_nombre}{fecha.year}"
+                    except:
+                        mes_key = "Sin_fecha"
+
+                # Filtrar por mes y año si están especificados
+                if mes and not mes_key.startswith(mes):
+                    continue
+
+                if anio and fecha:
+                    if fecha.year != int(anio):
+                        continue
+                elif anio and not fecha:
+                    # Si se especificó año pero no hay fecha válida, saltar
+                    continue
+
+                # Extraer codigo del responsable de la descripcion
+                desc = row[7]
+                if "Resp" in desc:
+                    parts = re.split(r'[ |,.\-:]+', desc)
+                    respCod = row[7]
+                    for part in parts:
+                        if (part.startswith("S") or part.startswith("B") or part.startswith("b") or part.startswith("s")) and any(c.isdigit() for c in part):
+                            respCod = part
+                            break
+
+                data = buscarCampoCodigo(Regs_File, respCod)
+                nombre = data[0]
+                aPat = data[1]
+                aMat = data[2]
+                correo = data[3]
+                division = data[4]
+                puesto = data[5]
+
+                # Buscar al gerente del responsable
+                gerente_codigo = "N/A"
+                gerente_nombre = "N/A"
+                gerente_correo = "N/A"
+
+                if puesto != "N/A" and puesto != "" and division != "N/A" and division != "":
+                    # Obtener el superior usando la jerarquía (busca por división)
+                    puesto_superior_norm, division_superior = get_superior(puesto, division)
+
+                    if puesto_superior_norm:
+                        # Buscar al gerente en el archivo de registros
+                        gerente_data = buscarPorPuestoYDivision(Regs_File, puesto_superior_norm, division_superior)
+
+                        if gerente_data[0] != "N/A":
+                            gerente_codigo = gerente_data[0]
+                            gerente_nombre = gerente_data[1] + " " + gerente_data[2] + " " + gerente_data[3]
+                            gerente_correo = gerente_data[4]
+
+                # Almacenar registro
+                datos_por_mes[mes_key].append({
+                    "SamAccountName": usCod,
+                    "DisplayName": dispName,
+                    "Responsable": respCod,
+                    "NombreResponsable": nombre + " " + aPat + " " + aMat if nombre != "N/A" and aPat != "N/A" and aMat != "N/A" else "Se requiere busqueda manual",
+                    "CorreoResponsable": correo,
+                    "Division": division,
+                    "Gerente": gerente_codigo,
+                    "NombreGerente": gerente_nombre,
+                    "CorreoGerente": gerente_correo,
+                    "Enabled": enabled,
+                    "whenCreated": creation,
+                    "AccountExpires": expiration
+                })
+
+    if output_dir is None:
+        output_dir = "reportes" + (mes if mes else "") + (str(anio) if anio else "")
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    # Generar archivos CSV con los datos filtrados
+    archivos_generados = 0
+    for mes_key, datos in datos_por_mes.items():
+        nombre_archivo = os.path.join(output_dir, f"{mes_key}.csv")
+        with open(nombre_archivo, mode='w', newline='', encoding="utf-8") as csv_file:
+            fieldnames = ["SamAccountName", "DisplayName", "Responsable", "NombreResponsable", "CorreoResponsable", "Gerente", "NombreGerente", "CorreoGerente", "Division", "Enabled", "whenCreated", "AccountExpires"]
+            writer = csv.DictWriter(csv_file, fieldnames=fieldnames, delimiter=';')
+
+            writer.writeheader()
+            writer.writerows(datos)
+
+        archivos_generados += 1
+
+    # Verificar si se generaron archivos
+    if archivos_generados == 0:
+        filtro_texto = []
+        if mes:
+            filtro_texto.append(f"mes de {mes}")
+        if anio:
+            filtro_texto.append(f"año {anio}")
+        filtro_str = " y ".join(filtro_texto) if filtro_texto else "los criterios especificados"
+        raise ValueError(f"No se encontraron registros para {filtro_str}")
+    return output_dir
@@ -1,9 +1,19 @@
 import csv
 import re
 import os
+import shutil
+import tempfile
+from array import array
 from datetime import datetime
 from collections import defaultdict
 from testChain import load_hierarchy_data, get_superior, normalize_text
+from lectura import ArchivoEntrada
+from codificacion import TablaTextos, compactar_fila_ad
+from expiracion import IndiceExpiracion
+from join_externo import OrdenadorExterno, enriquecer_externo
+from pipeline import EscritorEnHilo, crear_directorio_temporal, iterar_en_hilo, publicar_directorio
+from escritores import FORMATOS, crear_escritor, nombre_particion, parsear_particiones
+from medicion import pico_memoria, texto_memoria
 
 """
 SamAccountName: Seleccionar solo cuentas X
@@ -74,7 +84,370 @@ def buscarPorPuestoYDivision(Regs_File, puesto_norm, division_original=None):
     
     return ["N/A", "N/A", "N/A", "N/A", "N/A"]
 
-def load_csv(AD_File, Regs_File, mes, anio=None):
+class CargaCancelada(Exception):
+    """Se lanza cuando una carga en segundo plano es cancelada."""
+    pass
+
+def _verificar_cancelacion(cancelado):
+    if cancelado is not None and cancelado.is_set():
+        raise CargaCancelada()
+
+# Campos guardados por cada código en IndiceRegs.campos_codigo
+CAMPOS_POR_CODIGO = 6
+
+class IndiceRegs:
+    """
+    Índice en memoria del archivo de registros.
+    Reemplaza los recorridos completos de buscarCampoCodigo y
+    buscarPorPuestoYDivision por búsquedas en diccionarios, respetando
+    la misma semántica (gana la primera coincidencia del archivo).
+    
+    Los valores se guardan como tuplas de códigos de una TablaTextos
+    compartida (ver codificacion.py): cada nombre, división, puesto o correo
+    se guarda una sola vez y las claves normalizadas son enteros.
+    """
+    def __init__(self, Regs_File, cancelado=None):
+        self.Regs_File = Regs_File
+        self.textos = TablaTextos()
+        self.por_codigo = {}             # código -> posición de sus campos en campos_codigo
+        self.campos_codigo = array("I")  # Nombre, A.pat, A.mat, E-mail, Division, Fam. Puesto por código
+        self.por_puesto = {}             # puesto normalizado -> (código, Nombre, A.pat, A.mat, E-mail)
+        self.por_puesto_division = {}    # (puesto, división) normalizados -> ídem
+        self._gerentes = {}              # (puesto, división) del responsable -> datos del gerente
+        
+        codificar = self.textos.codificar
+        normalizado = self.textos.normalizado
+        vacio = codificar("")
+        no_disponible = codificar("N/A")
+        
+        with ArchivoEntrada(Regs_File) as archivo:
+            reader = archivo.filas(delimiter=';')
+            next(reader, None)
+            
+            for n, row in enumerate(reader):
+                if n % 1000 == 0:
+                    _verificar_cancelacion(cancelado)
+                if len(row) <= 25:
+                    continue
+                
+                codigo = row[25].upper()
+                if codigo not in self.por_codigo:
+                    self.por_codigo[codigo] = len(self.campos_codigo)
+                    self.campos_codigo.extend((
+                        codificar(row[1]), codificar(row[2]), codificar(row[3]),
+                        codificar(row[34]) if len(row) > 34 else vacio, codificar(row[11]), codificar(row[10])
+                    ))
+                
+                puesto_actual = normalizado(codificar(row[10]))
+                if puesto_actual == vacio:
+                    continue
+                clave = (puesto_actual, normalizado(codificar(row[11])))
+                if clave in self.por_puesto_division:
+                    # Solo se codifican los datos de la primera coincidencia
+                    continue
+                datos = (
+                    codificar(row[25]), codificar(row[1]), codificar(row[2]), codificar(row[3]),
+                    codificar(row[34]) if len(row) > 34 else no_disponible
+                )
+                self.por_puesto.setdefault(puesto_actual, datos)
+                self.por_puesto_division[clave] = datos
+    
+    def _campos(self, codigo):
+        """Códigos de los campos de buscar_codigo, o None."""
+        posicion = self.por_codigo.get(codigo.upper())
+        return self.campos_codigo[posicion:posicion + CAMPOS_POR_CODIGO] if posicion is not None else None
+    
+    def buscar_codigo(self, codigo):
+        """Equivalente a buscarCampoCodigo sobre el índice."""
+        datos = self._campos(codigo)
+        return self.textos.decodificar(datos) if datos else ["N/A", "N/A", "N/A", "N/A", "N/A", "N/A"]
+    
+    def _buscar_puesto_division(self, puesto_norm, division_original=None):
+        """Códigos del resultado de buscar_puesto_division, o None."""
+        puesto = self.textos.buscar(puesto_norm) if puesto_norm else None
+        if puesto is None:
+            return None
+        if division_original is None:
+            return self.por_puesto.get(puesto)
+        division = self.textos.buscar_normalizado(division_original)
+        return self.por_puesto_division.get((puesto, division)) if division is not None else None
+    
+    def buscar_puesto_division(self, puesto_norm, division_original=None):
+        """Equivalente a buscarPorPuestoYDivision sobre el índice."""
+        datos = self._buscar_puesto_division(puesto_norm, division_original)
+        return self.textos.decodificar(datos) if datos else ["N/A", "N/A", "N/A", "N/A", "N/A"]
+    
+    def resolver(self, respCod):
+        """
+        (data, gerente_data) de un responsable, como buscar_codigo seguido de
+        clave_gerente y buscar_puesto_division. El gerente se resuelve una sola
+        vez por cada (puesto, división) distinto, comparando códigos.
+        """
+        datos = self._campos(respCod)
+        if datos is None:
+            return ["N/A", "N/A", "N/A", "N/A", "N/A", "N/A"], None
+        
+        clave = (datos[5], datos[4])
+        if clave in self._gerentes:
+            gerente = self._gerentes[clave]
+        else:
+            textos = self.textos.textos
+            superior = clave_gerente(textos[datos[5]], textos[datos[4]])
+            gerente = self._buscar_puesto_division(*superior) if superior else None
+            # Con varios hilos dos pueden calcular la misma clave: el resultado es igual
+            self._gerentes[clave] = gerente
+        
+        return self.textos.decodificar(datos), self.textos.decodificar(gerente) if gerente else None
+
+MESES = {
+    1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril",
+    5: "Mayo", 6: "Junio", 7: "Julio", 8: "Agosto",
+    9: "Septiembre", 10: "Octubre", 11: "Noviembre", 12: "Diciembre"
+}
+
+def _clave_mes(expiration):
+    """Retorna (mes_key, fecha) a partir del campo AccountExpires."""
+    mes_key = "Sin_fecha"
+    fecha = None
+    if expiration and expiration != "":
+        try:
+            fecha = datetime.strptime(expiration.split()[0], "%d/%m/%Y")
+            mes_key = f"{MESES[fecha.month]}{fecha.year}"
+        except:
+            fecha = None
+            mes_key = "Sin_fecha"
+    return mes_key, fecha
+
+def _leer_cuentas_ad(AD_File, cancelado=None):
+    """Genera (mes_key, fecha, row) por cada cuenta X habilitada del archivo AD."""
+    with ArchivoEntrada(AD_File) as archivo:
+        reader = archivo.filas(delimiter=';')
+        for n, row in enumerate(reader):
+            if n % 1000 == 0:
+                _verificar_cancelacion(cancelado)
+            usCod = row[0]
+            enabled = row[14]
+            
+            # Filtrar cuentas X habilitadas
+            if (usCod.startswith("X") and any(c.isdigit() for c in usCod)) and enabled == "True":
+                mes_key, fecha = _clave_mes(row[22])
+                yield mes_key, fecha, row
+
+def leer_cuentas_ad(AD_File, mes=None, anio=None, cancelado=None, motor="python"):
+    """
+    Genera (mes_key, fecha, row) de las cuentas X habilitadas que pasan el filtro
+    de mes y año. motor="numpy" usa el motor columnar (ver columnar.py).
+    """
+    if motor == "numpy":
+        import columnar
+        return columnar.filtrar_cuentas_ad(AD_File, mes, anio, cancelado)
+    if motor != "python":
+        raise ValueError(f"Motor desconocido: '{motor}' (válidos: python, numpy)")
+    return (c for c in _leer_cuentas_ad(AD_File, cancelado) if _pasa_filtro(c[0], c[1], mes, anio))
+
+def _pasa_filtro(mes_key, fecha, mes, anio):
+    """Filtro por mes y año tal como lo aplica load_csv."""
+    if mes and not mes_key.startswith(mes):
+        return False
+    if anio and fecha:
+        if fecha.year != int(anio):
+            return False
+    elif anio and not fecha:
+        # Si se especificó año pero no hay fecha válida, saltar
+        return False
+    return True
+
+class CuentasAD:
+    """
+    Cuentas X habilitadas del archivo AD ya parseadas y agrupadas por mes_key.
+    Permite generar reportes de cualquier mes o año sin volver a leer el archivo.
+    """
+    def __init__(self, AD_File, cancelado=None, motor="python"):
+        self.AD_File = AD_File
+        self.cuentas = []                    # (mes_key, fecha, row) en orden del archivo
+        self.por_mes = defaultdict(list)     # mes_key -> posiciones en self.cuentas
+        self._indice_expiracion = None
+        # Una sola instancia de cada mes_key y cada fecha, y filas sin las columnas no usadas
+        compartidos = {}
+        for mes_key, fecha, row in leer_cuentas_ad(AD_File, cancelado=cancelado, motor=motor):
+            mes_key = compartidos.setdefault(mes_key, mes_key)
+            fecha = compartidos.setdefault(fecha, fecha)
+            self.por_mes[mes_key].append(len(self.cuentas))
+            self.cuentas.append((mes_key, fecha, compactar_fila_ad(row)))
+    
+    def filtrar(self, mes, anio=None):
+        """Cuentas que pasan el filtro de mes y año, en el orden del archivo."""
+        posiciones = []
+        for mes_key, lista in self.por_mes.items():
+            fecha = self.cuentas[lista[0]][1]
+            # Todas las cuentas de un mes_key comparten mes y año
+            if _pasa_filtro(mes_key, fecha, mes, anio):
+                posiciones.extend(lista)
+        posiciones.sort()
+        return [self.cuentas[i] for i in posiciones]
+    
+    def indice_expiracion(self):
+        """Índice por fecha de expiración, construido en la primera consulta."""
+        if self._indice_expiracion is None:
+            self._indice_expiracion = IndiceExpiracion(self.cuentas)
+        return self._indice_expiracion
+    
+    def ventana(self, desde=None, hasta=None):
+        """
+        (cuentas, orden) de las cuentas que expiran entre desde y hasta
+        (inclusive): cuentas en el orden del archivo, para que el responsable
+        arrastrado de la cuenta anterior sea el mismo que al filtrar por mes,
+        y orden, las posiciones de cuentas ordenadas por fecha de expiración
+        (a igual fecha, por orden en el archivo).
+        """
+        por_fecha = self.indice_expiracion().rango(desde, hasta)
+        en_archivo = sorted(por_fecha)
+        posicion = {p: i for i, p in enumerate(en_archivo)}
+        return [self.cuentas[p] for p in en_archivo], [posicion[p] for p in por_fecha]
+
+# Última CuentasAD cargada por obtener_cuentas_ad: (clave, cuentas)
+_cache_cuentas_ad = None
+
+def obtener_cuentas_ad(AD_File, motor="python"):
+    """
+    CuentasAD del archivo, reutilizando la última cargada mientras el archivo
+    no cambie en disco (misma ruta, tamaño y fecha de modificación).
+    """
+    global _cache_cuentas_ad
+    
+    info = os.stat(AD_File)
+    clave = (os.path.abspath(AD_File), info.st_size, info.st_mtime_ns)
+    cache = _cache_cuentas_ad
+    if cache is None or cache[0] != clave:
+        # Variable local: con varios hilos, otro podría reemplazar la caché entre medio
+        cache = (clave, CuentasAD(AD_File, motor=motor))
+        _cache_cuentas_ad = cache
+    return cache[1]
+
+def extraer_responsable(desc, anterior, usCod=""):
+    """
+    Extrae el código del responsable de la descripción de la cuenta.
+    Si la descripción no menciona "Resp" se conserva el responsable de la
+    cuenta anterior (comportamiento histórico de load_csv).
+    """
+    if "Resp" in desc:
+        parts = re.split(r'[ |,.\-:]+', desc)
+        respCod = desc
+        for part in parts:
+            if (part.startswith("S") or part.startswith("B") or part.startswith("b") or part.startswith("s")) and any(c.isdigit() for c in part):
+                respCod = part
+                break
+        return respCod
+    if anterior is None:
+        raise ValueError(f"La cuenta {usCod} no indica responsable (Resp) en la descripción y no hay una cuenta anterior de la cual tomarlo")
+    return anterior
+
+def clave_gerente(puesto, division):
+    """
+    (puesto_superior_norm, division_superior) con los que se busca al gerente
+    del responsable, o None si el responsable no tiene puesto superior.
+    """
+    if puesto != "N/A" and puesto != "" and division != "N/A" and division != "":
+        # Obtener el superior usando la jerarquía (busca por división)
+        puesto_superior_norm, division_superior = get_superior(puesto, division)
+        if puesto_superior_norm:
+            return puesto_superior_norm, division_superior
+    return None
+
+def armar_registro(row, respCod, data, gerente_data=None):
+    """
+    Registro del reporte a partir de la fila AD, los datos del responsable
+    (formato de buscarCampoCodigo) y del gerente (formato de buscarPorPuestoYDivision).
+    """
+    usCod = row[0]
+    dispName = row[4]
+    enabled = row[14]
+    expiration = row[22]
+    creation = row[18]
+    
+    nombre = data[0]
+    aPat = data[1]
+    aMat = data[2]
+    correo = data[3]
+    division = data[4]
+    
+    # Buscar al gerente del responsable
+    gerente_codigo = "N/A"
+    gerente_nombre = "N/A"
+    gerente_correo = "N/A"
+    
+    if gerente_data is not None and gerente_data[0] != "N/A":
+        gerente_codigo = gerente_data[0]
+        gerente_nombre = gerente_data[1] + " " + gerente_data[2] + " " + gerente_data[3]
+        gerente_correo = gerente_data[4]
+    
+    return {
+        "SamAccountName": usCod,
+        "DisplayName": dispName,
+        "Responsable": respCod,
+        "NombreResponsable": nombre + " " + aPat + " " + aMat if nombre != "N/A" and aPat != "N/A" and aMat != "N/A" else "Se requiere busqueda manual",
+        "CorreoResponsable": correo,
+        "Division": division,
+        "Gerente": gerente_codigo,
+        "NombreGerente": gerente_nombre,
+        "CorreoGerente": gerente_correo,
+        "Enabled": enabled,
+        "whenCreated": creation,
+        "AccountExpires": expiration
+    }
+
+def _enriquecer(cuentas, indice_regs):
+    """Genera (mes_key, registro) enriqueciendo cada cuenta con el índice de registros."""
+    respCod = None
+    for mes_key, fecha, row in cuentas:
+        respCod = extraer_responsable(row[7], respCod, row[0])
+        # Responsable y gerente desde el índice de registros
+        data, gerente_data = indice_regs.resolver(respCod)
+        
+        yield mes_key, armar_registro(row, respCod, data, gerente_data)
+
+def _lugar(pendiente):
+    return int(pendiente[0])
+
+def _reordenar(registros, orden, memoria_mb=None):
+    """
+    Registros enriquecidos (uno por cuenta, en el orden de entrada) en el
+    orden dado por posiciones. Los pendientes se guardan como tuplas en un
+    join_externo.OrdenadorExterno, ordenados por su lugar en orden; con
+    memoria_mb se vuelcan a archivos temporales al superar el presupuesto.
+    """
+    lugares = array("L", bytes(array("L").itemsize * len(orden)))
+    for lugar, posicion in enumerate(orden):
+        lugares[posicion] = lugar
+    presupuesto = float("inf") if memoria_mb is None else max(1, int(memoria_mb * 1024 * 1024))
+    with tempfile.TemporaryDirectory(prefix="gr_orden_") as directorio:
+        ordenador = OrdenadorExterno(_lugar, presupuesto, directorio)
+        campos = None
+        for posicion, (mes_key, registro) in enumerate(registros):
+            if campos is None:
+                campos = tuple(registro)
+            ordenador.agregar((str(lugares[posicion]), mes_key) + tuple(registro.values()))
+        for pendiente in ordenador.ordenado():
+            yield pendiente[1], dict(zip(campos, pendiente[2:]))
+
+def _filtrar_divisiones(registros, divisiones):
+    """Registros (mes_key, registro) cuya división normalizada está entre divisiones."""
+    permitidas = {normalize_text(d) for d in divisiones}
+    vistas = {}    # división -> si está permitida, normalizada una vez por texto distinto
+    for mes_key, registro in registros:
+        division = registro["Division"]
+        permitida = vistas.get(division)
+        if permitida is None:
+            permitida = vistas[division] = normalize_text(division) in permitidas
+        if permitida:
+            yield mes_key, registro
+
+def _texto_rango(desde, hasta, formato, separador, abierto="..."):
+    """Representación de una ventana de fechas; los extremos abiertos se muestran como `abierto`."""
+    return separador.join(f.strftime(formato) if f is not None else abierto for f in (desde, hasta))
+
+def cargar_jerarquia(Regs_File):
+    """Carga la jerarquía de puestos una sola vez por proceso."""
     global hierarchy_mapping
     
     # Cargar jerarquía desde el mismo archivo Regs usando índices 10 y 11
@@ -85,145 +458,156 @@ def load_csv(AD_File, Regs_File, mes, anio=None):
         except Exception as e:
             print(f"No se pudo cargar la jerarquía: {e}")
             hierarchy_mapping = {}
+
+def directorio_reportes(mes=None, anio=None, desde=None, hasta=None):
+    """Nombre de la carpeta de reportes por defecto para el filtro dado."""
+    if desde is not None or hasta is not None:
+        return "reportes" + _texto_rango(desde, hasta, "%Y%m%d", "_", abierto="sinlimite")
+    return "reportes" + (mes if mes else "") + (str(anio) if anio else "")
+
+def generar_reportes(AD_File, Regs_File, mes, anio=None, indice_regs=None, cuentas_ad=None,
+                     particiones=("mes",), max_archivos_abiertos=64, formato="csv", motor="python",
+                     desde=None, hasta=None, modo_join="indice", memoria_join_mb=64,
+                     directorio_salida=None, memoria_mb=None, divisiones=None):
+    """
+    Genera los reportes como load_csv, sin imprimir ni fallar si no hay
+    registros. directorio_salida reemplaza la carpeta por defecto
+    (ver directorio_reportes). Retorna (output_dir, archivos), con archivos
+    una lista de (descripción del archivo publicado, cantidad de registros).
+    """
+    if isinstance(particiones, str):
+        particiones = parsear_particiones(particiones)
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de salida desconocido: '{formato}'")
+    if modo_join not in ("indice", "externo"):
+        raise ValueError(f"Modo de join desconocido: '{modo_join}' (válidos: indice, externo)")
     
-    datos_por_mes = defaultdict(list)
+    cargar_jerarquia(Regs_File)
     
-    meses = {
-        1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril",
-        5: "Mayo", 6: "Junio", 7: "Julio", 8: "Agosto",
-        9: "Septiembre", 10: "Octubre", 11: "Noviembre", 12: "Diciembre"
-    }
+    por_rango = desde is not None or hasta is not None
+    if por_rango:
+        if cuentas_ad is None:
+            cuentas_ad = obtener_cuentas_ad(AD_File, motor=motor)
+        cuentas, orden = cuentas_ad.ventana(desde, hasta)
+    elif cuentas_ad is not None:
+        cuentas = cuentas_ad.filtrar(mes, anio)
+    else:
+        cuentas = leer_cuentas_ad(AD_File, mes, anio, motor=motor)
     
-    with open(AD_File, mode='r', newline='', encoding="utf-8", errors='replace') as file:
-        reader = csv.reader(file, delimiter=';')
-        for row in reader:
-            usCod = row[0]
-            dispName = row[4]
-            enabled = row[14]
-            expiration = row[22]
-            creation = row[18]
-            
-            # Filtrar cuentas X habilitadas
-            if (usCod.startswith("X") and any(c.isdigit() for c in usCod)) and enabled == "True":
-                # Obtener fecha de expiracion de la cuenta primero para filtrar
-                account_expires = expiration
-                mes_key = "Sin_fecha"
-                fecha = None
-                
-                if account_expires and account_expires != "":
-                    try:
-                        fecha = datetime.strptime(account_expires.split()[0], "%d/%m/%Y")
-                        mes_nombre = meses[fecha.month]
-                        mes_key = f"{mes_nombre}{fecha.year}"
-                    except:
-                        mes_key = "Sin_fecha"
-                
-                # Filtrar por mes y año si están especificados
-                if mes and not mes_key.startswith(mes):
-                    continue
-                
-                if anio and fecha:
-                    if fecha.year != int(anio):
-                        continue
-                elif anio and not fecha:
-                    # Si se especificó año pero no hay fecha válida, saltar
-                    continue
-                
-                # Extraer codigo del responsable de la descripcion
-                desc = row[7]
-                if "Resp" in desc:
-                    parts = re.split(r'[ |,.\-:]+', desc)
-                    respCod = row[7]
-                    for part in parts:
-                        if (part.startswith("S") or part.startswith("B") or part.startswith("b") or part.startswith("s")) and any(c.isdigit() for c in part):
-                            respCod = part
-                            break
-                
-                data = buscarCampoCodigo(Regs_File, respCod)
-                nombre = data[0]
-                aPat = data[1]
-                aMat = data[2]
-                correo = data[3]
-                division = data[4]
-                puesto = data[5]
-                # if(nombre != "N/A"):
-                    # print("Responsable encontrado: {} - {} {} {}".format(respCod, nombre, aPat, aMat))
-                    # print("Correo: {}, Division: {}, Puesto: {}".format(correo, division, puesto))
-                
-                # Buscar al gerente del responsable
-                gerente_codigo = "N/A"
-                gerente_nombre = "N/A"
-                gerente_correo = "N/A"
-                
-                if puesto != "N/A" and puesto != "" and division != "N/A" and division != "":
-                    # Obtener el superior usando la jerarquía (busca por división)
-                    puesto_superior_norm, division_superior = get_superior(puesto, division)
-                    
-                    if puesto_superior_norm:
-                        # Buscar al gerente en el archivo de registros
-                        # print(f"Buscando gerente con puesto: '{puesto_superior_norm}' en division: '{division_superior}'")
-                        gerente_data = buscarPorPuestoYDivision(Regs_File, puesto_superior_norm, division_superior)
-                        
-                        if gerente_data[0] != "N/A":
-                            gerente_codigo = gerente_data[0]
-                            gerente_nombre = gerente_data[1] + " " + gerente_data[2] + " " + gerente_data[3]
-                            gerente_correo = gerente_data[4]
-                            # print(f"GERENTE ENCONTRADO: {gerente_codigo} - {gerente_nombre}")
-                        # else:
-                            # print(f"No se encontró gerente con puesto '{puesto_superior_norm}' en '{division_superior}'")
-                    # else:
-                        # print(f"No se encontró puesto superior para división: '{division}'")
-
-                # Almacenar registro
-                datos_por_mes[mes_key].append({
-                    "SamAccountName": usCod,
-                    "DisplayName": dispName,
-                    "Responsable": respCod,
-                    "NombreResponsable": nombre + " " + aPat + " " + aMat if nombre != "N/A" and aPat != "N/A" and aMat != "N/A" else "Se requiere busqueda manual",
-                    "CorreoResponsable": correo,
-                    "Division": division,
-                    "Gerente": gerente_codigo,
-                    "NombreGerente": gerente_nombre,
-                    "CorreoGerente": gerente_correo,
-                    "Enabled": enabled,
-                    "whenCreated": creation,
-                    "AccountExpires": expiration
-                })
-                
-                # print("SamAccountName: {} - DisplayName: {} - Responsable: {} - NombreResponsable: {} - CorreoResponsable: {} - Division: {} - Enabled: {} - whenCreated: {} - AccountExpires: {}".format(
-                #     usCod, dispName, respCod, nombre + " " + aPat + " " + aMat, correo, division, enabled, creation, expiration
-                # ))
-
-    output_dir = "reportes" + (mes if mes else "") + (str(anio) if anio else "")
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    # Generar archivos CSV con los datos filtrados
-    archivos_generados = 0
-    for mes_key, datos in datos_por_mes.items():
-        nombre_archivo = os.path.join(output_dir, f"{mes_key}.csv")
-        with open(nombre_archivo, mode='w', newline='', encoding="utf-8") as csv_file:
-            fieldnames = ["SamAccountName", "DisplayName", "Responsable", "NombreResponsable", "CorreoResponsable", "Gerente", "NombreGerente", "CorreoGerente", "Division", "Enabled", "whenCreated", "AccountExpires"]
-            writer = csv.DictWriter(csv_file, fieldnames=fieldnames, delimiter=';')
-            
-            writer.writeheader()
-            writer.writerows(datos)
+    output_dir = directorio_salida or directorio_reportes(mes, anio, desde, hasta)
+    
+    # Lector (hilo) -> enriquecimiento (este hilo) -> escritor (hilo), unidos por colas acotadas
+    lector = iterar_en_hilo(cuentas)
+    if modo_join == "externo":
+        registros = enriquecer_externo(lector, Regs_File, memoria_join_mb)
+    else:
+        if indice_regs is None:
+            indice_regs = IndiceRegs(Regs_File)
+        registros = _enriquecer(lector, indice_regs)
+    if por_rango:
+        # Responsables resueltos en el orden del archivo; las filas se escriben
+        # por fecha. Reordenar y escribir conviven: se reparten el presupuesto
+        if memoria_mb is not None:
+            memoria_mb = memoria_mb / 2
+        registros = _reordenar(registros, orden, memoria_mb)
+    if divisiones is not None:
+        registros = _filtrar_divisiones(registros, divisiones)
+    
+    # Los reportes se escriben en una carpeta temporal y se publican al terminar
+    temporal = crear_directorio_temporal(output_dir)
+    try:
+        # Generar archivos CSV con los datos filtrados, en una sola pasada
+        fabrica = lambda: crear_escritor(formato, temporal, max_abiertos=max_archivos_abiertos, memoria_mb=memoria_mb)
+        with EscritorEnHilo(fabrica) as pool:
+            for mes_key, registro in registros:
+                pool.escribir(nombre_particion(particiones, mes_key, registro), registro)
         
-        print(f"\nArchivo creado: {nombre_archivo} con {len(datos)} registros")
-        archivos_generados += 1
+        if pool.conteos:
+            publicar_directorio(temporal, output_dir)
+    finally:
+        # Detener el hilo lector si la escritura terminó con error
+        lector.close()
+        if os.path.exists(temporal):
+            shutil.rmtree(temporal, ignore_errors=True)
+    
+    archivos = [
+        (os.path.join(output_dir, os.path.relpath(pool.descripcion(nombre), temporal)), cantidad)
+        for nombre, cantidad in pool.conteos.items()
+    ]
+    return output_dir, archivos
+
+def load_csv(AD_File, Regs_File, mes, anio=None, indice_regs=None, cuentas_ad=None,
+             particiones=("mes",), max_archivos_abiertos=64, formato="csv", motor="python",
+             desde=None, hasta=None, modo_join="indice", memoria_join_mb=64, memoria_mb=None,
+             divisiones=None):
+    """
+    Genera los reportes por mes. indice_regs (IndiceRegs) y cuentas_ad
+    (CuentasAD) permiten reutilizar datos ya cargados, p. ej. por la
+    precarga de la interfaz; si no se entregan se construyen aquí.
+    
+    particiones define cómo se separan los archivos de salida: una tupla
+    (o texto separado por comas) de claves entre mes, division, gerente y
+    responsable. Por defecto un archivo por mes. max_archivos_abiertos
+    limita los archivos abiertos simultáneamente. formato elige la salida:
+    csv, csv.gz, csv.xz, jsonl o sqlite (ver escritores.FORMATOS).
+    motor="numpy" filtra las cuentas AD con el motor columnar (requiere NumPy).
+    
+    desde/hasta (date, inclusive) seleccionan las cuentas por ventana de
+    fechas de expiración en lugar de mes y año, usando el índice ordenado
+    de CuentasAD (cacheado por archivo); las filas salen ordenadas por fecha.
+    
+    modo_join="externo" cruza AD y Registros con ordenamiento externo y
+    merge-join (ver join_externo.py), con memoria acotada por memoria_join_mb,
+    en lugar de cargar el índice de Registros en memoria.
+    
+    memoria_mb fija un presupuesto para las filas pendientes de escribir:
+    se agrupan por partición y, al superarlo, se vuelcan a archivos
+    temporales que se concatenan al final (ver escritores.EscritorConPresupuesto).
+    Sin presupuesto las filas se escriben a medida que se generan. Con
+    desde/hasta el presupuesto también cubre las filas que esperan su turno
+    en el orden por fecha (la mitad para cada etapa).
+    
+    divisiones (lista de nombres de división) restringe los reportes a las
+    cuentas cuyo responsable pertenece a alguna de ellas, sin distinguir
+    mayúsculas ni tildes (ver autocompletado.CatalogoDivisiones para
+    validarlas).
+    """
+    output_dir, archivos = generar_reportes(
+        AD_File, Regs_File, mes, anio, indice_regs=indice_regs, cuentas_ad=cuentas_ad,
+        particiones=particiones, max_archivos_abiertos=max_archivos_abiertos, formato=formato,
+        motor=motor, desde=desde, hasta=hasta, modo_join=modo_join, memoria_join_mb=memoria_join_mb,
+        memoria_mb=memoria_mb, divisiones=divisiones
+    )
+    informar_reportes(archivos, mes, anio, desde, hasta, divisiones)
+    return output_dir
+
+def informar_reportes(archivos, mes=None, anio=None, desde=None, hasta=None, divisiones=None):
+    """
+    Imprime los archivos que publicó generar_reportes y el pico de memoria.
+    Lanza ValueError si no se generó ninguno para el filtro dado.
+    """
+    por_rango = desde is not None or hasta is not None
+    
+    for descripcion, cantidad in archivos:
+        print(f"\nArchivo creado: {descripcion} con {cantidad} registros")
+    archivos_generados = len(archivos)
+    print(f"\nPico de memoria: {texto_memoria(pico_memoria())}")
     
     # Verificar si se generaron archivos
     if archivos_generados == 0:
         filtro_texto = []
-        if mes:
+        if por_rango:
+            filtro_texto.append(f"el rango {_texto_rango(desde, hasta, '%d/%m/%Y', ' - ')}")
+        if mes and not por_rango:
             filtro_texto.append(f"mes de {mes}")
-        if anio:
+        if anio and not por_rango:
             filtro_texto.append(f"año {anio}")
+        if divisiones is not None:
+            filtro_texto.append(f"las divisiones {', '.join(divisiones)}")
         filtro_str = " y ".join(filtro_texto) if filtro_texto else "los criterios especificados"
         mensaje = f"\nNo se encontraron registros para {filtro_str}"
         print(mensaje)
         raise ValueError(f"No se encontraron registros para {filtro_str}")
-    return output_dir
 
 if __name__ == "__main__":
     AD_File = "AD-06-01-26.csv"
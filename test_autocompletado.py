@@ -0,0 +1,118 @@
+"""
+Script de prueba para el autocompletado de divisiones
+"""
+import csv
+import os
+import random
+import tempfile
+import time
+from autocompletado import CatalogoDivisiones, ListaOrdenada, TrieTopK, normalizar_prefijo
+from res import IndiceRegs, generar_reportes
+from testChain import normalize_text
+from pruebas import finalizar, iniciar, verificar
+
+iniciar("PRUEBA DE AUTOCOMPLETADO DE DIVISIONES")
+
+def esperado(pesos, prefijo, k):
+    """Completados por fuerza bruta: (peso descendente, clave) entre las claves con el prefijo."""
+    normal = normalizar_prefijo(prefijo)
+    coincidencias = sorted((-peso, clave, texto) for clave, (texto, peso) in pesos.items() if clave.startswith(normal))
+    return [texto for _, _, texto in coincidencias[:k]]
+
+print("\n1. Trie y lista ordenada frente a la fuerza bruta...")
+random.seed(8)
+palabras = ["DIV.", "DIV. ", "VP.", "TRIBU ", "GCIA ", "Transformación", "RIESGOS", "BANCA", "Ñandú", "PAGOS", " Y ", "MDC"]
+textos = ["".join(random.choice(palabras) for _ in range(random.randint(1, 4))) for _ in range(3000)]
+completadores = [TrieTopK(k=5), ListaOrdenada(k=5)]
+pesos = {}
+for texto in textos:
+    peso = random.randint(1, 20)
+    clave = normalize_text(texto)
+    if not clave:
+        continue
+    anterior = pesos.get(clave)
+    pesos[clave] = (anterior[0] if anterior else texto, peso + (anterior[1] if anterior else 0))
+    for completador in completadores:
+        completador.agregar(texto, peso)
+for completador in completadores:
+    completador.construir()
+
+prefijos = ["", "d", "DIV", "div. ", "div.", "transformacion", "TRANSFORMACIÓN", "ñ", "nandu", "vp.r", "zzz"] + [t[:random.randint(1, len(t))] for t in random.sample(textos, 200)]
+for completador in completadores:
+    nombre = type(completador).__name__
+    verificar(f"{nombre}: mismos resultados que la fuerza bruta", all(completador.completar(p) == esperado(pesos, p, 5) for p in prefijos))
+verificar("un espacio final restringe los completados", all(normalize_text(t).startswith("div. ") for t in completadores[0].completar("div. ")))
+verificar("buscar ignora mayúsculas y tildes", completadores[0].buscar(pesos[normalize_text(textos[0])][0].lower()) == pesos[normalize_text(textos[0])][0])
+verificar("buscar sin coincidencia", completadores[1].buscar("no existe") is None)
+
+print("\n2. Tiempo por tecla con 50.000 divisiones...")
+trie, lista = TrieTopK(), ListaOrdenada()
+for i in range(50_000):
+    texto = f"DIV. {random.choice(palabras)} {i}"
+    trie.agregar(texto, random.randint(1, 100))
+    lista.agregar(texto, random.randint(1, 100))
+trie.construir()
+lista.construir()
+for completador in (trie, lista):
+    inicio = time.perf_counter()
+    for _ in range(200):
+        for prefijo in ("d", "di", "div", "div.", "div. "):
+            completador.completar(prefijo)
+    print(f"   {type(completador).__name__}: {(time.perf_counter() - inicio) / 1000 * 1e6:.1f} µs por tecla")
+
+print("\n3. Catálogo de divisiones de Registros...")
+divisiones = ["DIV.CONTABILIDAD"] * 5 + ["Div.Contabilidad"] * 2 + ["TRIBU PAGOS"] * 3 + ["DIV. TRANSFORMACIÓN BANCA COMERCIAL Y MDC"] * 4 + ["VP.RIESGOS", ""]
+with tempfile.TemporaryDirectory() as tmp:
+    regs = os.path.join(tmp, "regs.csv")
+    with open(regs, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow([f"h{i}" for i in range(36)])
+        for i, division in enumerate(divisiones):
+            row = [""] * 36
+            row[1], row[2], row[3] = f"Nombre{i}", "Pérez", "Gómez"
+            row[10], row[11], row[25], row[34] = "ANALISTA", division, f"S{100 + i}", f"u{i}@x.com"
+            writer.writerow(row)
+        # Gerentes de división: el primero de cada división es el superior
+        for i, (puesto, division) in enumerate([("GERENTE DE DIVISIÓN", "DIV.CONTABILIDAD"), ("GERENTE DE DIVISION", "DIV.CONTABILIDAD"), ("LIDER DE TRIBU", "TRIBU PAGOS")]):
+            row = [""] * 36
+            row[1], row[2], row[3] = f"Jefe{i}", "Ruiz", "Díaz"
+            row[10], row[11], row[25], row[34] = puesto, division, f"S{900 + i}", f"j{i}@x.com"
+            writer.writerow(row)
+
+    indice = IndiceRegs(regs)
+    for tipo in ("trie", "lista"):
+        catalogo = CatalogoDivisiones(indice, tipo=tipo)
+        verificar(f"{tipo}: divisiones normalizadas, más colaboradores primero", catalogo.completar("") == ["DIV.CONTABILIDAD", "DIV. TRANSFORMACIÓN BANCA COMERCIAL Y MDC", "TRIBU PAGOS", "VP.RIESGOS"])
+        verificar(f"{tipo}: completado sin tildes", catalogo.completar("div. transformacion") == ["DIV. TRANSFORMACIÓN BANCA COMERCIAL Y MDC"])
+    verificar("validar devuelve el nombre de Registros", catalogo.validar("div.contabilidad") == "DIV.CONTABILIDAD" and catalogo.validar("DIV.OTRA") is None)
+    verificar("sugerencias para una división mal escrita", catalogo.sugerir("div.contavilidad") == ["DIV.CONTABILIDAD"] and catalogo.sugerir("zzz") == catalogo.completar(""))
+    verificar("superior de una división con gerente", catalogo.superior("Div.Contabilidad") == ("gerente de division", ["S900", "Jefe0", "Ruiz", "Díaz", "j0@x.com"]))
+    verificar("superior sin persona en Registros", catalogo.superior("VP.RIESGOS") == ("vice presidente ejecutivo", None))
+    verificar("división sin superior en la jerarquía", catalogo.superior("SIN JERARQUIA") == (None, None))
+
+    print("\n4. Reportes restringidos a divisiones...")
+    ad = os.path.join(tmp, "AD.csv")
+    with open(ad, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        for i in range(200):
+            row = [""] * 23
+            row[0], row[4], row[14] = f"X{i}", f"Cuenta {i}", "True"
+            row[7] = f"Resp: S{100 + random.randrange(len(divisiones) + 2)}"
+            row[22] = f"{random.randint(1, 28):02d}/{random.randint(1, 3):02d}/2026 00:00:00"
+            writer.writerow(row)
+
+    def filas(carpeta):
+        resultado = []
+        for nombre in sorted(os.listdir(carpeta)):
+            with open(os.path.join(carpeta, nombre), newline="", encoding="utf-8") as f:
+                resultado.extend((nombre, tuple(r)) for r in list(csv.DictReader(f, delimiter=";")) for r in [r.values()])
+        return resultado
+
+    todas, _ = generar_reportes(ad, regs, None, "2026", indice_regs=indice, directorio_salida=os.path.join(tmp, "todas"))
+    filtradas, archivos = generar_reportes(ad, regs, None, "2026", indice_regs=indice, directorio_salida=os.path.join(tmp, "filtradas"), divisiones=["div.contabilidad", "TRIBU PAGOS"])
+    esperadas = [(n, r) for n, r in filas(todas) if normalize_text(r[8]) in ("div.contabilidad", "tribu pagos")]
+    verificar("solo filas de las divisiones elegidas, en el mismo orden", filas(filtradas) == esperadas and len(esperadas) > 0)
+    vacio, archivos = generar_reportes(ad, regs, None, "2026", indice_regs=indice, directorio_salida=os.path.join(tmp, "vacio"), divisiones=["DIV.OTRA"])
+    verificar("división sin cuentas no genera archivos", archivos == [] and not os.path.exists(vacio))
+
+finalizar()
@@ -0,0 +1,64 @@
+"""
+Script de prueba para la codificación por diccionario del índice de Registros
+"""
+import csv
+import os
+import random
+import tempfile
+from codificacion import TablaTextos, compactar_fila_ad
+from res import IndiceRegs, buscarCampoCodigo, buscarPorPuestoYDivision, clave_gerente
+from testChain import normalize_text
+from pruebas import finalizar, iniciar, verificar
+
+iniciar("PRUEBA DE CODIFICACION POR DICCIONARIO")
+
+print("\n1. Tabla de textos...")
+tabla = TablaTextos()
+a = tabla.codificar("DIV. TRANSFORMACIÓN")
+verificar("mismo texto, mismo código", tabla.codificar("DIV. TRANSFORMACIÓN") == a and len(tabla) == 1)
+verificar("decodificar", tabla.decodificar((a, a)) == ["DIV. TRANSFORMACIÓN"] * 2)
+normal = tabla.normalizado(a)
+verificar("normalizado", tabla.textos[normal] == normalize_text("DIV. TRANSFORMACIÓN"))
+verificar("buscar_normalizado no agrega textos", tabla.buscar_normalizado("div. transformacion") == normal and tabla.buscar_normalizado("OTRA") is None and len(tabla) == 2)
+
+fila = [f"c{i}" for i in range(23)]
+compacta = compactar_fila_ad(fila)
+verificar("fila AD compacta conserva las columnas usadas", [compacta[i] for i in (0, 4, 7, 14, 18, 22)] == [fila[i] for i in (0, 4, 7, 14, 18, 22)])
+verificar("fila AD compacta vacía las demás", len(compacta) == 23 and compacta[1] == "" and compacta[20] == "")
+
+print("\n2. Índice codificado frente a la búsqueda lineal...")
+random.seed(3)
+divisiones = ["DIV.CONTABILIDAD", "Div.Contabilidad", "TRIBU PAGOS", "VP.RIESGOS", "DIV. TRANSFORMACIÓN BANCA COMERCIAL Y MDC", ""]
+puestos = ["ANALISTA", "GERENTE DE DIVISION", "GERENTE DE DIVISIÓN", "LIDER DE TRIBU", "VICE PRESIDENTE EJECUTIVO", ""]
+with tempfile.TemporaryDirectory() as tmp:
+    regs = os.path.join(tmp, "regs.csv")
+    with open(regs, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow([f"h{i}" for i in range(36)])
+        for i in range(400):
+            row = [""] * 36
+            row[1], row[2], row[3] = random.choice(["Juan", "María"]), "Pérez", random.choice(["Gómez", "Ruiz"])
+            row[10], row[11] = random.choice(puestos), random.choice(divisiones)
+            row[25], row[34] = random.choice("Ss") + str(100 + random.randint(0, 150)), f"u{i}@x.com"
+            # Filas cortas: sin correo o sin código
+            writer.writerow(row[:random.choice([36, 36, 30, 20])])
+
+    indice = IndiceRegs(regs)
+    codigos = [p + str(n) for p in "Ss" for n in range(90, 260)]
+    verificar("buscar_codigo igual a buscarCampoCodigo", all(indice.buscar_codigo(c) == buscarCampoCodigo(regs, c) for c in codigos))
+
+    consultas = [(normalize_text(p), d) for p in puestos + ["OTRO"] for d in divisiones + ["otra", None]]
+    verificar(
+        "buscar_puesto_division igual a buscarPorPuestoYDivision",
+        all(indice.buscar_puesto_division(p, d) == buscarPorPuestoYDivision(regs, p, d) for p, d in consultas)
+    )
+
+    def resolver_esperado(codigo):
+        data = buscarCampoCodigo(regs, codigo)
+        clave = clave_gerente(data[5], data[4])
+        gerente = buscarPorPuestoYDivision(regs, *clave) if clave else None
+        # Sin coincidencia el gerente queda como "N/A", igual que sin puesto superior
+        return data, gerente if gerente and gerente[0] != "N/A" else None
+    verificar("resolver igual a la búsqueda lineal con jerarquía", all(indice.resolver(c) == resolver_esperado(c) for c in codigos))
+
+finalizar()
@@ -0,0 +1,96 @@
+"""
+Script de prueba para el motor columnar (NumPy) frente al motor Python
+"""
+import csv
+import os
+import random
+import tempfile
+import columnar
+from res import leer_cuentas_ad
+from pruebas import finalizar, iniciar, verificar
+
+iniciar("PRUEBA DEL MOTOR COLUMNAR")
+
+FILTROS = [(None, None), (None, "2026"), ("Enero", "2026"), ("Febrero", None), ("Sin", None), ("Octubre", "2030")]
+
+def ejecutar(motor, AD_File, mes, anio, tamano_lote=None):
+    """Cuentas del motor, o el tipo de excepción que lanzó."""
+    try:
+        if motor == "numpy" and tamano_lote:
+            return list(columnar.filtrar_cuentas_ad(AD_File, mes, anio, tamano_lote=tamano_lote))
+        return list(leer_cuentas_ad(AD_File, mes, anio, motor=motor))
+    except Exception as e:
+        return type(e)
+
+def escribir_ad(ruta, filas):
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f, delimiter=";").writerows(filas)
+
+def fila(usuario, enabled, expira):
+    row = [""] * 23
+    row[0], row[7], row[14], row[22] = usuario, "Resp: S1", enabled, expira
+    return row
+
+if not columnar.disponible():
+    print("\n   NumPy no está instalado: se omite la prueba")
+else:
+    with tempfile.TemporaryDirectory() as tmp:
+        print("\n1. Casos borde...")
+        casos = [
+            fila("X1", "True", "15/01/2026 00:00:00"),
+            fila("X2", "True\x00", "15/01/2026"),
+            fila("X3", "True ", "15/01/2026"),
+            fila("X4", "TRUE", "15/01/2026"),
+            fila("X5\x00", "True", "15/01/2026"),
+            fila("X", "True", "15/01/2026"),
+            fila("X٣", "True", "15/01/2026"),
+            fila("X6", "True", "15/01/2026\x00"),
+            fila("X7", "True", "15/01/2026\x00\x00 00:00:00"),
+            fila("X8", "True", "\x00"),
+            fila("X9", "True", ""),
+            fila("X10", "True", "31/02/2026"),
+            fila("X11", "True", "1/2/2026"),
+            fila("X12", "True", "basura"),
+            fila("X13", "True", "15/01/2026\t00:00"),
+            fila("Y14", "True", "15/01/2026"),
+        ]
+        ad = os.path.join(tmp, "AD_bordes.csv")
+        escribir_ad(ad, casos)
+        for mes, anio in FILTROS:
+            python = ejecutar("python", ad, mes, anio)
+            verificar(f"mes={mes} año={anio}: {len(python)} cuentas iguales al motor Python", ejecutar("numpy", ad, mes, anio) == python)
+        usuarios = [row[0] for _, _, row in ejecutar("numpy", ad, None, None)]
+        verificar("Enabled 'True\\x00' se rechaza", "X2" not in usuarios)
+        verificar("fecha con NUL final va a Sin_fecha", [m for m, _, row in ejecutar("numpy", ad, None, None) if row[0] == "X6"] == ["Sin_fecha"])
+
+        print("\n2. Filas cortas...")
+        corta = fila("X20", "True", "15/01/2026")[:20]
+        for descripcion, filas in (
+            ("cuenta aceptada sin AccountExpires", casos[:3] + [corta] + casos[3:]),
+            ("cuenta sin columna Enabled", casos[:3] + [["X21", "", "", "Resp: S1"]]),
+        ):
+            ad = os.path.join(tmp, "AD_corta.csv")
+            escribir_ad(ad, filas)
+            python = ejecutar("python", ad, None, None)
+            verificar(f"{descripcion}: ambos motores fallan igual ({getattr(python, '__name__', python)})", python is IndexError and ejecutar("numpy", ad, None, None) is IndexError)
+        ad = os.path.join(tmp, "AD_corta_rechazada.csv")
+        escribir_ad(ad, casos + [fila("Y22", "True", "15/01/2026")[:20], fila("X23", "False", "")[:16]])
+        verificar("filas cortas de cuentas rechazadas se ignoran en ambos", ejecutar("numpy", ad, None, None) == ejecutar("python", ad, None, None) != IndexError)
+
+        print("\n3. Fixture aleatorio con NUL, espacios y fechas no estándar...")
+        rnd = random.Random(5)
+        valores_usuario = ["X1", "X12", "X", "XA", "x1", "Y1", "X1\x00", "\x00X1", " X1", "X٣"]
+        valores_enabled = ["True", "True", "False", "true", "True\x00", "True ", "\x00True", ""]
+        valores_expira = ["15/01/2026", "28/02/2026 23:59:59", "31/04/2026", "01/13/2026", "00/01/2026", "",
+                          "\x00", "15/01/2026\x00", "15/01/2026\x00 00:00", "1/1/2026", "15/01/26", "basura", " 15/01/2026", "29/02/2028"]
+        filas = [fila(rnd.choice(valores_usuario), rnd.choice(valores_enabled), rnd.choice(valores_expira)) for _ in range(5000)]
+        ad = os.path.join(tmp, "AD_aleatorio.csv")
+        escribir_ad(ad, filas)
+        for mes, anio in FILTROS:
+            python = ejecutar("python", ad, mes, anio)
+            verificar(
+                f"mes={mes} año={anio}: {len(python)} cuentas iguales al motor Python (lotes de 10000 y de 37)",
+                ejecutar("numpy", ad, mes, anio) == python == ejecutar("numpy", ad, mes, anio, tamano_lote=37)
+            )
+
+finalizar()
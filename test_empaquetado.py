@@ -0,0 +1,91 @@
+"""
+Script de prueba para la lista excludes de GeneradorReportes.spec: la
+interfaz y todo lo que importa de forma diferida deben funcionar con los
+módulos excluidos bloqueados, como en el ejecutable
+"""
+import ast
+import os
+import subprocess
+import sys
+import tempfile
+from pruebas import finalizar, iniciar, verificar
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+iniciar("PRUEBA DE MÓDULOS EXCLUIDOS DEL EJECUTABLE")
+
+def excludes_del_spec():
+    """Lista excludes de GeneradorReportes.spec (sin ejecutar el spec, que necesita PyInstaller)."""
+    with open(os.path.join(RAIZ, "GeneradorReportes.spec"), encoding="utf-8") as f:
+        arbol = ast.parse(f.read())
+    for nodo in arbol.body:
+        if isinstance(nodo, ast.Assign) and any(getattr(t, "id", None) == "excludes" for t in nodo.targets):
+            return ast.literal_eval(nodo.value)
+    return None
+
+# Se ejecuta en un intérprete nuevo: bloquea los módulos excluidos antes de
+# importar nada de la aplicación y recorre lo que usa la interfaz, incluidas
+# las importaciones diferidas (precarga, generación en cada formato, vista
+# previa, autocompletado de divisiones, medición de memoria)
+PROGRAMA = r"""
+import sys
+EXCLUIDOS = set(sys.argv[1].split(","))
+
+def excluido(nombre):
+    return any(nombre == e or nombre.startswith(e + ".") for e in EXCLUIDOS)
+
+class Bloqueador:
+    def find_spec(self, nombre, path=None, target=None):
+        if excluido(nombre):
+            raise ModuleNotFoundError(f"módulo excluido del ejecutable: {nombre}", name=nombre)
+        return None
+
+for nombre in [m for m in sys.modules if excluido(m)]:
+    del sys.modules[nombre]
+sys.meta_path.insert(0, Bloqueador())
+sys.path.insert(0, sys.argv[2])
+ad, regs = sys.argv[3], sys.argv[4]
+
+import main
+from res import CuentasAD, IndiceRegs, load_csv
+from autocompletado import CatalogoDivisiones
+from expiracion import parsear_fecha, ventana_proximos
+from medicion import memoria_actual, pico_memoria, texto_memoria, texto_pico_desde
+from vista_previa import ModeloReporte, crear_fuente
+from escritores import FORMATOS
+
+indice = IndiceRegs(regs)
+cuentas = CuentasAD(ad)
+catalogo = CatalogoDivisiones(indice)
+catalogo.superior(catalogo.completar("")[0])
+texto_memoria(pico_memoria())
+texto_pico_desde(memoria_actual(), pico_memoria(), pico_memoria())
+ventana_proximos(30)
+for formato in FORMATOS:
+    for memoria_mb in (None, 1):
+        salida = load_csv(ad, regs, None, None, indice_regs=indice, cuentas_ad=cuentas, formato=formato, memoria_mb=memoria_mb)
+        ModeloReporte(crear_fuente(salida, formato)).cerrar()
+load_csv(ad, regs, None, None, desde=parsear_fecha("01/01/2026"), hasta=parsear_fecha("31/12/2026"))
+cargados = sorted(m for m in sys.modules if excluido(m))
+print("CARGADOS:" + ",".join(cargados))
+"""
+
+print("\n1. Lista excludes del spec...")
+excludes = excludes_del_spec()
+verificar("se lee la lista excludes", bool(excludes))
+verificar("no excluye módulos que la aplicación usa", not set(excludes or ()) & {"csv", "json", "gzip", "lzma", "sqlite3", "tempfile", "random", "ctypes", "concurrent"})
+
+print("\n2. Interfaz y generación con los módulos excluidos bloqueados...")
+fixture = os.path.join(RAIZ, "fixtures", "casos_borde")
+with tempfile.TemporaryDirectory() as tmp:
+    proceso = subprocess.run(
+        [sys.executable, "-c", PROGRAMA, ",".join(excludes or ()), RAIZ,
+         os.path.join(fixture, "AD.csv"), os.path.join(fixture, "regs.csv")],
+        cwd=tmp, capture_output=True, text=True, encoding="utf-8"
+    )
+    if proceso.returncode != 0:
+        print(proceso.stderr[-2000:])
+    verificar("importa y genera reportes en todos los formatos", proceso.returncode == 0)
+    verificar("no se cargó ningún módulo excluido", "CARGADOS:\n" in proceso.stdout)
+
+finalizar()
@@ -0,0 +1,56 @@
+"""
+Script de prueba para la prueba diferencial de motores contra la implementación de referencia
+"""
+import csv
+import os
+import tempfile
+from equivalencia import comparar_motores, diferencias, fixtures_grabados, generar_fixture
+from pruebas import finalizar, iniciar, verificar
+
+def equivalentes(resultados):
+    return all(not r["diferencias"] for r in resultados)
+
+# Cada motor se ejecuta en un proceso nuevo que vuelve a importar este
+# script: todo lo que se ejecuta va dentro del bloque principal
+if __name__ == "__main__":
+    iniciar("PRUEBA DIFERENCIAL DE MOTORES")
+
+    print("\n1. Comparación fila por fila...")
+    encabezado = b"SamAccountName;DisplayName;Responsable;NombreResponsable;CorreoResponsable;Gerente;NombreGerente;CorreoGerente;Division;Enabled;whenCreated;AccountExpires\r\n"
+    fila = b"X1;Cuenta;S1;Ana P G;a@x.com;S2;Luis D R;l@x.com;DIV.CONTABILIDAD;True;01/01/2020;15/01/2026\r\n"
+    esperado = {"Enero2026.csv": encabezado + fila, "Sin_fecha.csv": encabezado + fila}
+    verificar("carpetas iguales sin diferencias", diferencias(esperado, dict(esperado)) == [])
+    distinto = {"Enero2026.csv": encabezado + fila.replace(b";S2;", b";S3;"), "Marzo2026.csv": encabezado}
+    lineas = diferencias(esperado, distinto)
+    verificar("informa la columna distinta", "Enero2026.csv fila 2: Gerente: 'S2' != 'S3'" in lineas)
+    verificar("informa archivos faltantes y de más", "falta el archivo Sin_fecha.csv" in lineas and "archivo de más Marzo2026.csv" in lineas)
+    verificar("informa filas de más", any("fila 3: fila de más" in l for l in diferencias(esperado, {**esperado, "Enero2026.csv": encabezado + fila + fila})))
+    verificar("informa diferencias solo de formato", any("distinto formato" in l for l in diferencias(esperado, {**esperado, "Enero2026.csv": encabezado + fila.replace(b"\r\n", b"\n")})))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print("\n2. Fixtures...")
+        ad, regs = generar_fixture(os.path.join(tmp, "a"), 200, 500, semilla=4)
+        ad_b, regs_b = generar_fixture(os.path.join(tmp, "b"), 200, 500, semilla=4)
+        verificar("el fixture generado es reproducible", open(ad, "rb").read() == open(ad_b, "rb").read() and open(regs, "rb").read() == open(regs_b, "rb").read())
+        grabados = fixtures_grabados()
+        verificar("fixture grabado de casos borde", [nombre for nombre, _, _ in grabados] == ["casos_borde"])
+
+        print("\n3. Motores frente a la referencia...")
+        for nombre, ad_file, regs_file in grabados + [("generado", ad, regs)]:
+            resultados = comparar_motores(ad_file, regs_file, directorio=tmp)
+            referencias = [r for r in resultados if r["motor"] == "referencia"]
+            verificar(f"{nombre}: la referencia genera reportes", sum(r["filas"] for r in referencias) > 0 and not any(r["error"] for r in referencias))
+            verificar(f"{nombre}: todos los motores son idénticos a la referencia", equivalentes(resultados))
+            verificar(f"{nombre}: tiempo y memoria medidos", all(r["segundos"] > 0 for r in resultados))
+
+        print("\n4. Responsable sin cuenta anterior...")
+        # La primera cuenta no tiene "Resp": la referencia falla y los motores también
+        ad_sin = os.path.join(tmp, "AD_sin_responsable.csv")
+        with open(ad_sin, "w", newline="", encoding="utf-8") as f:
+            fila_ad = [""] * 23
+            fila_ad[0], fila_ad[7], fila_ad[14], fila_ad[22] = "X1", "Cuenta de servicio", "True", "15/01/2026 00:00:00"
+            csv.writer(f, delimiter=";").writerow(fila_ad)
+        resultados = comparar_motores(ad_sin, regs, filtros=[(None, None)], motores=["indice", "externo"], directorio=tmp)
+        verificar("ambos fallan y se consideran equivalentes", all(r["error"] for r in resultados) and equivalentes(resultados))
+
+    finalizar()
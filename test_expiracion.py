@@ -0,0 +1,103 @@
+"""
+Script de prueba para el índice de expiración y las consultas por ventana de fechas
+"""
+import csv
+import os
+import random
+import tempfile
+from datetime import date, datetime, timedelta
+from expiracion import IndiceExpiracion, parsear_fecha, ventana_proximos
+from res import CuentasAD, generar_reportes
+from pruebas import finalizar, iniciar, verificar
+
+iniciar("PRUEBA DE INDICE DE EXPIRACION")
+
+# Cuentas con la misma forma que CuentasAD.cuentas: (mes_key, fecha, row)
+random.seed(7)
+base = datetime(2026, 1, 1)
+cuentas = []
+for i in range(2000):
+    if i % 10 == 0:
+        cuentas.append(("Sin_fecha", None, [f"X{i}"]))
+    else:
+        fecha = base + timedelta(days=random.randint(0, 365))
+        cuentas.append(("", fecha, [f"X{i}"]))
+
+indice = IndiceExpiracion(cuentas)
+
+def recorrido(desde, hasta):
+    """Resultado esperado por recorrido completo."""
+    esperado = [
+        (f.date(), i) for i, (_, f, _) in enumerate(cuentas)
+        if f is not None and (desde is None or f.date() >= desde) and (hasta is None or f.date() <= hasta)
+    ]
+    return [i for _, i in sorted(esperado)]
+
+print("\n1. Construyendo índice...")
+verificar("cuentas Sin_fecha excluidas", len(indice) == 1800)
+
+print("\n2. Consultando ventanas...")
+ventanas = [
+    (date(2026, 3, 1), date(2026, 3, 31)),
+    (date(2026, 3, 15), date(2026, 3, 15)),
+    (None, date(2026, 2, 1)),
+    (date(2026, 12, 1), None),
+    (None, None),
+    (date(2027, 6, 1), date(2027, 7, 1)),
+]
+for desde, hasta in ventanas:
+    verificar(f"ventana {desde} a {hasta} igual al recorrido completo", indice.rango(desde, hasta) == recorrido(desde, hasta))
+
+print("\n3. Fechas de la interfaz y la línea de comandos...")
+verificar("parsear_fecha('05/03/2026')", parsear_fecha("05/03/2026") == date(2026, 3, 5))
+verificar("próximos 7 días: hoy y los 6 siguientes", ventana_proximos(7, hoy=date(2026, 12, 28)) == (date(2026, 12, 28), date(2027, 1, 3)))
+verificar("próximo 1 día: solo hoy", ventana_proximos(1, hoy=date(2026, 12, 28)) == (date(2026, 12, 28), date(2026, 12, 28)))
+try:
+    ventana_proximos(0)
+    verificar("0 días rechazado", False)
+except ValueError:
+    verificar("0 días rechazado", True)
+
+print("\n4. Responsable arrastrado: ventana de fechas frente a filtro por mes...")
+with tempfile.TemporaryDirectory() as tmp:
+    regs = os.path.join(tmp, "regs.csv")
+    with open(regs, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow([f"h{i}" for i in range(36)])
+        for codigo in ("S1", "S2", "S3"):
+            row = [""] * 36
+            row[1], row[2], row[3], row[10], row[11], row[25] = f"Nombre {codigo}", "Pérez", "Gómez", "ANALISTA", "TRIBU PAGOS", codigo
+            writer.writerow(row)
+    ad = os.path.join(tmp, "AD.csv")
+    # En orden de fecha, X2 (sin "Resp") es la primera cuenta y X4 arrastraría el responsable de X5
+    cuentas_ad = [
+        ("X1", "Resp: S1", "20/01/2026"),
+        ("X2", "Cuenta de servicio", "05/01/2026"),
+        ("X3", "Resp: S2", "10/01/2026"),
+        ("X4", "Cuenta de servicio", "25/01/2026"),
+        ("X5", "Resp: S3", "15/01/2026"),
+        ("X6", "Cuenta de servicio", "15/01/2026"),
+        ("X7", "Resp: S1", ""),
+    ]
+    with open(ad, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        for usuario, descripcion, expira in cuentas_ad:
+            row = [""] * 23
+            row[0], row[7], row[14], row[22] = usuario, descripcion, "True", expira
+            writer.writerow(row)
+
+    def leer(carpeta):
+        with open(os.path.join(carpeta, "Enero2026.csv"), newline="", encoding="utf-8") as f:
+            return [(r["SamAccountName"], r["Responsable"], r["AccountExpires"]) for r in csv.DictReader(f, delimiter=";")]
+
+    for modo_join in ("indice", "externo"):
+        por_mes = leer(generar_reportes(ad, regs, "Enero", "2026", modo_join=modo_join, directorio_salida=os.path.join(tmp, f"mes_{modo_join}"))[0])
+        por_ventana = leer(generar_reportes(
+            ad, regs, None, cuentas_ad=CuentasAD(ad), desde=date(2026, 1, 1), hasta=date(2026, 1, 31),
+            modo_join=modo_join, directorio_salida=os.path.join(tmp, f"ventana_{modo_join}")
+        )[0])
+        verificar(f"{modo_join}: mismo responsable por cuenta que por mes", sorted(por_ventana) == sorted(por_mes))
+        verificar(f"{modo_join}: X2 y X4 toman el responsable de la cuenta anterior del archivo", dict((u, r) for u, r, _ in por_ventana)["X2"] == "S1" and dict((u, r) for u, r, _ in por_ventana)["X4"] == "S2")
+        verificar(f"{modo_join}: filas ordenadas por fecha y, a igual fecha, por archivo", [u for u, _, _ in por_ventana] == ["X2", "X3", "X5", "X6", "X1", "X4"])
+
+finalizar()
@@ -0,0 +1,102 @@
+"""
+Script de prueba para los formatos de salida: CSV comprimido con gzip o xz,
+JSON Lines y SQLite
+"""
+import csv
+import gzip
+import json
+import lzma
+import os
+import sqlite3
+import tempfile
+from escritores import CAMPOS_REPORTE, crear_escritor
+from pruebas import finalizar, iniciar, verificar
+
+iniciar("PRUEBA DE FORMATOS DE SALIDA")
+
+# 6 particiones intercaladas con valores que requieren comillas o escapes
+registros = []
+for i in range(300):
+    registro = {campo: f"{campo}{i}" for campo in CAMPOS_REPORTE}
+    registro["DisplayName"] = ["Cuenta; \"uno\"", "Línea\nnueva", "Ñandú \\ barra", f"Cuenta {i}"][i % 4]
+    registro["Gerente"] = f"G{i % 6}"
+    registros.append((f"G{i % 6}", registro))
+esperado = {}
+for nombre, registro in registros:
+    esperado.setdefault(nombre, []).append([registro[campo] for campo in CAMPOS_REPORTE])
+
+def escribir(formato, carpeta, max_abiertos=2):
+    os.makedirs(carpeta)
+    with crear_escritor(formato, carpeta, max_abiertos=max_abiertos) as escritor:
+        for nombre, registro in registros:
+            escritor.escribir(nombre, registro)
+    return escritor
+
+with tempfile.TemporaryDirectory() as tmp:
+    for i, (formato, abrir, firma) in enumerate((("csv.gz", gzip.open, b"\x1f\x8b\x08"), ("csv.xz", lzma.open, b"\xfd7zXZ\x00")), 1):
+        print(f"\n{i}. {formato} reabierto tras desalojo LRU (2 archivos abiertos, 6 particiones)...")
+        carpeta = os.path.join(tmp, formato)
+        escritor = escribir(formato, carpeta)
+        verificar("un archivo por partición", sorted(os.listdir(carpeta)) == [f"G{n}.{formato}" for n in range(6)])
+        completos = True
+        miembros = []
+        for nombre, filas in esperado.items():
+            ruta = os.path.join(carpeta, f"{nombre}.{formato}")
+            with open(ruta, "rb") as f:
+                miembros.append(f.read().count(firma))
+            with abrir(ruta, "rt", newline="", encoding="utf-8") as f:
+                leidas = list(csv.reader(f, delimiter=";"))
+            completos = completos and leidas == [CAMPOS_REPORTE] + filas
+        verificar("cada reapertura agrega un miembro al archivo", min(miembros) > 1)
+        verificar("se leen todas las filas, en orden y con un solo encabezado", completos)
+        verificar("conteos por partición", escritor.conteos == {nombre: len(filas) for nombre, filas in esperado.items()})
+
+    print("\n3. JSON Lines...")
+    carpeta = os.path.join(tmp, "jsonl")
+    escribir("jsonl", carpeta)
+    iguales = True
+    for nombre, filas in esperado.items():
+        with open(os.path.join(carpeta, f"{nombre}.jsonl"), newline="", encoding="utf-8") as f:
+            lineas = f.read().split("\n")
+        objetos = [json.loads(linea) for linea in lineas if linea]
+        iguales = iguales and lineas[-1] == "" and objetos == [dict(zip(CAMPOS_REPORTE, fila)) for fila in filas]
+    verificar("un objeto por línea, igual al registro escrito", iguales)
+    verificar("mismos campos y orden que el CSV", list(objetos[0]) == CAMPOS_REPORTE)
+
+    print("\n4. SQLite...")
+    carpeta = os.path.join(tmp, "sqlite")
+    escritor = escribir("sqlite", carpeta)
+    verificar("un único archivo reportes.sqlite", os.listdir(carpeta) == ["reportes.sqlite"])
+    conexion = sqlite3.connect(os.path.join(carpeta, "reportes.sqlite"))
+    try:
+        columnas = [fila[1] for fila in conexion.execute("PRAGMA table_info(reportes)")]
+        verificar("tabla reportes con particion y los campos del CSV", columnas == ["particion"] + CAMPOS_REPORTE)
+        filas = conexion.execute("SELECT * FROM reportes ORDER BY rowid").fetchall()
+        verificar("filas en orden de llegada con su partición", [list(f) for f in filas] == [[nombre] + [registro[c] for c in CAMPOS_REPORTE] for nombre, registro in registros])
+        particiones = dict(conexion.execute("SELECT particion, COUNT(*) FROM reportes GROUP BY particion"))
+        verificar("valores de particion", particiones == {nombre: len(f) for nombre, f in esperado.items()} == escritor.conteos)
+        indices = {fila[1]: [c[2] for c in conexion.execute(f"PRAGMA index_info('{fila[1]}')")] for fila in conexion.execute("PRAGMA index_list(reportes)")}
+        verificar("índices sobre SamAccountName, Division, Gerente y particion", sorted(indices.values()) == [["Division"], ["Gerente"], ["SamAccountName"], ["particion"]])
+        plan = " ".join(str(f) for f in conexion.execute("EXPLAIN QUERY PLAN SELECT * FROM reportes WHERE Gerente = 'G1'"))
+        verificar("las consultas por gerente usan el índice", "idx_reportes_Gerente" in plan)
+    finally:
+        conexion.close()
+
+    print("\n5. Con presupuesto de memoria...")
+    for formato, abrir in (("csv.gz", gzip.open), ("csv.xz", lzma.open), ("jsonl", open)):
+        carpeta = os.path.join(tmp, "presupuesto_" + formato)
+        os.makedirs(carpeta)
+        with crear_escritor(formato, carpeta, memoria_mb=0.01) as escritor:
+            for nombre, registro in registros:
+                escritor.escribir(nombre, registro)
+        contenido = {}
+        for nombre in sorted(os.listdir(carpeta)):
+            with abrir(os.path.join(carpeta, nombre), "rt", newline="", encoding="utf-8") as f:
+                contenido[nombre] = f.read()
+        directo = {}
+        for nombre in sorted(os.listdir(os.path.join(tmp, formato))):
+            with abrir(os.path.join(tmp, formato, nombre), "rt", newline="", encoding="utf-8") as f:
+                directo[nombre] = f.read()
+        verificar(f"{formato}: mismo contenido que la escritura directa", contenido == directo)
+
+finalizar()
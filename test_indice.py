@@ -0,0 +1,135 @@
+"""
+Script de prueba para el índice de Registros y las cuentas AD precargadas
+frente a las búsquedas lineales y al load_csv original
+"""
+import csv
+import os
+import tempfile
+import threading
+from equivalencia import generar_fixture, leer_reportes
+from referencia import load_csv_referencia
+from res import (
+    CargaCancelada, CuentasAD, IndiceRegs, _leer_cuentas_ad, _pasa_filtro,
+    buscarCampoCodigo, buscarPorPuestoYDivision, load_csv, obtener_cuentas_ad
+)
+from testChain import normalize_text
+from pruebas import finalizar, iniciar, verificar
+
+iniciar("PRUEBA DEL ÍNDICE DE REGISTROS Y CUENTAS AD")
+
+class CancelarDespues(threading.Event):
+    """Evento que se activa después de n consultas: cancela una carga a mitad de camino."""
+    def __init__(self, n):
+        super().__init__()
+        self.restantes = n
+
+    def is_set(self):
+        self.restantes -= 1
+        return self.restantes < 0
+
+FILTROS = [(None, None), (None, "2026"), ("Enero", "2026"), ("Marzo", None), ("Sin", None), ("Octubre", "2030")]
+
+with tempfile.TemporaryDirectory() as tmp:
+    print("\n1. Primera coincidencia y códigos faltantes...")
+    regs = os.path.join(tmp, "regs.csv")
+    filas = [
+        # código, nombre, puesto, división
+        ("S100", "Primero", "ANALISTA", "DIV.CONTABILIDAD"),
+        ("s100", "Repetido minúscula", "ANALISTA", "DIV.CONTABILIDAD"),
+        ("S100", "Repetido", "GERENTE DE DIVISION", "TRIBU PAGOS"),
+        ("S200", "Gerente", "GERENTE DE DIVISIÓN", "DIV.CONTABILIDAD"),
+        ("S201", "Otro gerente", "Gerente de División", "Div.Contabilidad"),
+        ("S300", "Sin puesto", "", "DIV.CONTABILIDAD"),
+    ]
+    with open(regs, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow([f"h{i}" for i in range(36)])
+        for codigo, nombre, puesto, division in filas:
+            row = [""] * 36
+            row[1], row[2], row[3], row[10], row[11], row[25], row[34] = nombre, "Pérez", "Gómez", puesto, division, codigo, f"{nombre}@x.com"
+            writer.writerow(row)
+        # Fila corta sin código: no se indexa
+        writer.writerow(["", "Corta", "Pérez"])
+        # Fila sin correo: buscarPorPuestoYDivision devuelve "N/A" en su lugar
+        row = [""] * 30
+        row[1], row[10], row[11], row[25] = "Sin correo", "LIDER DE TRIBU", "TRIBU PAGOS", "S400"
+        writer.writerow(row)
+
+    indice = IndiceRegs(regs)
+    verificar("gana la primera fila de un código repetido", indice.buscar_codigo("S100")[0] == "Primero")
+    verificar("el código no distingue mayúsculas", indice.buscar_codigo("s100") == indice.buscar_codigo("S100"))
+    verificar("código faltante", indice.buscar_codigo("S999") == ["N/A"] * 6 and indice.resolver("S999") == (["N/A"] * 6, None))
+    verificar("gana el primer gerente de la división", indice.buscar_puesto_division("gerente de division", "div.contabilidad")[1] == "Gerente")
+    verificar("puesto vacío no se indexa", indice.buscar_puesto_division("", "DIV.CONTABILIDAD") == ["N/A"] * 5)
+    verificar("fila sin correo", indice.buscar_puesto_division("lider de tribu", "TRIBU PAGOS")[4] == "N/A")
+    codigos = ["S100", "s100", "S200", "S201", "S300", "S400", "S999", "", "Corta"]
+    verificar("buscar_codigo igual a buscarCampoCodigo", all(indice.buscar_codigo(c) == buscarCampoCodigo(regs, c) for c in codigos))
+    consultas = [(normalize_text(p), d) for p in ("ANALISTA", "GERENTE DE DIVISION", "LIDER DE TRIBU", "", "OTRO") for d in ("DIV.CONTABILIDAD", "Div.Contabilidad", "TRIBU PAGOS", "otra", None)]
+    verificar(
+        "buscar_puesto_division igual a buscarPorPuestoYDivision",
+        all(indice.buscar_puesto_division(p, d) == buscarPorPuestoYDivision(regs, p, d) for p, d in consultas)
+    )
+
+    print("\n2. Fixture aleatorio frente a las búsquedas lineales...")
+    ad, regs = generar_fixture(os.path.join(tmp, "fixture"), registros=2500, cuentas=1500, semilla=7)
+    indice = IndiceRegs(regs)
+    codigos = [p + str(n) for p in "SsBb" for n in range(9990, 11270, 4)]
+    verificar("buscar_codigo igual a buscarCampoCodigo", all(indice.buscar_codigo(c) == buscarCampoCodigo(regs, c) for c in codigos))
+    cuentas = CuentasAD(ad)
+    lineal = list(_leer_cuentas_ad(ad))
+    verificar(
+        "CuentasAD.filtrar igual al filtro lineal",
+        all([(m, f, r[0]) for m, f, r in cuentas.filtrar(mes, anio)] == [(m, f, r[0]) for m, f, r in lineal if _pasa_filtro(m, f, mes, anio)] for mes, anio in FILTROS)
+    )
+
+    print("\n3. load_csv con índice y cuentas precargadas frente al original...")
+    directorio = os.getcwd()
+    os.chdir(tmp)
+    try:
+        iguales, filas_referencia = True, 0
+        for mes, anio in FILTROS:
+            esperado_dir = os.path.join(tmp, "referencia")
+            try:
+                load_csv_referencia(ad, regs, mes, anio, output_dir=esperado_dir)
+            except ValueError:
+                pass
+            try:
+                obtenido_dir = load_csv(ad, regs, mes, anio, indice_regs=indice, cuentas_ad=cuentas)
+            except ValueError:
+                obtenido_dir = os.path.join(tmp, "no existe")
+            esperado = leer_reportes(esperado_dir)
+            filas_referencia += sum(contenido.count(b"\n") for contenido in esperado.values())
+            iguales = iguales and esperado == leer_reportes(obtenido_dir)
+            for carpeta in (esperado_dir, obtenido_dir):
+                if os.path.isdir(carpeta):
+                    for nombre in os.listdir(carpeta):
+                        os.remove(os.path.join(carpeta, nombre))
+        verificar("reportes idénticos byte a byte en todos los filtros", iguales and filas_referencia > 0)
+    finally:
+        os.chdir(directorio)
+
+    print("\n4. Caché de cuentas AD...")
+    verificar("reutiliza la carga si el archivo no cambió", obtener_cuentas_ad(ad) is obtener_cuentas_ad(ad))
+    anterior = obtener_cuentas_ad(ad)
+    with open(ad, "a", newline="", encoding="utf-8") as f:
+        csv.writer(f, delimiter=";").writerow(["X99999"] + [""] * 6 + ["Resp: S10001"] + [""] * 6 + ["True"] + [""] * 7 + ["01/01/2026"])
+    nuevo = obtener_cuentas_ad(ad)
+    verificar("vuelve a cargar si el archivo cambió", nuevo is not anterior and len(nuevo.cuentas) == len(anterior.cuentas) + 1)
+
+    print("\n5. Cancelación...")
+    for nombre, cargar, archivo in (("IndiceRegs", IndiceRegs, regs), ("CuentasAD", CuentasAD, ad)):
+        cancelado = threading.Event()
+        cancelado.set()
+        try:
+            cargar(archivo, cancelado=cancelado)
+            verificar(f"{nombre}: cancelada antes de empezar", False)
+        except CargaCancelada:
+            verificar(f"{nombre}: cancelada antes de empezar", True)
+        try:
+            cargar(archivo, cancelado=CancelarDespues(1))
+            verificar(f"{nombre}: cancelada a mitad de la carga", False)
+        except CargaCancelada:
+            verificar(f"{nombre}: cancelada a mitad de la carga", True)
+        verificar(f"{nombre}: sin cancelar carga completa", cargar(archivo, cancelado=threading.Event()) is not None)
+
+finalizar()
@@ -0,0 +1,89 @@
+"""
+Script de prueba para el join externo: ordenamiento con volcado a disco,
+mezcla en varias pasadas, claves repetidas y presupuesto de memoria
+"""
+import os
+import random
+import tempfile
+import join_externo
+from join_externo import MAX_CORRIDAS, OrdenadorExterno, _merge_join, _primeros_por_clave, enriquecer_externo
+from equivalencia import generar_fixture
+from medicion import BYTES_POR_CAMPO
+from res import IndiceRegs, _enriquecer, leer_cuentas_ad
+from pruebas import finalizar, iniciar, verificar
+
+iniciar("PRUEBA DEL JOIN EXTERNO")
+
+def clave(registro):
+    return (registro[0], int(registro[1]))
+
+class OrdenadorMedido(OrdenadorExterno):
+    """OrdenadorExterno que registra sus corridas y la memoria de todos los ordenadores vivos."""
+    vivos = []
+    maximo_total = 0
+    maximo_registro = 0
+    corridas_escritas = 0
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        OrdenadorMedido.vivos.append(self)
+
+    def agregar(self, registro):
+        super().agregar(registro)
+        tamano = sum(len(c) for c in registro) + BYTES_POR_CAMPO * len(registro)
+        OrdenadorMedido.maximo_registro = max(OrdenadorMedido.maximo_registro, tamano)
+        total = sum(o.bytes_buffer for o in OrdenadorMedido.vivos)
+        OrdenadorMedido.maximo_total = max(OrdenadorMedido.maximo_total, total)
+
+    def _escribir_corrida(self, registros):
+        OrdenadorMedido.corridas_escritas += 1
+        return super()._escribir_corrida(registros)
+
+random.seed(11)
+registros = [(random.choice("ABCDE") * random.randint(1, 3), str(n), f"valor {n}", "Ñandú; \"x\"\n") for n in range(3000)]
+esperado = sorted(registros, key=clave)
+
+with tempfile.TemporaryDirectory() as tmp:
+    print("\n1. Ordenamiento en memoria y con volcado a disco...")
+    for presupuesto, descripcion in ((10 ** 9, "todo en memoria"), (20_000, "varias corridas"), (1, f"más de {MAX_CORRIDAS} corridas (varias pasadas)")):
+        directorio = os.path.join(tmp, f"orden_{presupuesto}")
+        os.makedirs(directorio)
+        ordenador = OrdenadorExterno(clave, presupuesto, directorio)
+        for registro in registros:
+            ordenador.agregar(registro)
+        corridas = len(ordenador.corridas)
+        verificar(f"{descripcion} ({corridas} corridas): mismo resultado que sorted", list(ordenador.ordenado()) == esperado)
+        verificar(f"{descripcion}: archivos temporales eliminados", os.listdir(directorio) == [])
+    verificar("el último caso supera MAX_CORRIDAS", corridas > MAX_CORRIDAS)
+
+    print("\n2. Merge-join con claves repetidas...")
+    # Izquierda: varias cuentas por código; derecha: varias filas por código (gana la primera)
+    izquierda = sorted(((random.choice(["S1", "S2", "S3", "S9"]), str(n)) for n in range(200)), key=clave)
+    derecha = sorted(((random.choice(["S1", "S2", "S3", "S4"]), str(n), f"dato {n}") for n in range(50)), key=clave)
+    primeros = {}
+    for codigo, fila, dato in sorted(derecha, key=clave):
+        primeros.setdefault(codigo, (codigo, fila, dato))
+    cruce = list(_merge_join(izquierda, _primeros_por_clave(derecha, 1), 1))
+    verificar("una salida por registro izquierdo, en orden", [c for c, _ in cruce] == izquierda)
+    verificar("claves repetidas a la izquierda toman la primera fila de la derecha", all(r == primeros.get(c[0]) for c, r in cruce))
+    verificar("clave sin coincidencia da None", all(r is None for c, r in cruce if c[0] == "S9") and any(c[0] == "S9" for c, _ in cruce))
+
+    print("\n3. Enriquecimiento con presupuesto mínimo frente al índice en memoria...")
+    ad, regs = generar_fixture(os.path.join(tmp, "fixture"), registros=600, cuentas=1500, semilla=2)
+    esperado = list(_enriquecer(leer_cuentas_ad(ad), IndiceRegs(regs)))
+    original = join_externo.OrdenadorExterno
+    join_externo.OrdenadorExterno = OrdenadorMedido
+    try:
+        for memoria_mb in (0.0001, 0.05):
+            OrdenadorMedido.vivos, OrdenadorMedido.maximo_total, OrdenadorMedido.corridas_escritas = [], 0, 0
+            obtenido = list(enriquecer_externo(leer_cuentas_ad(ad), regs, memoria_mb=memoria_mb))
+            verificar(f"{memoria_mb} MB: mismos registros ({len(esperado)}) con {OrdenadorMedido.corridas_escritas} corridas en disco", obtenido == esperado and OrdenadorMedido.corridas_escritas > MAX_CORRIDAS)
+        presupuesto = int(0.05 * 1024 * 1024)
+        verificar(
+            f"memoria de todos los ordenadores juntos ({OrdenadorMedido.maximo_total} bytes) dentro del presupuesto ({presupuesto})",
+            OrdenadorMedido.maximo_total <= presupuesto + len(OrdenadorMedido.vivos) * OrdenadorMedido.maximo_registro
+        )
+    finally:
+        join_externo.OrdenadorExterno = original
+
+finalizar()
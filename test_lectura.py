@@ -0,0 +1,67 @@
+"""
+Script de prueba para la lectura de archivos de entrada y detección de codificación
+"""
+import csv
+import io
+import os
+import tempfile
+from lectura import ArchivoEntrada
+from pruebas import finalizar, iniciar, verificar
+
+iniciar("PRUEBA DE LECTURA DE ARCHIVOS DE ENTRADA")
+
+texto = "".join(
+    f"X{i};Cuenta de {'Peña' if i % 2 else 'Núñez'};Resp: S{1000 + i};\"con ; separador\"\r\n"
+    for i in range(5000)
+)
+esperado = list(csv.reader(io.StringIO(texto, newline=""), delimiter=";"))
+
+casos = [
+    ("utf-8", b"", "utf-8"),
+    ("utf-8 con BOM", b"\xef\xbb\xbf", "utf-8"),
+    ("utf-16-le con BOM", b"\xff\xfe", "utf-16-le"),
+    ("utf-16-be con BOM", b"\xfe\xff", "utf-16-be"),
+    ("utf-16-le sin BOM", b"", "utf-16-le"),
+    ("cp1252", b"", "cp1252"),
+]
+
+with tempfile.TemporaryDirectory() as tmp:
+    for i, (descripcion, bom, codificacion) in enumerate(casos, 1):
+        print(f"\n{i}. Archivo {descripcion}...")
+        ruta = os.path.join(tmp, f"caso{i}.csv")
+        with open(ruta, "wb") as f:
+            f.write(bom + texto.encode(codificacion))
+
+        with ArchivoEntrada(ruta) as archivo:
+            verificar(f"codificación detectada: {archivo.encoding}", archivo.encoding == codificacion)
+            verificar("filas iguales a csv.reader", list(archivo.filas(";")) == esperado)
+
+            verificar("se puede volver a recorrer desde el principio", list(archivo.filas(";")) == esperado)
+
+    print(f"\n{len(casos) + 1}. UTF-8 con un byte no válido al principio...")
+    ruta = os.path.join(tmp, "utf8_byte_suelto.csv")
+    datos = b"X0;Jos\xe9;Resp: S1\r\n" + texto.encode("utf-8")
+    with open(ruta, "wb") as f:
+        f.write(datos)
+    with ArchivoEntrada(ruta) as archivo:
+        verificar(f"codificación detectada: {archivo.encoding}", archivo.encoding == "utf-8")
+        filas = list(archivo.filas(";"))
+        verificar("el byte no válido se reemplaza", filas[0] == ["X0", "Jos\ufffd", "Resp: S1"])
+        verificar("los demás acentos se conservan", filas[1:] == esperado)
+
+    print(f"\n{len(casos) + 2}. cp1252 con una secuencia que también es UTF-8 válida...")
+    ruta = os.path.join(tmp, "cp1252_ambiguo.csv")
+    # "Ã±" en cp1252 son los bytes de "ñ" en UTF-8
+    with open(ruta, "wb") as f:
+        f.write(("X0;Ã±;Resp: S1\r\n" + texto).encode("cp1252"))
+    with ArchivoEntrada(ruta) as archivo:
+        verificar(f"codificación detectada: {archivo.encoding}", archivo.encoding == "cp1252")
+        verificar("filas iguales a csv.reader", list(archivo.filas(";"))[1:] == esperado)
+
+    print(f"\n{len(casos) + 3}. Archivo vacío...")
+    ruta = os.path.join(tmp, "vacio.csv")
+    open(ruta, "wb").close()
+    with ArchivoEntrada(ruta) as archivo:
+        verificar("sin filas", list(archivo.filas(";")) == [])
+
+finalizar()
@@ -0,0 +1,34 @@
+"""
+Script de prueba para la medición de memoria: RSS actual, pico del proceso
+y el texto que informa la interfaz al terminar una generación
+"""
+import os
+from medicion import memoria_actual, pico_memoria, texto_pico_desde
+from pruebas import finalizar, iniciar, verificar
+
+iniciar("PRUEBA DE MEDICIÓN DE MEMORIA")
+
+MB = 1024 * 1024
+
+print("\n1. RSS actual y pico...")
+inicial, pico_inicial = memoria_actual(), pico_memoria()
+if inicial is None or pico_inicial is None:
+    print("\n   Medición no disponible en esta plataforma: se omite")
+else:
+    verificar("la memoria actual no supera el pico", 0 < inicial <= pico_inicial)
+    bloque = bytearray(os.urandom(1024)) * (128 * 1024)
+    verificar("reservar 128 MB aumenta la memoria actual", memoria_actual() - inicial >= 100 * MB)
+    # El kernel actualiza el pico con algo de retraso (unos pocos KB)
+    verificar("el pico alcanza la memoria actual", pico_memoria() >= memoria_actual() - MB)
+    del bloque
+    verificar("al liberarla la memoria actual baja y el pico se mantiene", memoria_actual() < pico_memoria() - 50 * MB)
+
+print("\n2. Texto del pico de una ejecución...")
+texto = texto_pico_desde(200 * MB, 300 * MB, 450 * MB)
+verificar("ejecución que supera el pico anterior informa el aumento sobre la memoria inicial", texto == "450.0 MB del proceso durante esta ejecución, 250.0 MB más que al iniciar (200.0 MB)")
+texto = texto_pico_desde(200 * MB, 300 * MB, 300 * MB)
+verificar("ejecución que no lo supera aclara que el pico es anterior", texto == "300.0 MB del proceso, alcanzado antes de esta ejecución (al iniciar: 200.0 MB)")
+verificar("sin memoria inicial", texto_pico_desde(None, None, 300 * MB) == "300.0 MB del proceso")
+verificar("sin pico", texto_pico_desde(200 * MB, 300 * MB, None) == "n/d")
+
+finalizar()
@@ -0,0 +1,120 @@
+"""
+Script de prueba para procesar varias exportaciones AD contra un mismo archivo de Registros
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+from contextlib import redirect_stdout
+import generar_reportes as script
+import multiempresa
+from multiempresa import CAMPOS_RESUMEN, nombres_exportaciones, procesar_exportaciones
+from res import IndiceRegs, generar_reportes
+from pruebas import finalizar, iniciar, verificar
+
+def escribir_csv(ruta, filas):
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f, delimiter=";").writerows(filas)
+
+def leer_carpeta(carpeta):
+    contenido = {}
+    for nombre in sorted(os.listdir(carpeta)):
+        with open(os.path.join(carpeta, nombre), "rb") as f:
+            contenido[nombre] = f.read()
+    return contenido
+
+random.seed(11)
+divisiones = ["DIV.CONTABILIDAD", "TRIBU PAGOS", "VP.RIESGOS", "SIN JERARQUIA"]
+puestos = ["ANALISTA", "GERENTE DE DIVISION", "LIDER DE TRIBU", "VICE PRESIDENTE EJECUTIVO"]
+
+def fila_regs(i):
+    fila = [""] * 36
+    fila[1], fila[2], fila[3] = f"Nombre{i}", "Pérez", "Gómez"
+    fila[10], fila[11] = random.choice(puestos), random.choice(divisiones)
+    fila[25], fila[34] = f"S{1000 + i}", f"u{i}@x.com"
+    return fila
+
+def fila_ad(i, prefijo):
+    fila = [""] * 23
+    fila[0], fila[4], fila[14] = f"X{prefijo}{i}", f"Cuenta {i}", "True"
+    fila[7] = f"Servicio Resp: S{1000 + random.randint(0, 60)}"
+    fila[18] = "01/01/2020 10:00:00"
+    fila[22] = f"{random.randint(1, 28):02d}/{random.randint(1, 3):02d}/2026 00:00:00"
+    return fila
+
+# El pool de procesos vuelve a importar este script en Windows: todo lo que
+# se ejecuta va dentro del bloque principal
+if __name__ == "__main__":
+    iniciar("PRUEBA DE EXPORTACIONES MULTIPLES")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        regs = os.path.join(tmp, "regs.csv")
+        escribir_csv(regs, [[f"h{i}" for i in range(36)]] + [fila_regs(i) for i in range(50)])
+        ad_files = []
+        for n, (carpeta, cantidad) in enumerate([("empresa_a", 300), ("empresa_b", 40), ("empresa_c", 120)]):
+            os.makedirs(os.path.join(tmp, carpeta))
+            ruta = os.path.join(tmp, carpeta, "AD.csv" if n < 2 else "AD_dominio.csv")
+            escribir_csv(ruta, [["SamAccountName"] + [f"c{i}" for i in range(1, 23)]] + [fila_ad(i, n) for i in range(cantidad)])
+            ad_files.append(ruta)
+        ad_files.append(os.path.join(tmp, "no_existe.csv"))
+
+        print("\n1. Nombres de las exportaciones...")
+        nombres = nombres_exportaciones(ad_files)
+        verificar("nombres repetidos reciben sufijo", nombres == ["AD", "AD_2", "AD_dominio", "no_existe"])
+
+        # Resultado esperado: cada exportación procesada por separado
+        esperado = {}
+        for nombre, ad in zip(nombres[:3], ad_files[:3]):
+            carpeta, _ = generar_reportes(ad, regs, None, "2026", directorio_salida=os.path.join(tmp, "esperado", nombre))
+            esperado[nombre] = leer_carpeta(carpeta)
+
+        for ejecutor in ("hilos", "procesos"):
+            print(f"\n2. Procesando {len(ad_files)} exportaciones con {ejecutor}...")
+            base = os.path.join(tmp, ejecutor)
+            resultados = procesar_exportaciones(ad_files, regs, None, "2026", directorio_base=base, ejecutor=ejecutor, trabajadores=2)
+            verificar("un resultado por exportación, en orden", [r["exportacion"] for r in resultados] == nombres)
+            verificar(
+                "reportes iguales a procesar cada exportación por separado",
+                all(leer_carpeta(os.path.join(base, n, "reportes2026")) == esperado[n] for n in nombres[:3])
+            )
+            verificar("el archivo inexistente se informa sin detener al resto", resultados[3]["error"] != "" and all(not r["error"] for r in resultados[:3]))
+
+            with open(os.path.join(base, "resumen.csv"), newline="", encoding="utf-8") as f:
+                resumen = list(csv.DictReader(f, delimiter=";"))
+            total = sum(int(f["Registros"]) for f in resumen)
+            verificar("resumen consolidado con todas las cuentas", total == 300 + 40 + 120)
+            verificar("el pico de memoria se identifica como del trabajador", list(resumen[0]) == CAMPOS_RESUMEN and "PicoMemoriaTrabajadorMB" in CAMPOS_RESUMEN)
+            trabajadores = {f["Trabajador"] for f in resumen}
+            if ejecutor == "hilos":
+                verificar("con hilos, el trabajador es el proceso principal", trabajadores == {str(os.getpid())})
+            else:
+                verificar("con procesos, el trabajador no es el proceso principal", str(os.getpid()) not in trabajadores)
+
+        print("\n3. Índice de Registros construido una sola vez...")
+        construidos = []
+        class IndiceContado(IndiceRegs):
+            def __init__(self, *args, **kwargs):
+                construidos.append(args)
+                super().__init__(*args, **kwargs)
+        originales = script.IndiceRegs, multiempresa.IndiceRegs
+        script.IndiceRegs = multiempresa.IndiceRegs = IndiceContado
+        try:
+            indice = IndiceContado(regs)
+            procesar_exportaciones(ad_files[:3], regs, None, "2026", directorio_base=os.path.join(tmp, "compartido"), ejecutor="hilos", indice_regs=indice)
+            verificar("procesar_exportaciones reutiliza el índice recibido", len(construidos) == 1)
+            construidos.clear()
+            argv = sys.argv
+            sys.argv = ["generar_reportes.py", "--ad", *ad_files[:3], "--regs", regs, "--anio", "2026",
+                        "--division", "div.contabilidad", "--ejecutor", "hilos", "--salida", os.path.join(tmp, "cli")]
+            try:
+                with open(os.devnull, "w", encoding="utf-8") as nulo, redirect_stdout(nulo):
+                    script.main()
+            finally:
+                sys.argv = argv
+            verificar("línea de comandos con --division y varios archivos AD: un solo índice", len(construidos) == 1)
+            verificar("la línea de comandos generó las exportaciones", os.path.exists(os.path.join(tmp, "cli", "resumen.csv")))
+        finally:
+            script.IndiceRegs, multiempresa.IndiceRegs = originales
+
+    finalizar()
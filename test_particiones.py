@@ -0,0 +1,151 @@
+"""
+Script de prueba para el particionado de reportes y el pool de escritores
+"""
+import csv
+import os
+import tempfile
+from datetime import date
+import res
+from equivalencia import generar_fixture
+from escritores import EscritorConPresupuesto, PoolEscritores, crear_escritor, nombre_particion, parsear_particiones
+from join_externo import OrdenadorExterno
+from medicion import BYTES_POR_CAMPO
+from pruebas import finalizar, iniciar, verificar
+from res import generar_reportes
+
+iniciar("PRUEBA DE PARTICIONADO DE REPORTES")
+
+# 1. Claves de partición
+print("\n1. Parseando claves de partición...")
+verificar("'mes,gerente' -> ('mes', 'gerente')", parsear_particiones("mes, Gerente") == ("mes", "gerente"))
+try:
+    parsear_particiones("mes,jefe")
+    verificar("clave desconocida rechazada", False)
+except ValueError:
+    verificar("clave desconocida rechazada", True)
+
+registro = {"Division": "DIV.TDAS.LIMA", "Gerente": "N/A", "Responsable": "S12345"}
+verificar("nombre por mes", nombre_particion(("mes",), "Enero2026", registro) == "Enero2026")
+verificar("nombre por mes y gerente", nombre_particion(("mes", "gerente"), "Enero2026", registro) == "Enero2026_N-A")
+verificar("nombre por división", nombre_particion(("division",), "Enero2026", registro) == "DIV.TDAS.LIMA")
+
+# 2. Pool con menos archivos abiertos que particiones
+print("\n2. Escribiendo 10 particiones con máximo 3 archivos abiertos...")
+with tempfile.TemporaryDirectory() as tmp:
+    campos = ["SamAccountName", "Gerente"]
+    max_abiertos = 0
+    with PoolEscritores(tmp, fieldnames=campos, max_abiertos=3) as pool:
+        for i in range(100):
+            pool.escribir(f"G{i % 10}", {"SamAccountName": f"X{i}", "Gerente": f"G{i % 10}"})
+            max_abiertos = max(max_abiertos, len(pool.abiertos))
+    verificar("nunca más de 3 archivos abiertos", max_abiertos == 3)
+    verificar("10 archivos generados", sorted(os.listdir(tmp)) == sorted(f"G{i}.csv" for i in range(10)))
+
+    with open(os.path.join(tmp, "G3.csv"), newline="", encoding="utf-8") as f:
+        filas = list(csv.reader(f, delimiter=";"))
+    verificar("encabezado escrito una sola vez", filas[0] == campos and campos not in filas[1:])
+    verificar("filas en orden tras reabrir", [r[0] for r in filas[1:]] == [f"X{i}" for i in range(3, 100, 10)])
+
+def leer_carpeta(carpeta):
+    contenido = {}
+    for nombre in sorted(os.listdir(carpeta)):
+        with open(os.path.join(carpeta, nombre), "rb") as f:
+            contenido[nombre] = f.read()
+    return contenido
+
+class OrdenadorMedido(OrdenadorExterno):
+    """OrdenadorExterno que registra su mayor uso de memoria, sus corridas y su carpeta temporal."""
+    maximo = maximo_registro = corridas = 0
+    directorio = None
+
+    def __init__(self, clave, presupuesto_bytes, directorio):
+        super().__init__(clave, presupuesto_bytes, directorio)
+        OrdenadorMedido.directorio = directorio
+
+    def agregar(self, registro):
+        OrdenadorMedido.maximo_registro = max(OrdenadorMedido.maximo_registro, sum(len(c) for c in registro) + BYTES_POR_CAMPO * len(registro))
+        super().agregar(registro)
+        OrdenadorMedido.maximo = max(OrdenadorMedido.maximo, self.bytes_buffer)
+
+    def _escribir_corrida(self, registros):
+        OrdenadorMedido.corridas += 1
+        return super()._escribir_corrida(registros)
+
+# 3. Particiones que solo difieren en mayúsculas
+print("\n3. Particiones que solo difieren en mayúsculas...")
+with tempfile.TemporaryDirectory() as tmp:
+    directo, agrupado = os.path.join(tmp, "directo"), os.path.join(tmp, "agrupado")
+    os.makedirs(directo)
+    os.makedirs(agrupado)
+    valores = ["DIV.CONTABILIDAD", "Div.Contabilidad", "S10001", "s10001", "TRIBU PAGOS"]
+    registros = [(valores[i % 5], {"SamAccountName": f"X{i}", "Gerente": valores[i % 5]}) for i in range(50)]
+    with PoolEscritores(directo, fieldnames=campos, max_abiertos=1) as pool:
+        for nombre, registro in registros:
+            pool.escribir(nombre, registro)
+    verificar("un archivo por nombre sin distinguir mayúsculas", sorted(os.listdir(directo)) == ["DIV.CONTABILIDAD.csv", "S10001.csv", "TRIBU PAGOS.csv"])
+    verificar("conteos con una sola partición por archivo", pool.conteos == {"DIV.CONTABILIDAD": 20, "S10001": 20, "TRIBU PAGOS": 10})
+    with open(os.path.join(directo, "S10001.csv"), newline="", encoding="utf-8") as f:
+        filas = list(csv.reader(f, delimiter=";"))
+    verificar("sin filas perdidas y en orden de llegada", [r[0] for r in filas[1:]] == [f"X{i}" for i in range(50) if i % 5 in (2, 3)])
+    with EscritorConPresupuesto(PoolEscritores(agrupado, fieldnames=campos), 256, fieldnames=campos) as escritor:
+        for nombre, registro in registros:
+            escritor.escribir(nombre, registro)
+    verificar("con presupuesto de memoria, mismos archivos", leer_carpeta(agrupado) == leer_carpeta(directo))
+
+# 4. Filas agrupadas por partición con presupuesto de memoria
+print("\n4. Agrupando filas con un presupuesto de memoria de 2 KB...")
+with tempfile.TemporaryDirectory() as tmp:
+    directo, agrupado = os.path.join(tmp, "directo"), os.path.join(tmp, "agrupado")
+    os.makedirs(directo)
+    os.makedirs(agrupado)
+    registros = [
+        (f"G{i % 10}", {"SamAccountName": f"X{i}", "DisplayName": "Cuenta; \"uno\"\nÑandú" if i % 7 == 0 else f"Cuenta {i}", "Gerente": f"G{i % 10}"})
+        for i in range(500)
+    ]
+    with crear_escritor("csv", directo, max_abiertos=3) as pool:
+        for nombre, registro in registros:
+            pool.escribir(nombre, registro)
+    max_buffer = 0
+    with EscritorConPresupuesto(PoolEscritores(agrupado, max_abiertos=3), 2048) as escritor:
+        for nombre, registro in registros:
+            escritor.escribir(nombre, registro)
+            max_buffer = max(max_buffer, escritor.bytes_buffer)
+        temporales = escritor.directorio
+    verificar("memoria pendiente dentro del presupuesto", 0 < max_buffer < 2048)
+    verificar("filas volcadas a archivos temporales", escritor.volcados > 0 and temporales is not None)
+    verificar("archivos temporales eliminados", not os.path.exists(temporales))
+    verificar("reportes idénticos a la escritura directa", leer_carpeta(agrupado) == leer_carpeta(directo))
+    verificar("conteos por partición en orden de creación", list(escritor.conteos.items()) == [(f"G{i}", 50) for i in range(10)])
+
+    fallido = os.path.join(tmp, "fallido")
+    os.makedirs(fallido)
+    try:
+        with crear_escritor("csv", fallido, memoria_mb=0.001) as escritor:
+            for nombre, registro in registros:
+                escritor.escribir(nombre, registro)
+            temporales = escritor.directorio
+            raise RuntimeError("error al generar")
+    except RuntimeError:
+        pass
+    verificar("con error no se escriben filas y se eliminan los temporales", os.listdir(fallido) == [] and not os.path.exists(temporales))
+
+    print("\n5. Ventana de fechas con presupuesto de memoria...")
+    ad, regs = generar_fixture(os.path.join(tmp, "fixture"), registros=300, cuentas=2000, semilla=3)
+    desde, hasta = date(2025, 1, 1), date(2027, 12, 31)
+    sin_presupuesto, _ = generar_reportes(ad, regs, None, None, desde=desde, hasta=hasta, directorio_salida=os.path.join(tmp, "ventana"))
+    original = res.OrdenadorExterno
+    res.OrdenadorExterno = OrdenadorMedido
+    try:
+        con_presupuesto, archivos = generar_reportes(ad, regs, None, None, desde=desde, hasta=hasta, memoria_mb=0.02, directorio_salida=os.path.join(tmp, "ventana_presupuesto"))
+    finally:
+        res.OrdenadorExterno = original
+    verificar("hay cuentas en la ventana", sum(cantidad for _, cantidad in archivos) > 500)
+    verificar(f"filas por ordenar volcadas a disco ({OrdenadorMedido.corridas} corridas)", OrdenadorMedido.corridas > 1)
+    verificar(
+        f"filas por ordenar en memoria ({OrdenadorMedido.maximo} bytes) dentro de la mitad del presupuesto",
+        OrdenadorMedido.maximo <= 0.01 * 1024 * 1024 + OrdenadorMedido.maximo_registro
+    )
+    verificar("temporales del ordenamiento eliminados", OrdenadorMedido.directorio is not None and not os.path.exists(OrdenadorMedido.directorio))
+    verificar("reportes idénticos a la ventana sin presupuesto", leer_carpeta(con_presupuesto) == leer_carpeta(sin_presupuesto))
+
+finalizar()
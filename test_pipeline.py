@@ -0,0 +1,240 @@
+"""
+Script de prueba para las etapas en hilos (pipeline.py): propagación de
+errores del lector y del escritor, consumidor que se detiene antes de tiempo
+y publicación atómica de la carpeta de reportes
+"""
+import itertools
+import os
+import tempfile
+import threading
+import pipeline
+from pipeline import EscritorEnHilo, crear_directorio_temporal, iterar_en_hilo, publicar_directorio
+from pruebas import finalizar, iniciar, verificar
+
+iniciar("PRUEBA DE LAS ETAPAS EN HILOS")
+
+def con_limite(funcion, segundos=10):
+    """Ejecuta funcion en otro hilo. Retorna (terminó a tiempo, resultado o excepción)."""
+    resultado = []
+    def ejecutar():
+        try:
+            resultado.append(funcion())
+        except BaseException as e:
+            resultado.append(e)
+    hilo = threading.Thread(target=ejecutar, daemon=True)
+    hilo.start()
+    hilo.join(segundos)
+    return not hilo.is_alive(), resultado[0] if resultado else None
+
+def hilos_vivos(nombre):
+    return [h for h in threading.enumerate() if h.name == nombre]
+
+class ErrorLector(Exception):
+    pass
+
+class ErrorEscritor(Exception):
+    pass
+
+class EscritorPrueba:
+    """Escritor mínimo con la interfaz de escritores.crear_escritor; falla en la fila `falla_en`."""
+    def __init__(self, falla_en=None):
+        self.falla_en = falla_en
+        self.filas = []
+        self.conteos = {}
+        self.cerrado = False
+
+    def escribir(self, nombre, registro):
+        if len(self.filas) == self.falla_en:
+            raise ErrorEscritor(f"falla en la fila {self.falla_en}")
+        self.filas.append((nombre, registro))
+        self.conteos[nombre] = self.conteos.get(nombre, 0) + 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrado = True
+
+print("\n1. Lector en hilo...")
+verificar("entrega todos los elementos en orden", list(iterar_en_hilo(range(1000), tamano_lote=7, max_lotes=2)) == list(range(1000)))
+
+def lector_con_error():
+    yield from range(500)
+    raise ErrorLector("archivo ilegible")
+
+def consumir_con_error():
+    leidos = []
+    try:
+        for elemento in iterar_en_hilo(lector_con_error(), tamano_lote=64, max_lotes=2):
+            leidos.append(elemento)
+    except ErrorLector as e:
+        return leidos, e
+    return leidos, None
+
+a_tiempo, (leidos, error) = con_limite(consumir_con_error)
+verificar("la excepción del lector llega al consumidor", a_tiempo and isinstance(error, ErrorLector))
+verificar("antes de la excepción se entregan las filas leídas", leidos == list(range(500)))
+
+def detener_antes():
+    generador = iterar_en_hilo(itertools.count(), tamano_lote=16, max_lotes=2)
+    primeros = list(itertools.islice(generador, 100))
+    generador.close()
+    return primeros
+
+a_tiempo, primeros = con_limite(detener_antes)
+verificar("consumidor que se detiene antes de tiempo no bloquea (lector infinito, cola llena)", a_tiempo and primeros == list(range(100)))
+verificar("el hilo lector terminó", not hilos_vivos("lector"))
+
+def cortar_con_break():
+    for elemento in iterar_en_hilo(range(100_000), tamano_lote=8, max_lotes=1):
+        if elemento == 10:
+            break
+    return True
+
+a_tiempo, _ = con_limite(cortar_con_break)
+verificar("break en el consumidor libera al lector", a_tiempo and not hilos_vivos("lector"))
+
+print("\n2. Escritor en hilo...")
+escritor = EscritorEnHilo(EscritorPrueba, tamano_lote=10, max_lotes=2)
+for i in range(995):
+    escritor.escribir(f"P{i % 3}", i)
+escritor.cerrar()
+verificar("escribe todo en orden, incluido el último lote incompleto", [r for _, r in escritor.escritor.filas] == list(range(995)))
+verificar("conteos del escritor interno", escritor.conteos == {"P0": 332, "P1": 332, "P2": 331})
+verificar("el escritor interno se cerró", escritor.escritor.cerrado)
+
+for descripcion, falla_en, filas in (("en el último lote", 990, 995), ("con pocas filas, todas pendientes en cerrar", 3, 5)):
+    def escribir_con_error():
+        escritor = EscritorEnHilo(lambda: EscritorPrueba(falla_en), tamano_lote=10, max_lotes=2)
+        for i in range(filas):
+            escritor.escribir("P", i)
+        try:
+            escritor.cerrar()
+        except ErrorEscritor as e:
+            return e
+        return None
+    a_tiempo, error = con_limite(escribir_con_error)
+    verificar(f"la excepción del escritor llega a cerrar() ({descripcion})", a_tiempo and isinstance(error, ErrorEscritor))
+
+def escribir_tras_error():
+    # El escritor falla pronto y el productor sigue enviando mucho más de lo que cabe en la cola
+    escritor = EscritorEnHilo(lambda: EscritorPrueba(5), tamano_lote=10, max_lotes=1)
+    try:
+        for i in range(100_000):
+            escritor.escribir("P", i)
+        escritor.cerrar()
+    except ErrorEscritor as e:
+        return e
+    return None
+
+a_tiempo, error = con_limite(escribir_tras_error)
+verificar("el productor no se bloquea con el escritor caído y recibe el error", a_tiempo and isinstance(error, ErrorEscritor))
+
+def fabrica_con_error():
+    raise OSError("sin permiso de escritura")
+
+def cerrar_fabrica_con_error():
+    escritor = EscritorEnHilo(fabrica_con_error)
+    escritor.escribir("P", 1)
+    try:
+        escritor.cerrar()
+    except OSError as e:
+        return e
+    return None
+
+a_tiempo, error = con_limite(cerrar_fabrica_con_error)
+verificar("el error al crear el escritor llega a cerrar()", a_tiempo and isinstance(error, OSError) and "permiso" in str(error))
+
+def error_del_productor():
+    try:
+        with EscritorEnHilo(EscritorPrueba, tamano_lote=10, max_lotes=1) as escritor:
+            for i in range(50):
+                escritor.escribir("P", i)
+            raise ErrorLector("falla al enriquecer")
+    except ErrorLector as e:
+        return escritor, e
+    return escritor, None
+
+a_tiempo, (escritor, error) = con_limite(error_del_productor)
+verificar("con un error del productor el with relanza ese error y no se cuelga", a_tiempo and isinstance(error, ErrorLector))
+verificar("el escritor interno se cerró igual", escritor.escritor.cerrado and not escritor.hilo.is_alive())
+verificar("el hilo escritor terminó", not hilos_vivos("escritor"))
+
+print("\n3. Publicación de la carpeta de reportes...")
+
+def escribir_archivo(carpeta, nombre, texto):
+    os.makedirs(os.path.dirname(os.path.join(carpeta, nombre)), exist_ok=True)
+    with open(os.path.join(carpeta, nombre), "w", encoding="utf-8") as f:
+        f.write(texto)
+
+def contenido(carpeta):
+    """{ruta relativa: texto} de todos los archivos de la carpeta, incluidas las subcarpetas."""
+    resultado = {}
+    for raiz, _, nombres in os.walk(carpeta):
+        for nombre in nombres:
+            ruta = os.path.join(raiz, nombre)
+            with open(ruta, encoding="utf-8") as f:
+                resultado[os.path.relpath(ruta, carpeta).replace(os.sep, "/")] = f.read()
+    return resultado
+
+def ocultas(padre):
+    return [n for n in os.listdir(padre) if n.startswith(".")]
+
+def publicar_con_falla(temporal, output_dir, falla_en, error):
+    """publicar_directorio con la llamada número falla_en a os.rename fallando. Retorna la excepción."""
+    renombrar = os.rename
+    llamadas = []
+    def rename_que_falla(origen, destino):
+        llamadas.append((origen, destino))
+        if len(llamadas) == falla_en:
+            raise error
+        return renombrar(origen, destino)
+    pipeline.os.rename = rename_que_falla
+    try:
+        publicar_directorio(temporal, output_dir)
+    except OSError as e:
+        return e
+    finally:
+        pipeline.os.rename = renombrar
+    return None
+
+with tempfile.TemporaryDirectory() as tmp:
+    output_dir = os.path.join(tmp, "reportes")
+    temporal = crear_directorio_temporal(output_dir)
+    verificar("la carpeta temporal es oculta y está junto a la final", os.path.dirname(temporal) == tmp and os.path.basename(temporal).startswith(".reportes."))
+    escribir_archivo(temporal, "A.csv", "primera")
+    escribir_archivo(temporal, "B.csv", "primera")
+    publicar_directorio(temporal, output_dir)
+    verificar("publica en una carpeta nueva", contenido(output_dir) == {"A.csv": "primera", "B.csv": "primera"} and not ocultas(tmp))
+
+    # El usuario agrega archivos propios a la carpeta de reportes
+    escribir_archivo(output_dir, "notas.txt", "del usuario")
+    escribir_archivo(output_dir, "revision/A_revisado.csv", "del usuario")
+    temporal = crear_directorio_temporal(output_dir)
+    escribir_archivo(temporal, "A.csv", "segunda")
+    escribir_archivo(temporal, "C.csv", "segunda")
+    publicar_directorio(temporal, output_dir)
+    verificar(
+        "reemplaza los reportes generados y conserva lo demás (archivos del usuario, reportes no regenerados)",
+        contenido(output_dir) == {"A.csv": "segunda", "B.csv": "primera", "C.csv": "segunda", "notas.txt": "del usuario", "revision/A_revisado.csv": "del usuario"}
+    )
+    verificar("no quedan la carpeta temporal ni la anterior", not ocultas(tmp))
+    publicado = contenido(output_dir)
+
+    temporal = crear_directorio_temporal(output_dir)
+    escribir_archivo(temporal, "A.csv", "tercera")
+    error = publicar_con_falla(temporal, output_dir, 2, PermissionError("carpeta en uso"))
+    verificar("falla del segundo renombrado se relanza", isinstance(error, PermissionError))
+    verificar("se restaura la carpeta anterior completa", contenido(output_dir) == publicado)
+    verificar("la carpeta temporal queda intacta y no queda la apartada", contenido(temporal) == {"A.csv": "tercera"} and ocultas(tmp) == [os.path.basename(temporal)])
+
+    error = publicar_con_falla(temporal, output_dir, 4, PermissionError("archivo en uso"))
+    apartadas = [n for n in ocultas(tmp) if n.endswith(".anterior")]
+    verificar("falla al devolver un archivo del usuario se informa", isinstance(error, OSError) and "carpeta anterior" in str(error))
+    verificar("los reportes nuevos quedan publicados", contenido(output_dir)["A.csv"] == "tercera")
+    verificar(
+        "no se pierde ningún archivo: lo no devuelto sigue en la carpeta apartada",
+        len(apartadas) == 1 and set(contenido(output_dir)) | set(contenido(os.path.join(tmp, apartadas[0]))) == set(publicado)
+    )
+
+finalizar()
@@ -0,0 +1,84 @@
+"""
+Script de prueba para el modelo de la vista previa de resultados
+"""
+import os
+import random
+import tempfile
+from datetime import datetime
+from escritores import CAMPOS_REPORTE, crear_escritor
+from res import _clave_mes
+from vista_previa import BUSQUEDA_MANUAL, ModeloReporte, crear_fuente
+from pruebas import finalizar, iniciar, verificar
+
+iniciar("PRUEBA DE VISTA PREVIA DE RESULTADOS")
+
+# Registros con la forma de res.armar_registro, incluidos valores con ';', comillas y saltos de línea
+random.seed(5)
+registros = []
+for i in range(3000):
+    registro = {campo: f"{campo}{i}" for campo in CAMPOS_REPORTE}
+    registro["DisplayName"] = random.choice([f"Cuenta {i}", f"Cuenta; \"{i}\"", f"Cuenta\n{i}", "Ñandú"])
+    registro["Division"] = random.choice(["DIV.CONTABILIDAD", "TRIBU PAGOS", "N/A"])
+    registro["Gerente"] = random.choice(["S100", "S200", "N/A"])
+    registro["NombreResponsable"] = random.choice(["Juan Pérez Gómez", BUSQUEDA_MANUAL])
+    registro["AccountExpires"] = random.choice(["", "basura", f"{random.randint(1, 28):02d}/{random.randint(1, 12):02d}/2026 00:00:00"])
+    registros.append(registro)
+
+def mes_de(registro):
+    return _clave_mes(registro["AccountExpires"])[0]
+
+def fila(registro):
+    return [mes_de(registro)] + [registro[c] for c in CAMPOS_REPORTE]
+
+def fechas_ordenadas(modelo):
+    """Las fechas de expiración válidas de las filas visibles están en orden descendente."""
+    fechas = [
+        datetime.strptime(f[12].split()[0], "%d/%m/%Y")
+        for f in modelo.pagina(0, len(modelo)) if f[12][:1].isdigit()
+    ]
+    return fechas == sorted(fechas, reverse=True)
+
+with tempfile.TemporaryDirectory() as tmp:
+    for formato in ("csv", "jsonl", "csv.gz", "sqlite"):
+        print(f"\nFormato {formato}...")
+        carpeta = os.path.join(tmp, formato)
+        os.makedirs(carpeta)
+        # Máximo 2 archivos abiertos: los archivos de cada mes se cierran y se reabren
+        with crear_escritor(formato, carpeta, max_abiertos=2) as pool:
+            for registro in registros:
+                pool.escribir(mes_de(registro), registro)
+
+        modelo = ModeloReporte(crear_fuente(carpeta, formato))
+        todas = sorted(map(fila, registros))
+        verificar("todas las filas indexadas y legibles", modelo.total == len(registros) and sorted(modelo.pagina(0, modelo.total)) == todas)
+
+        modelo.filtrar(mes="Marzo2026", gerente="S100", solo_manual=True)
+        esperado = [f for f in todas if f[0] == "Marzo2026" and f[6] == "S100" and f[4] == BUSQUEDA_MANUAL]
+        verificar("filtro por mes, gerente y búsqueda manual", sorted(modelo.pagina(0, len(modelo))) == esperado)
+
+        modelo.filtrar(division="DIV.CONTABILIDAD")
+        modelo.ordenar("AccountExpires", descendente=True)
+        verificar("orden descendente por fecha de expiración", fechas_ordenadas(modelo))
+        modelo.filtrar(division="TRIBU PAGOS")
+        verificar("el orden se conserva al cambiar el filtro", fechas_ordenadas(modelo) and len(modelo) > 0)
+        verificar("página parcial al final", len(modelo.pagina(len(modelo) - 5, 25)) == 5)
+
+        meses = modelo.valores("Mes")
+        verificar("meses en orden cronológico", meses.index("Enero2026") < meses.index("Febrero2026") < meses.index("Diciembre2026") < meses.index("Sin_fecha"))
+        modelo.filtrar(mes="Mes inexistente")
+        verificar("filtro sin coincidencias", len(modelo) == 0)
+        modelo.cerrar()
+
+    print("\nArchivos que la carpeta ya tenía...")
+    carpeta = os.path.join(tmp, "csv")
+    rutas = [os.path.join(carpeta, nombre) for nombre in os.listdir(carpeta)]
+    with crear_escritor("csv", carpeta) as pool:
+        pool.escribir("Revisado_por_usuario", registros[0])
+    modelo = ModeloReporte(crear_fuente(carpeta, "csv", rutas))
+    verificar("con rutas solo se muestran esos archivos", modelo.total == len(registros) and "Revisado_por_usuario" not in modelo.valores("Mes"))
+    modelo.cerrar()
+    modelo = ModeloReporte(crear_fuente(carpeta, "csv"))
+    verificar("sin rutas, todos los de la carpeta", modelo.total == len(registros) + 1)
+    modelo.cerrar()
+
+finalizar()
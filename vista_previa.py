@@ -0,0 +1,325 @@
+"""
+Vista previa de los reportes generados, para la interfaz.
+
+ModeloReporte recorre una vez los reportes de una carpeta (en cualquiera de
+los formatos de escritores.FORMATOS) y construye un índice: la posición de
+cada fila en su archivo y, codificadas con una TablaTextos, las columnas por
+las que se filtra (mes, división, gerente y "Se requiere busqueda manual"),
+con la lista de filas de cada valor. Filtrar y ordenar opera sobre esos
+arreglos de enteros; las filas completas se leen del disco solo al mostrar
+la página visible, de modo que la vista no depende del tamaño del reporte.
+"""
+import csv
+import gzip
+import json
+import lzma
+import os
+import sqlite3
+from array import array
+from collections import defaultdict
+
+from codificacion import TablaTextos
+from escritores import CAMPOS_REPORTE, FORMATOS, EscritorSQLite
+from res import MESES, _clave_mes
+
+BUSQUEDA_MANUAL = "Se requiere busqueda manual"
+COLUMNA_MES = "Mes"
+COLUMNAS = [COLUMNA_MES] + CAMPOS_REPORTE
+# Columnas indexadas al construir el modelo; las demás se codifican la primera vez que se ordena por ellas
+COLUMNAS_INDEXADAS = (COLUMNA_MES, "Division", "Gerente")
+COLUMNAS_FECHA = ("whenCreated", "AccountExpires")
+
+# Posición de una fila de archivo: (número de archivo << BITS_POSICION) | byte de inicio
+BITS_POSICION = 40
+
+def _indices_campos(encabezado):
+    """Índice de cada campo de CAMPOS_REPORTE en el encabezado de un CSV (None si falta)."""
+    return [encabezado.index(c) if c in encabezado else None for c in CAMPOS_REPORTE]
+
+def _reordenar(row, indices):
+    return [row[i] if i is not None and i < len(row) else "" for i in indices]
+
+def _lineas_con_posicion(archivo, posicion):
+    """Líneas de un archivo binario; posicion[0] avanza con los bytes entregados."""
+    for linea in archivo:
+        posicion[0] += len(linea)
+        yield linea.decode("utf-8")
+
+class FuenteCSV:
+    """Reportes CSV sin comprimir: cada fila se vuelve a leer del disco por su posición."""
+    def __init__(self, rutas):
+        self.rutas = rutas
+        self.indices = {}
+        self.abiertos = {}
+
+    def recorrer(self):
+        """Genera (posición, fila en el orden de CAMPOS_REPORTE) de todos los archivos."""
+        for n, ruta in enumerate(self.rutas):
+            with open(ruta, "rb") as f:
+                posicion = [0]
+                # csv.reader no lee por adelantado: al entregar una fila, posicion es el inicio de la siguiente
+                reader = csv.reader(_lineas_con_posicion(f, posicion), delimiter=";")
+                encabezado = next(reader, None)
+                if encabezado is None:
+                    continue
+                self.indices[n] = indices = _indices_campos(encabezado)
+                inicio = posicion[0]
+                for row in reader:
+                    yield (n << BITS_POSICION) | inicio, _reordenar(row, indices)
+                    inicio = posicion[0]
+
+    def _archivo(self, n):
+        if n not in self.abiertos:
+            self.abiertos[n] = open(self.rutas[n], "rb")
+        return self.abiertos[n]
+
+    def _leer_registro(self, archivo):
+        return next(csv.reader(_lineas_con_posicion(archivo, [0]), delimiter=";"))
+
+    def leer(self, posicion):
+        n = posicion >> BITS_POSICION
+        archivo = self._archivo(n)
+        archivo.seek(posicion & ((1 << BITS_POSICION) - 1))
+        return _reordenar(self._leer_registro(archivo), self.indices[n])
+
+    def cerrar(self):
+        for archivo in self.abiertos.values():
+            archivo.close()
+        self.abiertos = {}
+
+class FuenteJSONL(FuenteCSV):
+    """Reportes JSON Lines: una fila por línea, leída por su posición."""
+    def recorrer(self):
+        for n, ruta in enumerate(self.rutas):
+            with open(ruta, "rb") as f:
+                inicio = 0
+                for linea in f:
+                    if linea.strip():
+                        yield (n << BITS_POSICION) | inicio, self._fila(linea)
+                    inicio += len(linea)
+
+    def _fila(self, linea):
+        registro = json.loads(linea)
+        return [registro.get(c, "") for c in CAMPOS_REPORTE]
+
+    def leer(self, posicion):
+        archivo = self._archivo(posicion >> BITS_POSICION)
+        archivo.seek(posicion & ((1 << BITS_POSICION) - 1))
+        return self._fila(archivo.readline())
+
+class FuenteMemoria:
+    """
+    Reportes comprimidos (csv.gz, csv.xz): no admiten acceso por posición, así
+    que las filas se conservan en memoria como tuplas.
+    """
+    def __init__(self, rutas, abrir):
+        self.rutas = rutas
+        self.abrir = abrir
+        self.filas = []
+
+    def recorrer(self):
+        if self.filas:
+            yield from enumerate(list(f) for f in self.filas)
+            return
+        for ruta in self.rutas:
+            with self.abrir(ruta, "rt", newline="", encoding="utf-8") as f:
+                reader = csv.reader(f, delimiter=";")
+                encabezado = next(reader, None)
+                if encabezado is None:
+                    continue
+                indices = _indices_campos(encabezado)
+                for row in reader:
+                    fila = _reordenar(row, indices)
+                    self.filas.append(tuple(fila))
+                    yield len(self.filas) - 1, fila
+
+    def leer(self, posicion):
+        return list(self.filas[posicion])
+
+    def cerrar(self):
+        self.filas = []
+
+class FuenteSQLite:
+    """Reporte SQLite: cada fila se lee por su rowid."""
+    def __init__(self, ruta):
+        self.ruta = ruta
+        # El modelo se construye en un hilo y se consulta desde el de la interfaz, nunca a la vez
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        columnas = ", ".join(f'"{c}"' for c in CAMPOS_REPORTE)
+        self.sql_recorrer = f"SELECT rowid, {columnas} FROM reportes ORDER BY rowid"
+        self.sql_leer = f"SELECT {columnas} FROM reportes WHERE rowid = ?"
+
+    def recorrer(self):
+        for row in self.conexion.execute(self.sql_recorrer):
+            yield row[0], ["" if v is None else v for v in row[1:]]
+
+    def leer(self, posicion):
+        row = self.conexion.execute(self.sql_leer, (posicion,)).fetchone()
+        return ["" if v is None else v for v in row]
+
+    def cerrar(self):
+        self.conexion.close()
+
+def crear_fuente(output_dir, formato, rutas=None):
+    """
+    Fuente de filas para los reportes de output_dir generados en el formato
+    dado. rutas limita la fuente a esos archivos (p. ej. los que publicó la
+    última ejecución, sin los que la carpeta ya tenía); por defecto, todos
+    los de output_dir con la extensión del formato.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de salida desconocido: '{formato}'")
+    if FORMATOS[formato] is None:
+        return FuenteSQLite(os.path.join(output_dir, EscritorSQLite.NOMBRE_ARCHIVO))
+    extension = FORMATOS[formato].extension
+    if rutas is None:
+        rutas = [os.path.join(output_dir, nombre) for nombre in os.listdir(output_dir) if nombre.endswith(extension)]
+    rutas = sorted(rutas)
+    if formato == "jsonl":
+        return FuenteJSONL(rutas)
+    if formato == "csv":
+        return FuenteCSV(rutas)
+    return FuenteMemoria(rutas, gzip.open if formato == "csv.gz" else lzma.open)
+
+_NUMERO_MES = {nombre: numero for numero, nombre in MESES.items()}
+
+def _clave_mes_orden(texto):
+    """Orden cronológico de mes_key ('Enero2026' < 'Febrero2026' < ... < 'Sin_fecha')."""
+    for nombre, numero in _NUMERO_MES.items():
+        if texto.startswith(nombre) and texto[len(nombre):].isdigit():
+            return (0, int(texto[len(nombre):]), numero, texto)
+    return (1, 0, 0, texto)
+
+def _clave_fecha_orden(texto):
+    """Orden cronológico de 'dd/mm/aaaa hh:mm:ss'; los textos no válidos van al final."""
+    partes = texto.split()
+    fecha = partes[0].split("/") if partes else []
+    if len(fecha) == 3 and all(p.isdigit() for p in fecha):
+        return (0, int(fecha[2]), int(fecha[1]), int(fecha[0]), texto)
+    return (1, 0, 0, 0, texto)
+
+def _clave_orden(columna):
+    if columna == COLUMNA_MES:
+        return _clave_mes_orden
+    if columna in COLUMNAS_FECHA:
+        return _clave_fecha_orden
+    return None
+
+class ModeloReporte:
+    """
+    Índice de las filas de un reporte para mostrarlo por páginas, con
+    filtros por mes, división, gerente y cuentas que requieren búsqueda
+    manual, y orden por cualquier columna.
+    """
+    def __init__(self, fuente):
+        self.fuente = fuente
+        self.textos = TablaTextos()
+        self.posiciones = array("Q")
+        self.columnas = {c: array("I") for c in COLUMNAS_INDEXADAS}
+        self.manual = array("B")
+        self._rangos = {}
+
+        codificar = self.textos.codificar
+        meses = {}
+        mes, division, gerente = (self.columnas[c] for c in COLUMNAS_INDEXADAS)
+        i_division, i_gerente, i_nombre, i_expira = (
+            CAMPOS_REPORTE.index(c) for c in ("Division", "Gerente", "NombreResponsable", "AccountExpires")
+        )
+        for posicion, fila in fuente.recorrer():
+            self.posiciones.append(posicion)
+            expira = fila[i_expira]
+            if expira not in meses:
+                meses[expira] = codificar(_clave_mes(expira)[0])
+            mes.append(meses[expira])
+            division.append(codificar(fila[i_division]))
+            gerente.append(codificar(fila[i_gerente]))
+            self.manual.append(fila[i_nombre] == BUSQUEDA_MANUAL)
+
+        # Índice invertido: columna -> código -> filas con ese valor
+        self.por_valor = {}
+        for nombre in COLUMNAS_INDEXADAS:
+            filas = defaultdict(lambda: array("L"))
+            for i, codigo in enumerate(self.columnas[nombre]):
+                filas[codigo].append(i)
+            self.por_valor[nombre] = dict(filas)
+        self.filas_manual = array("L", (i for i, m in enumerate(self.manual) if m))
+
+        self.filtro = {}
+        self.orden = None
+        self.visibles = list(range(len(self.posiciones)))
+
+    @property
+    def total(self):
+        """Cantidad de filas del reporte, sin filtros."""
+        return len(self.posiciones)
+
+    def __len__(self):
+        """Cantidad de filas que pasan el filtro actual."""
+        return len(self.visibles)
+
+    def _columna(self, nombre):
+        """Códigos de la columna para todas las filas; las no indexadas se leen una vez."""
+        if nombre not in self.columnas:
+            i = CAMPOS_REPORTE.index(nombre)
+            codificar = self.textos.codificar
+            self.columnas[nombre] = array("I", (codificar(fila[i]) for _, fila in self.fuente.recorrer()))
+        return self.columnas[nombre]
+
+    def valores(self, nombre):
+        """Valores distintos de una columna, ordenados como al ordenar por ella."""
+        textos = self.textos.textos
+        return sorted((textos[c] for c in set(self._columna(nombre))), key=_clave_orden(nombre))
+
+    def filtrar(self, mes=None, division=None, gerente=None, solo_manual=False):
+        """Deja visibles las filas con esos valores (None = cualquiera), en el orden actual."""
+        self.filtro = {COLUMNA_MES: mes, "Division": division, "Gerente": gerente}
+        candidatas = []
+        for nombre, valor in self.filtro.items():
+            if valor is not None:
+                codigo = self.textos.buscar(valor)
+                candidatas.append(self.por_valor[nombre].get(codigo, array("L")))
+        if solo_manual:
+            candidatas.append(self.filas_manual)
+
+        if not candidatas:
+            visibles = list(range(self.total))
+        else:
+            # Partir de la lista más corta y comprobar el resto sobre los arreglos de códigos
+            candidatas.sort(key=len)
+            visibles = list(candidatas[0])
+            for nombre, valor in self.filtro.items():
+                if valor is not None:
+                    columna, codigo = self.columnas[nombre], self.textos.buscar(valor)
+                    visibles = [i for i in visibles if columna[i] == codigo]
+            if solo_manual:
+                visibles = [i for i in visibles if self.manual[i]]
+        self.visibles = visibles
+        if self.orden is not None:
+            self.ordenar(*self.orden)
+
+    def _rango(self, nombre):
+        """Posición de cada código de la columna en el orden de sus valores."""
+        if nombre not in self._rangos:
+            clave, textos = _clave_orden(nombre), self.textos.textos
+            orden = (lambda c: clave(textos[c])) if clave else (lambda c: textos[c])
+            codigos = sorted(set(self._columna(nombre)), key=orden)
+            self._rangos[nombre] = {codigo: n for n, codigo in enumerate(codigos)}
+        return self._rangos[nombre]
+
+    def ordenar(self, nombre, descendente=False):
+        """Ordena las filas visibles por una columna (estable: a igual valor, orden del archivo)."""
+        columna, rango = self._columna(nombre), self._rango(nombre)
+        self.visibles.sort()
+        self.visibles.sort(key=lambda i: rango[columna[i]], reverse=descendente)
+        self.orden = (nombre, descendente)
+
+    def pagina(self, inicio, cantidad):
+        """Filas visibles [inicio, inicio + cantidad) con los valores de COLUMNAS."""
+        mes, textos = self.columnas[COLUMNA_MES], self.textos.textos
+        return [
+            [textos[mes[i]]] + self.fuente.leer(self.posiciones[i])
+            for i in self.visibles[inicio:inicio + cantidad]
+        ]
+
+    def cerrar(self):
+        self.fuente.cerrar()